@@ -0,0 +1,63 @@
+import discord
+from discord import app_commands
+from discord.ext import commands
+
+from Modules.Core._Storage import get_storage
+from Modules.Core._Export import CHECKIN_EXPORT, send_export
+
+
+class CheckInExport(commands.Cog):
+    def __init__(self, bot):
+        self.bot = bot
+        self.storage = get_storage()
+
+    # ---------------------------------------------------
+
+    @app_commands.command(
+        name="exportcheckins",
+        description="Download your whole daily check-in history as a file."
+    )
+    @app_commands.describe(
+        format="File format (default: CSV)",
+        compression="Archive type (default: gzip)"
+    )
+    @app_commands.choices(
+        format=[
+            app_commands.Choice(name="CSV", value="csv"),
+            app_commands.Choice(name="JSON Lines", value="jsonl"),
+            app_commands.Choice(name="Markdown", value="md"),
+        ],
+        compression=[
+            app_commands.Choice(name="gzip (.gz)", value="gzip"),
+            app_commands.Choice(name="zip", value="zip"),
+        ]
+    )
+    async def exportcheckins(self, interaction: discord.Interaction,
+                             format: app_commands.Choice[str] = None,
+                             compression: app_commands.Choice[str] = None):
+
+        if interaction.guild is None:
+            await interaction.response.send_message(
+                "This command can only be used in a server.",
+                ephemeral=True
+            )
+            return
+
+        await interaction.response.defer(ephemeral=True, thinking=True)
+
+        series = await self.storage.export_checkins(interaction.guild.id, interaction.user.id)
+        if not len(series):
+            await interaction.followup.send("You don't have any check-ins to export yet.", ephemeral=True)
+            return
+
+        # Rows are made from the copy as the export is written, not all up front
+        await send_export(
+            interaction, CHECKIN_EXPORT, series.iter_entries(),
+            format.value if format else "csv",
+            compression.value if compression else "gzip",
+            f"Daily check-ins of {interaction.user}"
+        )
+
+
+async def setup(bot):
+    await bot.add_cog(CheckInExport(bot))
@@ -1,63 +1,22 @@
 import discord
 from discord import app_commands
 from discord.ext import commands
-import os
-import json
-from datetime import datetime, timedelta
 import io
 
+from Modules.Core._Storage import get_storage, CHECKIN
+from Modules.Core._Deferral import respond
+
 
 class CheckInHistory(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
-        self.base_path = "Data/CheckIns"
+        self.storage = get_storage()
 
     # --------------- INTERNAL HELPERS -----------------
 
-    def get_user_file(self, guild_id: int, user_id: int):
-        folder = os.path.join(self.base_path, str(guild_id))
-        return os.path.join(folder, f"{user_id}.json")
-
-    def load_history(self, guild_id: int, user_id: int):
-        """Loads the user's existing check-in log or returns empty list."""
-        file_path = self.get_user_file(guild_id, user_id)
-
-        if not os.path.exists(file_path):
-            return []
-
-        try:
-            with open(file_path, "r") as f:
-                return json.load(f)
-        except:
-            return []
-
-    def filter_history_by_days(self, history, days: int):
-        """Return history entries within the last <days> days (inclusive)."""
-        if not history:
-            return []
-
-        today = datetime.now().date()
-        cutoff = today - timedelta(days=days - 1)
-
-        filtered = []
-        for entry in history:
-            date_str = entry.get("date")
-            mood = entry.get("mood", "unknown")
-
-            try:
-                entry_date = datetime.strptime(date_str, "%Y-%m-%d").date()
-            except Exception:
-                continue
-
-            if entry_date >= cutoff:
-                filtered.append({
-                    "date": entry_date,
-                    "mood": mood
-                })
-
-        # sort ascending by date
-        filtered.sort(key=lambda x: x["date"])
-        return filtered
+    async def load_window(self, guild_id: int, user_id: int, days: int):
+        """(date, mood) pairs from the last <days> days (inclusive), oldest first."""
+        return await self.storage.get_checkin_window(guild_id, user_id, days)
 
     def format_history_text(self, entries, days: int, user: discord.User | discord.Member):
         """Builds a plain text representation of the history."""
@@ -68,13 +27,38 @@ class CheckInHistory(commands.Cog):
         if not entries:
             lines.append("No check-ins found in this time range.")
         else:
-            for entry in entries:
-                date_str = entry["date"].strftime("%Y-%m-%d")
-                mood = str(entry["mood"]).capitalize()
-                lines.append(f"{date_str}: {mood}")
+            for entry_date, mood in entries:
+                lines.append(f"{entry_date.strftime('%Y-%m-%d')}: {mood.capitalize()}")
 
         return "\n".join(lines)
 
+    def render_history(self, entries, days: int, user: discord.User | discord.Member) -> dict:
+        """The reply's message arguments: an embed, or a text file if it's too long for one."""
+        history_text = self.format_history_text(entries, days, user)
+
+        # If small enough, send as an embed
+        if len(history_text) <= 3500:
+            # Build embed description without the first line (title line), use as embed title instead
+            lines = history_text.split("\n")
+            title = lines[0] if lines else "Daily Check-In History"
+            desc = "\n".join(lines[2:]) if len(lines) > 2 else "No check-ins found in this time range."
+
+            embed = discord.Embed(
+                title=title,
+                description=desc,
+                color=0x4c9aff
+            )
+            return {"embed": embed}
+
+        # Too long for embed, return as a text file
+        file_buffer = io.BytesIO(history_text.encode("utf-8"))
+        discord_file = discord.File(file_buffer, filename="checkin_history.txt")
+
+        return {
+            "content": "Your check-in history is a bit long, so here it is as a file:",
+            "file": discord_file
+        }
+
     # ---------------------------------------------------
 
     @app_commands.command(
@@ -97,34 +81,12 @@ class CheckInHistory(commands.Cog):
         user = interaction.user
         user_id = user.id
 
-        history = self.load_history(guild_id, user_id)
-        filtered = self.filter_history_by_days(history, days)
-
-        history_text = self.format_history_text(filtered, days, user)
-
-        # If small enough, send as an embed
-        if len(history_text) <= 3500:
-            # Build embed description without the first line (title line), use as embed title instead
-            lines = history_text.split("\n")
-            title = lines[0] if lines else "Daily Check-In History"
-            desc = "\n".join(lines[2:]) if len(lines) > 2 else "No check-ins found in this time range."
-
-            embed = discord.Embed(
-                title=title,
-                description=desc,
-                color=0x4c9aff
-            )
-            await interaction.response.send_message(embed=embed, ephemeral=True)
-            return
-
-        # Too long for embed, return as a text file
-        file_buffer = io.BytesIO(history_text.encode("utf-8"))
-        discord_file = discord.File(file_buffer, filename="checkin_history.txt")
-
-        await interaction.response.send_message(
-            content="Your check-in history is a bit long, so here it is as a file:",
-            file=discord_file,
-            ephemeral=True
+        # Deferred (and rendered off the loop) when the history isn't in memory yet
+        await respond(
+            interaction, "checkinhistory",
+            self.storage.cached_size(CHECKIN, guild_id, user_id),
+            lambda: self.load_window(guild_id, user_id, days),
+            lambda entries: self.render_history(entries, days, user)
         )
 
 
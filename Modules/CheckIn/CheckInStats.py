@@ -1,16 +1,28 @@
 import discord
 from discord import app_commands
 from discord.ext import commands
-import os
-import json
-from datetime import datetime, timedelta
 import io
+import os
+import asyncio
+import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from Modules.Core._Storage import get_storage, ROLLUP
+from Modules.Core._Deferral import respond
+from Modules.Core._Metrics import get_metrics
+from Modules.CheckIn._MoodChart import ChartCache, chart_folder, chart_key, render_chart
+
+log = logging.getLogger("Mellow.CheckInStats")
+
+CHART_FILENAME = "mood_trend.png"
 
 
 class CheckInStats(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
-        self.base_path = "Data/CheckIns"
+        self.storage = get_storage()
 
         # Map stored mood keys -> pretty labels
         self.mood_labels = {
@@ -21,63 +33,63 @@ class CheckInStats(commands.Cog):
             "motivated": "🔥 Motivated"
         }
 
+        # Trend charts: drawn in their own processes, started on first use
+        self.charts = ChartCache(
+            chart_folder(self.storage.partition),
+            max_memory_bytes=int(float(os.getenv("CHART_CACHE_MB", "8")) * 1024 * 1024),
+            max_disk_bytes=int(float(os.getenv("CHART_DISK_MB", "64")) * 1024 * 1024)
+        )
+        self._chart_pool = None
+
+    async def cog_unload(self):
+        if self._chart_pool is not None:
+            self._chart_pool.shutdown(wait=False, cancel_futures=True)
+
     # --------------- INTERNAL HELPERS -----------------
 
-    def get_user_file(self, guild_id: int, user_id: int):
-        folder = os.path.join(self.base_path, str(guild_id))
-        return os.path.join(folder, f"{user_id}.json")
+    async def load_counts(self, guild_id: int, user_id: int, days: int):
+        """Mood counts over the last <days> days, answered from the user's rollup."""
+        return await self.storage.get_mood_counts(guild_id, user_id, days)
+
+    def chart_pool(self) -> ProcessPoolExecutor:
+        if self._chart_pool is None:
+            self._chart_pool = ProcessPoolExecutor(
+                max_workers=int(os.getenv("CHART_WORKERS", "1")),
+                mp_context=multiprocessing.get_context("spawn")
+            )
+        return self._chart_pool
 
-    def load_history(self, guild_id: int, user_id: int):
-        """Loads the user's existing check-in log or returns empty list."""
-        file_path = self.get_user_file(guild_id, user_id)
+    async def load_chart(self, guild_id: int, user_id: int, days: int):
+        """PNG of the user's mood trend, from the cache unless the window changed. None if drawing failed."""
+        codes, last_day = await self.storage.get_mood_days(guild_id, user_id, days)
+        key = chart_key(guild_id, user_id, days, last_day, codes)
+        metrics = get_metrics()
 
-        if not os.path.exists(file_path):
-            return []
+        png = self.charts.get(key)
+        if png is not None:
+            metrics.inc("mellow_chart_cache_total", (("result", "memory"),))
+            return png
 
         try:
-            with open(file_path, "r") as f:
-                return json.load(f)
-        except:
-            return []
-
-    def filter_history_by_days(self, history, days: int):
-        """Return history entries within the last <days> days (inclusive)."""
-        if not history:
-            return []
-
-        today = datetime.now().date()
-        cutoff = today - timedelta(days=days - 1)
-
-        filtered = []
-        for entry in history:
-            date_str = entry.get("date")
-            mood = entry.get("mood", "unknown")
-
-            try:
-                entry_date = datetime.strptime(date_str, "%Y-%m-%d").date()
-            except Exception:
-                continue
-
-            if entry_date >= cutoff:
-                filtered.append({
-                    "date": entry_date,
-                    "mood": mood
-                })
-
-        return filtered
-
-    def compute_stats(self, filtered_entries):
-        """Count moods across filtered entries."""
-        counts = {key: 0 for key in self.mood_labels.keys()}
-        total = 0
-
-        for entry in filtered_entries:
-            mood_key = str(entry.get("mood", "unknown")).lower()
-            if mood_key in counts:
-                counts[mood_key] += 1
-                total += 1
-
-        return counts, total
+            png = await asyncio.to_thread(self.charts.read, key)
+            if png is not None:
+                metrics.inc("mellow_chart_cache_total", (("result", "disk"),))
+            else:
+                loop = asyncio.get_running_loop()
+                png = await loop.run_in_executor(self.chart_pool(), render_chart, codes)
+                metrics.inc("mellow_chart_cache_total", (("result", "rendered"),))
+                await asyncio.to_thread(self.charts.write, key, png)
+        except Exception as e:
+            log.error(f"Could not get the mood chart for {guild_id}/{user_id}: {e}")
+            if isinstance(e, BrokenProcessPool):
+                # A worker died; start a new pool on the next chart
+                self._chart_pool.shutdown(wait=False, cancel_futures=True)
+                self._chart_pool = None
+            if png is None:
+                return None
+
+        self.charts.put(key, png)
+        return png
 
     def build_bar(self, value: int, max_value: int, width: int = 10):
         """Simple text bar for visuals."""
@@ -109,6 +121,39 @@ class CheckInStats(commands.Cog):
 
         return "\n".join(lines)
 
+    def render_stats(self, user: discord.User | discord.Member, days: int, counts: dict, total: int,
+                     chart: bytes = None) -> dict:
+        """The reply's message arguments: an embed (with the chart), or text file(s) if it's too long for one."""
+        chart_file = discord.File(io.BytesIO(chart), filename=CHART_FILENAME) if chart else None
+        stats_text = self.format_stats_text(user, days, counts, total)
+
+        # If short enough, use an embed
+        if len(stats_text) <= 3500:
+            lines = stats_text.split("\n")
+            title = lines[0] if lines else "Daily Check-In Stats"
+            desc = "\n".join(lines[2:]) if len(lines) > 2 else "No check-ins found in this time range."
+
+            embed = discord.Embed(
+                title=title,
+                description=desc,
+                color=0x4c9aff
+            )
+            if chart_file is None:
+                return {"embed": embed}
+
+            embed.set_image(url=f"attachment://{CHART_FILENAME}")
+            embed.set_footer(text="Chart: one bar per day, higher is a better mood; the line is the 3-day average.")
+            return {"embed": embed, "file": chart_file}
+
+        # Fallback: send as text file
+        file_buffer = io.BytesIO(stats_text.encode("utf-8"))
+        discord_file = discord.File(file_buffer, filename="checkin_stats.txt")
+
+        return {
+            "content": "Your check-in stats are a bit long, so here they are as a file:",
+            "files": [discord_file] + ([chart_file] if chart_file else [])
+        }
+
     # ---------------------------------------------------
 
     @app_commands.command(
@@ -116,9 +161,11 @@ class CheckInStats(commands.Cog):
         description="View stats of your moods over the last number of days."
     )
     @app_commands.describe(
-        days="Number of days to look back (max 30)."
+        days="Number of days to look back (max 30).",
+        chart="Also show a chart of your mood trend."
     )
-    async def checkinstats(self, interaction: discord.Interaction, days: app_commands.Range[int, 1, 30]):
+    async def checkinstats(self, interaction: discord.Interaction, days: app_commands.Range[int, 1, 30],
+                           chart: bool = False):
 
         if interaction.guild is None:
             await interaction.response.send_message(
@@ -131,35 +178,18 @@ class CheckInStats(commands.Cog):
         user = interaction.user
         user_id = user.id
 
-        history = self.load_history(guild_id, user_id)
-        filtered = self.filter_history_by_days(history, days)
-        counts, total = self.compute_stats(filtered)
-
-        stats_text = self.format_stats_text(user, days, counts, total)
-
-        # If short enough, use an embed
-        if len(stats_text) <= 3500:
-            lines = stats_text.split("\n")
-            title = lines[0] if lines else "Daily Check-In Stats"
-            desc = "\n".join(lines[2:]) if len(lines) > 2 else "No check-ins found in this time range."
-
-            embed = discord.Embed(
-                title=title,
-                description=desc,
-                color=0x4c9aff
-            )
-
-            await interaction.response.send_message(embed=embed, ephemeral=True)
-            return
-
-        # Fallback: send as text file
-        file_buffer = io.BytesIO(stats_text.encode("utf-8"))
-        discord_file = discord.File(file_buffer, filename="checkin_stats.txt")
-
-        await interaction.response.send_message(
-            content="Your check-in stats are a bit long, so here they are as a file:",
-            file=discord_file,
-            ephemeral=True
+        async def load():
+            counts, total = await self.load_counts(guild_id, user_id, days)
+            png = await self.load_chart(guild_id, user_id, days) if chart and total else None
+            return counts, total, png
+
+        # Deferred (and rendered off the loop) when the rollup isn't in memory yet,
+        # and always for a chart, which may have to be drawn
+        await respond(
+            interaction, "checkinstats",
+            None if chart else self.storage.cached_size(ROLLUP, guild_id, user_id),
+            load,
+            lambda result: self.render_stats(user, days, *result)
         )
 
 
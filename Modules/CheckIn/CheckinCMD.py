@@ -1,9 +1,8 @@
 import discord
 from discord import app_commands
 from discord.ext import commands
-import os
-import json
-from datetime import datetime
+
+from Modules.Core._Storage import get_storage
 
 class DailyCheckIn(commands.Cog):
     def __init__(self, bot):
@@ -17,51 +16,21 @@ class DailyCheckIn(commands.Cog):
             "🔥 Motivated"
         ]
 
-        self.base_path = "Data/CheckIns"
-
-
-    # --------------- INTERNAL HELPERS -----------------
-
-    def get_user_file(self, guild_id: int, user_id: int):
-        folder = os.path.join(self.base_path, str(guild_id))
-        os.makedirs(folder, exist_ok=True)
-        return os.path.join(folder, f"{user_id}.json")
-
-    def load_history(self, guild_id: int, user_id: int):
-        """Loads the user's existing check-in log or returns empty list."""
-        file_path = self.get_user_file(guild_id, user_id)
+        self.storage = get_storage()
 
-        if not os.path.exists(file_path):
-            return []
+    async def cog_load(self):
+        # Read last run's check-in snapshot now rather than on the first /dailycheckin
+        await self.storage.load_last_checkins()
 
-        try:
-            with open(file_path, "r") as f:
-                return json.load(f)
-        except:
-            return []  # if corrupted, reset
 
-    def has_checked_in_today(self, history):
-        """Returns True if there's already a check-in entry for today."""
-        today = datetime.now().strftime("%Y-%m-%d")
-        for entry in history:
-            if entry.get("date") == today:
-                return True
-        return False
-
-    def save_checkin(self, guild_id: int, user_id: int, mood: str):
-        """Appends a new daily check-in entry."""
-        file_path = self.get_user_file(guild_id, user_id)
-        history = self.load_history(guild_id, user_id)
-
-        today = datetime.now().strftime("%Y-%m-%d")
-
-        history.append({
-            "date": today,
-            "mood": mood
-        })
+    # --------------- INTERNAL HELPERS -----------------
 
-        with open(file_path, "w") as f:
-            json.dump(history, f, indent=4)
+    async def save_checkin(self, guild_id: int, user_id: int, mood: str):
+        """
+        Appends a new daily check-in entry.
+        Returns False if there's already a check-in entry for today.
+        """
+        return await self.storage.append_checkin(guild_id, user_id, mood)
 
     # ---------------------------------------------------
 
@@ -87,9 +56,8 @@ class DailyCheckIn(commands.Cog):
         guild_id = interaction.guild.id
         user_id = interaction.user.id
 
-        # Load history and ensure only ONE check-in per day
-        history = self.load_history(guild_id, user_id)
-        if self.has_checked_in_today(history):
+        # Store their check-in, ensuring only ONE check-in per day
+        if not await self.save_checkin(guild_id, user_id, mood.value):
             embed = discord.Embed(
                 title="🧠 Daily Check-In Already Logged",
                 description="You’ve already checked in today.\n\nThank you for staying consistent — try again tomorrow. 💙",
@@ -98,9 +66,6 @@ class DailyCheckIn(commands.Cog):
             await interaction.response.send_message(embed=embed, ephemeral=True)
             return
 
-        # Store their check-in as a new entry
-        self.save_checkin(guild_id, user_id, mood.value)
-
         embed = discord.Embed(
             title="🧠 Daily Check-In Logged",
             description=f"**Mood:** {mood.name}",
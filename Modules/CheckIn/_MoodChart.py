@@ -0,0 +1,276 @@
+import io
+import os
+import zlib
+import struct
+import hashlib
+import threading
+from pathlib import Path
+from collections import OrderedDict
+
+try:
+    from PIL import Image, ImageDraw
+except ImportError:
+    Image = None
+
+# --------------------------------------------------------
+# Mood trend chart for /checkinstats.
+#
+# One column per day of the window: its height is how good the mood was
+# (sad lowest, motivated highest), its colour is the mood, and a line
+# follows the 3-day average. Drawn with Pillow when it's installed, else
+# by a small pure-Python PNG writer; render_chart() is meant to run in a
+# process pool.
+#
+# Finished PNGs are cached in memory and under Data/Charts/Worker<n>/,
+# keyed by the user, the window and the last check-in, so a chart is only
+# drawn again once something in it changes. Both caches evict the least
+# recently used charts to stay under their size limit. Each process (one
+# per worker in sharded mode) keeps its own folder and limit, so workers
+# never evict each other's charts.
+# --------------------------------------------------------
+
+CHART_DIR = Path("Data/Charts")
+
+WIDTH = 640
+HEIGHT = 240
+MARGIN = 16
+
+BACKGROUND = (43, 45, 49)
+GRID = (64, 66, 72)
+MISSING = (88, 90, 96)
+TREND = (235, 235, 240)
+
+# By position in MOODS: happy, stressed, sad, neutral, motivated
+MOOD_COLORS = ((255, 204, 77), (255, 140, 66), (91, 141, 239), (160, 160, 170), (239, 83, 80))
+MOOD_SCORES = (4, 2, 1, 3, 5)
+LEVELS = max(MOOD_SCORES)
+
+
+# --------------------------------------------------------
+# Canvases
+# --------------------------------------------------------
+class _PngCanvas:
+    """RGB pixels in a bytearray, written out as a PNG by hand."""
+
+    def __init__(self, width: int, height: int, background: tuple):
+        self.width = width
+        self.height = height
+        self.pixels = bytearray(bytes(background) * (width * height))
+
+    def rect(self, x0: int, y0: int, x1: int, y1: int, color: tuple):
+        """Fills x0..x1, y0..y1 inclusive."""
+        x0, x1 = max(0, x0), min(self.width - 1, x1)
+        run = bytes(color) * (x1 - x0 + 1)
+        for y in range(max(0, y0), min(self.height - 1, y1) + 1):
+            start = (y * self.width + x0) * 3
+            self.pixels[start:start + len(run)] = run
+
+    def line(self, points: list, color: tuple, width: int):
+        half = width // 2
+        for (x0, y0), (x1, y1) in zip(points, points[1:]):
+            steps = max(abs(x1 - x0), abs(y1 - y0), 1)
+            for step in range(steps + 1):
+                x = x0 + (x1 - x0) * step // steps
+                y = y0 + (y1 - y0) * step // steps
+                self.rect(x - half, y - half, x + half, y + half, color)
+
+    def png(self) -> bytes:
+        def chunk(kind: bytes, data: bytes) -> bytes:
+            return struct.pack(">I", len(data)) + kind + data + struct.pack(">I", zlib.crc32(kind + data))
+
+        stride = self.width * 3
+        raw = b"".join(
+            b"\x00" + bytes(self.pixels[y * stride:(y + 1) * stride])
+            for y in range(self.height)
+        )
+        return (
+            b"\x89PNG\r\n\x1a\n"
+            + chunk(b"IHDR", struct.pack(">IIBBBBB", self.width, self.height, 8, 2, 0, 0, 0))
+            + chunk(b"IDAT", zlib.compress(raw, 6))
+            + chunk(b"IEND", b"")
+        )
+
+
+class _PillowCanvas:
+    def __init__(self, width: int, height: int, background: tuple):
+        self.image = Image.new("RGB", (width, height), background)
+        self.draw = ImageDraw.Draw(self.image)
+
+    def rect(self, x0: int, y0: int, x1: int, y1: int, color: tuple):
+        self.draw.rectangle((x0, y0, x1, y1), fill=color)
+
+    def line(self, points: list, color: tuple, width: int):
+        self.draw.line(points, fill=color, width=width, joint="curve")
+
+    def png(self) -> bytes:
+        buffer = io.BytesIO()
+        self.image.save(buffer, format="PNG", optimize=True)
+        return buffer.getvalue()
+
+
+# --------------------------------------------------------
+# Drawing (runs in the process pool)
+# --------------------------------------------------------
+def render_chart(codes: bytes) -> bytes:
+    """PNG of one day per entry of <codes> (MoodRollup codes, 0 = no check-in), oldest first."""
+    canvas = (_PillowCanvas if Image is not None else _PngCanvas)(WIDTH, HEIGHT, BACKGROUND)
+
+    left, top = MARGIN, MARGIN
+    plot_w, plot_h = WIDTH - 2 * MARGIN, HEIGHT - 2 * MARGIN
+    bottom = top + plot_h
+
+    for level in range(LEVELS + 1):
+        y = bottom - plot_h * level // LEVELS
+        canvas.rect(left, y, left + plot_w - 1, y, GRID)
+
+    days = max(1, len(codes))
+    slot = plot_w / days
+    gap = max(1, int(slot * 0.2))
+    trend = []
+    scores = []
+
+    for day, code in enumerate(codes):
+        x0 = left + int(day * slot) + gap // 2
+        x1 = left + int((day + 1) * slot) - (gap - gap // 2) - 1
+        centre = (x0 + x1) // 2
+
+        if code:
+            score = MOOD_SCORES[code - 1]
+            canvas.rect(x0, bottom - plot_h * score // LEVELS, x1, bottom - 1, MOOD_COLORS[code - 1])
+            scores.append(score)
+            recent = scores[-3:]
+            trend.append((centre, int(bottom - plot_h * (sum(recent) / len(recent)) / LEVELS)))
+        else:
+            canvas.rect(x0, bottom - 3, x1, bottom - 1, MISSING)
+
+    if len(trend) > 1:
+        canvas.line(trend, TREND, 3)
+
+    return canvas.png()
+
+
+# --------------------------------------------------------
+# Cache
+# --------------------------------------------------------
+def chart_folder(partition=None) -> Path:
+    """This process's chart folder: sharded workers each get their own."""
+    return CHART_DIR / f"Worker{partition.worker if partition is not None else 0}"
+
+
+def chart_key(guild_id, user_id, days: int, last_day, codes: bytes) -> str:
+    """
+    Cache key (and file name) of a chart. The window's codes are part of
+    it so a removed or backfilled check-in, or the window moving on to a
+    new day, gets a new chart even when the last check-in is unchanged.
+    """
+    digest = hashlib.sha1(codes).hexdigest()[:12]
+    return f"{guild_id}/{user_id}-{days}-{last_day or 0}-{digest}"
+
+
+class ChartCache:
+    """In-memory LRU of PNGs in front of a size-capped folder of them."""
+
+    def __init__(self, folder: Path = None, max_memory_bytes: int = 8 * 1024 * 1024,
+                 max_disk_bytes: int = 64 * 1024 * 1024):
+        self.folder = Path(folder) if folder is not None else chart_folder()
+        self.max_memory_bytes = max_memory_bytes
+        self.max_disk_bytes = max_disk_bytes
+
+        self._memory = OrderedDict()
+        self._memory_bytes = 0
+        # Total size of the folder, counted on first write
+        self._disk_bytes = None
+        self._disk_lock = threading.Lock()
+
+    # --------------- MEMORY (event loop) -----------------
+
+    def get(self, key: str):
+        png = self._memory.get(key)
+        if png is not None:
+            self._memory.move_to_end(key)
+        return png
+
+    def put(self, key: str, png: bytes):
+        if len(png) > self.max_memory_bytes:
+            return
+        old = self._memory.pop(key, None)
+        if old is not None:
+            self._memory_bytes -= len(old)
+
+        self._memory[key] = png
+        self._memory_bytes += len(png)
+        while self._memory_bytes > self.max_memory_bytes:
+            _, evicted = self._memory.popitem(last=False)
+            self._memory_bytes -= len(evicted)
+
+    # --------------- DISK (blocking) -----------------
+
+    def _path(self, key: str) -> Path:
+        return self.folder / f"{key}.png"
+
+    def read(self, key: str):
+        """The PNG saved under <key>, or None."""
+        path = self._path(key)
+        try:
+            png = path.read_bytes()
+        except FileNotFoundError:
+            return None
+        # mtime doubles as "last used" for eviction
+        os.utime(path)
+        return png
+
+    def write(self, key: str, png: bytes):
+        """Saves a PNG, drops the user's older chart of the same window and evicts past the limit."""
+        path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+
+        with self._disk_lock:
+            if self._disk_bytes is None:
+                self._disk_bytes = sum(file.stat().st_size for file in self.folder.rglob("*.png"))
+
+            user_id, days = path.name.split("-")[:2]
+            for older in path.parent.glob(f"{user_id}-{days}-*.png"):
+                if older != path:
+                    self._disk_bytes -= self._remove(older)
+
+            tmp_path = path.with_name(path.name + ".tmp")
+            tmp_path.write_bytes(png)
+            # Rewriting a key replaces its file rather than adding to the folder
+            self._disk_bytes += len(png) - self._size(path)
+            os.replace(tmp_path, path)
+
+            if self._disk_bytes > self.max_disk_bytes:
+                self._evict()
+
+    def _size(self, path: Path) -> int:
+        try:
+            return path.stat().st_size
+        except FileNotFoundError:
+            return 0
+
+    def _remove(self, path: Path) -> int:
+        try:
+            size = path.stat().st_size
+            path.unlink()
+            return size
+        except FileNotFoundError:
+            return 0
+
+    def _evict(self):
+        """Deletes the least recently used charts until the folder is at 80% of its limit."""
+        files = []
+        for file in self.folder.rglob("*.png"):
+            try:
+                st = file.stat()
+            except FileNotFoundError:
+                continue
+            files.append((st.st_mtime, st.st_size, file))
+        files.sort()
+
+        total = sum(size for _, size, _ in files)
+        target = self.max_disk_bytes * 0.8
+        for _, size, file in files:
+            if total <= target:
+                break
+            total -= self._remove(file)
+        self._disk_bytes = total
@@ -1,37 +1,80 @@
 import discord
 from discord import app_commands
-from discord.ext import commands
-import json
+from discord.ext import commands, tasks
+import os
 import random
+import asyncio
+import logging
 from pathlib import Path
 
+from Modules.Coping._CopingMap import CopingMap, load_coping_map, file_stamp
+from Modules.Core._Metrics import timed_io
+
 MAP_PATH = Path("Modules/Maps/Coping.json")
 
+log = logging.getLogger("Mellow.Coping")
+
 
 class CopingCog(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
 
-        # Load JSON map
+        # Swapped as a whole on reload; commands read it once and keep that snapshot
+        self.coping_map = CopingMap({})
+        self._bad_stamp = None
+
+    async def cog_load(self):
+        # Parse + validate off the event loop
         try:
-            with MAP_PATH.open("r", encoding="utf-8") as f:
-                self.coping_map = json.load(f)
+            self.coping_map = await asyncio.to_thread(timed_io, "coping", "read", load_coping_map, MAP_PATH)
+            log.info(f"Loaded {len(self.coping_map)} coping topics from {MAP_PATH}")
         except Exception as e:
-            print(f"[CopingCog] Failed to load {MAP_PATH}: {e}")
-            self.coping_map = {}
+            log.error(f"Failed to load {MAP_PATH}: {e}")
+            self._bad_stamp = file_stamp(MAP_PATH)
+
+        self.watch_map.change_interval(seconds=float(os.getenv("COPING_RELOAD_SECONDS", "5")))
+        self.watch_map.start()
+
+    async def cog_unload(self):
+        self.watch_map.cancel()
 
     # --------------------------------------------------------
-    # Autocomplete for /cope
+    # Hot reload: pick up edits to Coping.json without a restart
     # --------------------------------------------------------
-    async def topic_autocomplete(self, interaction: discord.Interaction, current: str):
-        current = current.lower()
-        suggestions = []
+    @tasks.loop(seconds=5)
+    async def watch_map(self):
+        # An exception escaping a tasks.loop stops it for good, so none may
+        try:
+            await self.check_map()
+        except Exception as e:
+            log.error(f"Coping map check failed, trying again next time: {e}")
 
-        for topic in self.coping_map.keys():
-            if current in topic:
-                suggestions.append(app_commands.Choice(name=topic, value=topic))
+    async def check_map(self):
+        stamp = await asyncio.to_thread(timed_io, "coping", "stamp", file_stamp, MAP_PATH)
+        if stamp is None or stamp == self.coping_map.stamp or stamp == self._bad_stamp:
+            return
 
-        return suggestions[:25]  # Discord limit
+        try:
+            new_map = await asyncio.to_thread(timed_io, "coping", "read", load_coping_map, MAP_PATH)
+        except Exception as e:
+            # Keep serving the last good version; only complain once per bad edit
+            self._bad_stamp = stamp
+            log.error(f"Ignoring invalid {MAP_PATH}, keeping previous version: {e}")
+            return
+
+        self.coping_map = new_map
+        self._bad_stamp = None
+        log.info(f"Reloaded {len(new_map)} coping topics from {MAP_PATH}")
+
+    # --------------------------------------------------------
+    # Autocomplete for /cope
+    # --------------------------------------------------------
+    async def topic_autocomplete(self, interaction: discord.Interaction, current: str):
+        # Ranked: name prefix, then word prefix, then typo-tolerant matches
+        return [
+            app_commands.Choice(name=topic, value=topic)
+            for topic in self.coping_map.index.suggest(current)
+        ]
 
     # --------------------------------------------------------
     # /cope
@@ -44,43 +87,30 @@ class CopingCog(commands.Cog):
     @app_commands.autocomplete(topic=topic_autocomplete)
     async def cope(self, interaction: discord.Interaction, topic: str):
 
-        topic = topic.lower().strip()
+        coping_map = self.coping_map
+
+        # Accepts the topic key or any of its aliases
+        topic = coping_map.index.resolve(topic)
 
-        if topic not in self.coping_map:
+        if topic is None:
             await interaction.response.send_message(
                 "I don’t have a coping exercise for that yet — more are coming soon 💙",
                 ephemeral=True
             )
             return
 
-        # Get list of responses for the topic
-        responses = self.coping_map[topic].get("responses", [])
+        # Pre-built embeds for the topic's responses
+        embeds = coping_map.embeds[topic]
 
-        if not responses:
+        if not embeds:
             await interaction.response.send_message(
                 "Something went wrong — no responses available for this topic 💛",
                 ephemeral=True
             )
             return
 
-        # Pick a random response
-        data = random.choice(responses)
-
-        # Build embed
-        embed = discord.Embed(
-            title=data.get("title", "Coping Exercise"),
-            description=data.get("description", ""),
-            color=int(data.get("color", "85C1E9"), 16)
-        )
-
-        embed.add_field(
-            name="More Support",
-            value=f"[{data.get('link_text', 'Learn more')}]({data.get('link_url', '')})",
-            inline=False
-        )
-
-        # Send privately
-        await interaction.response.send_message(embed=embed, ephemeral=True)
+        # Pick a random response and send privately
+        await interaction.response.send_message(embed=random.choice(embeds), ephemeral=True)
 
 
 async def setup(bot):
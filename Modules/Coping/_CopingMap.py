@@ -0,0 +1,97 @@
+import json
+from pathlib import Path
+
+import discord
+
+from Modules.Coping._TopicIndex import TopicIndex
+from Modules.Core._Metrics import count_bytes
+
+# --------------------------------------------------------
+# A fully parsed, validated snapshot of Coping.json: topic index plus
+# ready-to-send embeds for every response. Built off the event loop and
+# never modified afterwards, so the cog can swap snapshots atomically
+# while /cope calls are still using the old one.
+# --------------------------------------------------------
+
+
+def build_embed(data: dict) -> discord.Embed:
+    embed = discord.Embed(
+        title=data.get("title", "Coping Exercise"),
+        description=data.get("description", ""),
+        color=int(data.get("color", "85C1E9"), 16)
+    )
+
+    embed.add_field(
+        name="More Support",
+        value=f"[{data.get('link_text', 'Learn more')}]({data.get('link_url', '')})",
+        inline=False
+    )
+    return embed
+
+
+def validate_map(coping_map) -> None:
+    """Raises ValueError describing the first problem found."""
+    if not isinstance(coping_map, dict):
+        raise ValueError("top level must be an object of topics")
+
+    for topic, body in coping_map.items():
+        if not isinstance(body, dict):
+            raise ValueError(f"topic '{topic}' must be an object")
+
+        aliases = body.get("aliases", [])
+        if not isinstance(aliases, list) or not all(isinstance(a, str) for a in aliases):
+            raise ValueError(f"topic '{topic}': aliases must be a list of strings")
+
+        responses = body.get("responses", [])
+        if not isinstance(responses, list):
+            raise ValueError(f"topic '{topic}': responses must be a list")
+
+        for pos, response in enumerate(responses):
+            if not isinstance(response, dict):
+                raise ValueError(f"topic '{topic}' response {pos}: must be an object")
+
+            for field in ("title", "description", "link_text", "link_url", "color"):
+                if field in response and not isinstance(response[field], str):
+                    raise ValueError(f"topic '{topic}' response {pos}: {field} must be a string")
+
+            try:
+                color = int(response.get("color", "85C1E9"), 16)
+            except ValueError:
+                raise ValueError(f"topic '{topic}' response {pos}: color '{response['color']}' isn't hex")
+            if not 0 <= color <= 0xFFFFFF:
+                raise ValueError(f"topic '{topic}' response {pos}: color is out of range")
+
+
+class CopingMap:
+    def __init__(self, coping_map: dict, stamp=None):
+        self.topics = coping_map
+        self.stamp = stamp
+        self.index = TopicIndex(coping_map)
+        self.embeds = {
+            topic: [build_embed(response) for response in body.get("responses", [])]
+            for topic, body in coping_map.items()
+        }
+
+    def __len__(self):
+        return len(self.topics)
+
+
+def file_stamp(path: Path):
+    """(mtime, size) of the map file, or None if it's missing or can't be checked."""
+    try:
+        st = path.stat()
+    except OSError:
+        return None
+    return (st.st_mtime_ns, st.st_size)
+
+
+def load_coping_map(path: Path) -> CopingMap:
+    """Blocking: read, validate and pre-build everything. Raises on a bad file."""
+    stamp = file_stamp(path)
+
+    data = path.read_bytes()
+    count_bytes(read=len(data))
+    coping_map = json.loads(data)
+
+    validate_map(coping_map)
+    return CopingMap(coping_map, stamp)
@@ -0,0 +1,170 @@
+import re
+import math
+import heapq
+from collections import Counter
+from itertools import chain
+
+# --------------------------------------------------------
+# Search index over the coping map, built once when the map is loaded.
+#
+#   prefix trie over every full topic name / alias  -> "anx" finds anxiety
+#   prefix trie over every word in them             -> "doubt" finds self_doubt
+#   trigram index                                   -> "anxeity" still finds anxiety
+#
+# Each trie node keeps the best few topics beneath it, so a lookup is one
+# walk down the trie no matter how big the map gets.
+# --------------------------------------------------------
+
+MAX_SUGGESTIONS = 25
+FUZZY_MIN_SCORE = 0.3
+# Typo matching only kicks in for queries this long, when nothing matched by prefix
+FUZZY_MIN_LENGTH = 3
+
+_SEPARATORS = re.compile(r"[\s_\-]+")
+
+
+def normalize(text: str) -> str:
+    """Lowercase, with underscores/dashes/runs of spaces folded to one space."""
+    return _SEPARATORS.sub(" ", text.lower()).strip()
+
+
+def trigrams(term: str) -> set:
+    padded = f"  {term} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class _PrefixTrie:
+    def __init__(self, limit: int):
+        self.limit = limit
+        self.root = {}
+
+    def insert(self, term: str, topic_id: int):
+        """Terms must be inserted best-first; each node keeps the first <limit> topics."""
+        node = self.root
+        for char in term:
+            node = node.setdefault(char, {})
+            best = node.setdefault("", [])
+            if len(best) < self.limit and topic_id not in best:
+                best.append(topic_id)
+
+    def lookup(self, prefix: str) -> list:
+        node = self.root
+        for char in prefix:
+            node = node.get(char)
+            if node is None:
+                return []
+        return node.get("", [])
+
+
+class TopicIndex:
+    def __init__(self, coping_map: dict, limit: int = MAX_SUGGESTIONS):
+        self.limit = limit
+        self.topics = list(coping_map.keys())
+
+        # term -> topic id (names and aliases), and topic id -> words in its terms
+        self.terms = {}
+        self.topic_words = []
+
+        for topic_id, topic in enumerate(self.topics):
+            names = [topic] + list(coping_map[topic].get("aliases", []))
+            words = set()
+            for name in names:
+                term = normalize(name)
+                if term and term not in self.terms:
+                    self.terms[term] = topic_id
+                    words.update(term.split(" "))
+            self.topic_words.append(words)
+
+        # Shorter terms first, so "sad" outranks "sadness" for the query "sad"
+        ordered = sorted(self.terms.items(), key=lambda item: (len(item[0]), item[0]))
+
+        self.name_trie = _PrefixTrie(limit)
+        self.word_trie = _PrefixTrie(limit)
+        for term, topic_id in ordered:
+            self.name_trie.insert(term, topic_id)
+            for word in term.split(" "):
+                self.word_trie.insert(word, topic_id)
+
+        # trigram -> term numbers; term number -> (topic id, trigram count)
+        self.gram_postings = {}
+        self.term_info = []
+        for term_no, (term, topic_id) in enumerate(self.terms.items()):
+            grams = trigrams(term)
+            self.term_info.append((topic_id, len(grams)))
+            for gram in grams:
+                self.gram_postings.setdefault(gram, []).append(term_no)
+
+    def __len__(self):
+        return len(self.topics)
+
+    def resolve(self, text: str):
+        """Maps a topic name or alias (any case/spacing) to its topic key, or None."""
+        topic_id = self.terms.get(normalize(text))
+        return None if topic_id is None else self.topics[topic_id]
+
+    def suggest(self, query: str) -> list:
+        """
+        Ranked topic keys for autocomplete: whole-name prefix matches, then
+        word prefix matches, and only if neither found anything, fuzzy matches.
+        """
+        query = normalize(query)
+        if not query:
+            return self.topics[:self.limit]
+
+        results = []
+        seen = set()
+
+        def take(topic_ids):
+            for topic_id in topic_ids:
+                if topic_id not in seen:
+                    seen.add(topic_id)
+                    results.append(self.topics[topic_id])
+                    if len(results) >= self.limit:
+                        return True
+            return False
+
+        if take(self.name_trie.lookup(query)):
+            return results
+
+        # Every word typed must prefix-match; rank by the last (still being typed) word
+        words = query.split(" ")
+        candidates = self.word_trie.lookup(words[-1])
+        if len(words) > 1:
+            candidates = [t for t in candidates if self._has_words(t, words[:-1])]
+        take(candidates)
+
+        if results or len(query) < FUZZY_MIN_LENGTH:
+            return results
+
+        take(self._fuzzy(query))
+        return results
+
+    def _has_words(self, topic_id: int, words: list) -> bool:
+        topic_words = self.topic_words[topic_id]
+        return all(any(w.startswith(word) for w in topic_words) for word in words)
+
+    def _fuzzy(self, query: str) -> list:
+        """Topic ids ranked by trigram similarity, best first."""
+        query_grams = trigrams(query)
+
+        # Counter's C loop does the heavy lifting over the posting lists
+        shared = Counter(chain.from_iterable(
+            self.gram_postings.get(gram, ()) for gram in query_grams
+        ))
+
+        # score = shared / (query + term - shared) can't reach the bar below this
+        min_shared = math.ceil(FUZZY_MIN_SCORE * len(query_grams))
+
+        best = {}
+        for term_no, count in shared.items():
+            if count < min_shared:
+                continue
+            topic_id, term_grams = self.term_info[term_no]
+            score = count / (len(query_grams) + term_grams - count)
+            if score >= FUZZY_MIN_SCORE and score > best.get(topic_id, 0.0):
+                best[topic_id] = score
+
+        return heapq.nsmallest(
+            self.limit, best,
+            key=lambda topic_id: (-best[topic_id], self.topics[topic_id])
+        )
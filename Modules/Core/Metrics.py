@@ -0,0 +1,159 @@
+import os
+import math
+import time
+import asyncio
+import logging
+
+from aiohttp import web
+from discord.ext import commands
+
+from Modules.Core._Storage import get_storage
+from Modules.Core._Metrics import get_metrics, sample_loop_lag
+
+# --------------------------------------------------------
+# Exposes the metrics registry:
+#   - GET /metrics on METRICS_HOST:METRICS_PORT (Prometheus text), only
+#     when METRICS_PORT is set; sharded workers add their number to it
+#   - !metrics for the owner, as a short summary in Discord
+# Also runs the event loop lag sampler.
+# --------------------------------------------------------
+
+log = logging.getLogger("Mellow.Metrics")
+
+LAG_INTERVAL = 1.0
+# Commands answered through _Deferral.respond()
+HEAVY_COMMANDS = ("myjournallist", "checkinhistory", "checkinstats")
+
+
+def _ms(seconds: float) -> str:
+    return "inf" if math.isinf(seconds) else f"{seconds * 1000:.0f}ms"
+
+
+class MetricsCog(commands.Cog):
+    def __init__(self, bot):
+        self.bot = bot
+        self.metrics = get_metrics()
+        self.storage = get_storage()
+
+        self._lag_task = None
+        self._runner = None
+
+    async def cog_load(self):
+        self.metrics.add_collector(self.collect_storage)
+        self._lag_task = asyncio.create_task(sample_loop_lag(LAG_INTERVAL))
+
+        port = int(os.getenv("METRICS_PORT", "0"))
+        if port:
+            if self.storage.partition is not None:
+                port += self.storage.partition.worker
+            await self.start_server(os.getenv("METRICS_HOST", "127.0.0.1"), port)
+
+    async def cog_unload(self):
+        self.metrics.remove_collector(self.collect_storage)
+        if self._lag_task is not None:
+            self._lag_task.cancel()
+        if self._runner is not None:
+            await self._runner.cleanup()
+
+    # --------------------------------------------------------
+    # HTTP endpoint
+    # --------------------------------------------------------
+    async def start_server(self, host: str, port: int):
+        app = web.Application()
+        app.router.add_get("/metrics", self.handle_metrics)
+
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        try:
+            await web.TCPSite(self._runner, host, port).start()
+        except OSError as e:
+            log.error(f"Could not serve metrics on {host}:{port}: {e}")
+            await self._runner.cleanup()
+            self._runner = None
+            return
+        log.info(f"Serving metrics on http://{host}:{port}/metrics")
+
+    async def handle_metrics(self, request: web.Request) -> web.Response:
+        return web.Response(text=self.metrics.render(), content_type="text/plain", charset="utf-8")
+
+    def collect_storage(self) -> list:
+        stats = self.storage.cache.stats()
+        return [
+            ("mellow_cache_entries", (), stats["entries"], "gauge"),
+            ("mellow_cache_bytes", (), stats["bytes"], "gauge"),
+            ("mellow_cache_hits_total", (), stats["hits"], "counter"),
+            ("mellow_cache_misses_total", (), stats["misses"], "counter"),
+            ("mellow_cache_evictions_total", (), stats["evictions"], "counter"),
+            ("mellow_cache_invalidations_total", (), stats["invalidations"], "counter"),
+            ("mellow_cache_stale_total", (), stats["stale"], "counter"),
+            ("mellow_last_checkins_entries", (), len(self.storage.last_checkins), "gauge"),
+            ("mellow_write_behind_pending_users", (), self.storage.pending_users(), "gauge"),
+            ("mellow_write_behind_flushes_total", (), self.storage.flushes, "counter"),
+            ("mellow_write_behind_records_total", (), self.storage.flushed_records, "counter"),
+        ]
+
+    # --------------------------------------------------------
+    # !metrics
+    # --------------------------------------------------------
+    def summary(self) -> str:
+        metrics = self.metrics
+        lines = ["Commands          calls  err    p50    p99"]
+
+        for labels, histogram in sorted(metrics.matching("mellow_command_latency_seconds").items()):
+            command, kind = labels[0][1], labels[1][1]
+            errors = metrics.counter("mellow_command_total", labels + (("status", "error"),))
+            name = command if kind == "command" else f"{command} (ac)"
+            lines.append(
+                f"{name[:16]:<16} {histogram.count:>6} {errors:>4.0f} "
+                f"{_ms(histogram.quantile(0.5)):>6} {_ms(histogram.quantile(0.99)):>6}"
+            )
+
+        lines.append("")
+        lines.append("Storage I/O       calls    p50    p99")
+        for labels, histogram in sorted(metrics.matching("mellow_storage_io_seconds").items()):
+            name = f"{labels[0][1]} {labels[1][1]}"
+            lines.append(
+                f"{name[:16]:<16} {histogram.count:>6} "
+                f"{_ms(histogram.quantile(0.5)):>6} {_ms(histogram.quantile(0.99)):>6}"
+            )
+        for subsystem in ("journal", "checkin", "storage", "coping"):
+            read = metrics.counter("mellow_storage_io_bytes_total", (("subsystem", subsystem), ("direction", "read")))
+            written = metrics.counter("mellow_storage_io_bytes_total", (("subsystem", subsystem), ("direction", "write")))
+            if read or written:
+                lines.append(f"{subsystem}: {read / 1024:.0f} KiB read, {written / 1024:.0f} KiB written")
+
+        replies = {
+            path: sum(
+                metrics.counter("mellow_responses_total", (("command", command), ("path", path)))
+                for command in HEAVY_COMMANDS
+            )
+            for path in ("deferred", "direct")
+        }
+        if replies["deferred"] or replies["direct"]:
+            lines.append(f"Heavy replies deferred: {replies['deferred']:.0f} of {sum(replies.values()):.0f}")
+
+        lag = metrics.histogram("mellow_event_loop_lag_seconds")
+        if lag is not None:
+            lines.append("")
+            lines.append(f"Event loop lag: p50 {_ms(lag.quantile(0.5))}, p99 {_ms(lag.quantile(0.99))}")
+
+        stats = self.storage.cache.stats()
+        lines.append(
+            f"Cache: {stats['entries']} docs, {stats['bytes'] / 1024 / 1024:.1f} MiB, "
+            f"hit ratio {stats['hit_ratio']:.0%}"
+        )
+        lines.append(f"Uptime: {(time.time() - metrics.started_at) / 3600:.1f} h")
+
+        text = "\n".join(lines)
+        if len(text) > 1900:
+            text = text[:1900] + "\n…"
+        return text
+
+    @commands.command(name="metrics")
+    @commands.is_owner()
+    async def metrics_command(self, ctx):
+        await ctx.reply(f"```\n{self.summary()}\n```", mention_author=False)
+
+
+async def setup(bot):
+    await bot.add_cog(MetricsCog(bot))
@@ -0,0 +1,47 @@
+import logging
+
+from discord.ext import commands, tasks
+
+from Modules.Core._Storage import get_storage
+
+# --------------------------------------------------------
+# Write-behind flushing.
+#
+# With WRITE_BEHIND_SECONDS set, journal and check-in writes are buffered
+# in the storage layer; this loop writes them out every that many seconds
+# as one batch. Storage also flushes early once WRITE_BEHIND_MAX_DIRTY
+# users are waiting, and a last time when it closes.
+# --------------------------------------------------------
+
+log = logging.getLogger("Mellow.StorageFlush")
+
+
+class StorageFlushCog(commands.Cog):
+    def __init__(self, bot):
+        self.bot = bot
+        self.storage = get_storage()
+
+    async def cog_load(self):
+        if self.storage.write_behind > 0:
+            self.flush_pending.change_interval(seconds=self.storage.write_behind)
+            self.flush_pending.start()
+            log.info(f"Write-behind on: flushing every {self.storage.write_behind:g}s "
+                     f"or at {self.storage.max_dirty} dirty users")
+
+    async def cog_unload(self):
+        if self.flush_pending.is_running():
+            # Let a flush in progress finish rather than cancel it halfway
+            self.flush_pending.stop()
+            await self.storage.flush()
+
+    @tasks.loop(seconds=1)
+    async def flush_pending(self):
+        await self.storage.flush()
+
+    @flush_pending.error
+    async def flush_pending_error(self, error):
+        log.error(f"Write-behind flush failed: {error}")
+
+
+async def setup(bot):
+    await bot.add_cog(StorageFlushCog(bot))
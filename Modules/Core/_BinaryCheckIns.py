@@ -0,0 +1,321 @@
+import sys
+import mmap
+import struct
+import threading
+import contextlib
+from array import array
+from collections import OrderedDict
+from pathlib import Path
+from datetime import date
+
+from Modules.Core._Storage import JsonBackend, JOURNAL, CHECKIN, ROLLUP_DIR, JOURNAL_DIR
+from Modules.Core._MoodRollup import MOODS, MOOD_CODES
+from Modules.Core._CheckInSeries import CheckInSeries
+from Modules.Core._Metrics import count_bytes
+
+# --------------------------------------------------------
+# Fixed-width binary check-in store (CHECKIN_FORMAT=binary).
+#
+# One pair of files per guild under Data/CheckInsBin/<guild>/:
+#
+#   records.bin    blocks of 32 check-ins, each block 160 bytes:
+#                    32 x u32  day ordinals (little-endian)
+#                    32 x u8   mood codes: 0 = free slot, 1-5 = MOODS,
+#                              255 = deleted
+#   directory.bin  append-only (user_id u64, block u32) entries; a
+#                  user's blocks are theirs in the order listed
+#
+# records.bin is read through mmap, so loading a user touches only their
+# own blocks and turns them into arrays with no parsing at all. Each open
+# guild holds two file descriptors, so only the most recently used
+# max_open_guilds stay open; the rest are closed and reopened on demand.
+# --------------------------------------------------------
+
+BINARY_CHECKIN_DIR = Path("Data/CheckInsBin")
+
+BLOCK_SLOTS = 32
+DAYS_SIZE = BLOCK_SLOTS * 4
+BLOCK_SIZE = DAYS_SIZE + BLOCK_SLOTS
+
+FREE = 0
+DELETED = 0xFF
+
+DIR_ENTRY = struct.Struct("<QI")
+DAY = struct.Struct("<I")
+
+
+class _GuildFile:
+    """One guild's records + directory. Every method must be called holding .lock."""
+
+    def __init__(self, folder: Path):
+        self.folder = folder
+        self.records_path = folder / "records.bin"
+        self.directory_path = folder / "directory.bin"
+        self.lock = threading.Lock()
+
+        self.closed = False
+
+        folder.mkdir(parents=True, exist_ok=True)
+        self.records_path.touch(exist_ok=True)
+        self._file = self.records_path.open("r+b")
+        self._map = None
+        self.block_count = 0
+        try:
+            self._remap()
+            self.blocks = read_directory(self.directory_path, self.block_count)
+        except BaseException:
+            self.close()
+            raise
+
+    def _remap(self):
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+
+        # Ignore a partly written last block (crash while growing the file)
+        self.block_count = self.records_path.stat().st_size // BLOCK_SIZE
+        if self.block_count:
+            self._map = mmap.mmap(self._file.fileno(), self.block_count * BLOCK_SIZE)
+
+    def _block(self, block: int):
+        """(day ordinals, mood codes) of one block, straight off the map."""
+        offset = block * BLOCK_SIZE
+        days = array("I")
+        days.frombytes(self._map[offset:offset + DAYS_SIZE])
+        if sys.byteorder == "big":
+            days.byteswap()
+        return days, self._map[offset + DAYS_SIZE:offset + BLOCK_SIZE]
+
+    def _new_block(self, user_id: int) -> int:
+        # Grow the records first: a directory entry must never point past the end
+        self._file.seek(self.block_count * BLOCK_SIZE)
+        self._file.write(bytes(BLOCK_SIZE))
+        self._file.flush()
+        block = self.block_count
+        self._remap()
+
+        with self.directory_path.open("ab") as f:
+            f.write(DIR_ENTRY.pack(user_id, block))
+
+        self.blocks.setdefault(user_id, []).append(block)
+        return block
+
+    # ---------------------------------------------------
+
+    def read(self, user_id: int):
+        """Returns (day ordinals, mood codes) of the user's live check-ins, unsorted."""
+        days = array("I")
+        codes = bytearray()
+
+        blocks = self.blocks.get(user_id, ())
+        for block in blocks:
+            block_days, block_codes = self._block(block)
+            for slot, code in enumerate(block_codes):
+                if code != FREE and code != DELETED:
+                    days.append(block_days[slot])
+                    codes.append(code)
+        count_bytes(read=len(blocks) * BLOCK_SIZE)
+        return days, codes
+
+    def stamp(self, user_id: int):
+        """(used slots, deleted slots): changes on every append or delete."""
+        used = deleted = 0
+        for block in self.blocks.get(user_id, ()):
+            _, block_codes = self._block(block)
+            used += BLOCK_SLOTS - block_codes.count(FREE)
+            deleted += block_codes.count(DELETED)
+        return (used, deleted)
+
+    def append(self, user_id: int, day: int, code: int):
+        blocks = self.blocks.get(user_id)
+        block = slot = None
+
+        if blocks:
+            _, block_codes = self._block(blocks[-1])
+            slot = block_codes.find(FREE)
+            if slot != -1:
+                block = blocks[-1]
+
+        if block is None:
+            block = self._new_block(user_id)
+            slot = 0
+
+        # Day first: a slot only counts once its mood byte is set
+        offset = block * BLOCK_SIZE
+        self._map[offset + slot * 4:offset + slot * 4 + 4] = DAY.pack(day)
+        self._map[offset + DAYS_SIZE + slot] = code
+        count_bytes(written=DAY.size + 1)
+
+    def delete(self, user_id: int, day: int) -> int:
+        removed = 0
+        for block in self.blocks.get(user_id, ()):
+            block_days, block_codes = self._block(block)
+            for slot, code in enumerate(block_codes):
+                if code != FREE and code != DELETED and block_days[slot] == day:
+                    self._map[block * BLOCK_SIZE + DAYS_SIZE + slot] = DELETED
+                    removed += 1
+        count_bytes(written=removed)
+        return removed
+
+    def close(self):
+        self.closed = True
+        try:
+            if self._map is not None:
+                self._map.flush()
+                self._map.close()
+                self._map = None
+        finally:
+            self._file.close()
+
+
+def read_directory(path: Path, block_count: int) -> dict:
+    """user_id -> [block numbers], skipping a torn tail or blocks that were never written."""
+    blocks = {}
+    try:
+        data = path.read_bytes()
+    except FileNotFoundError:
+        return blocks
+
+    usable = len(data) - len(data) % DIR_ENTRY.size
+    for user_id, block in DIR_ENTRY.iter_unpack(data[:usable]):
+        if block < block_count:
+            blocks.setdefault(user_id, []).append(block)
+    return blocks
+
+
+class BinaryCheckInBackend(JsonBackend):
+    """
+    JsonBackend with check-ins kept in the binary store instead of
+    per-user logs. Journals and rollups are unchanged.
+
+    Only the five known moods can be stored; anything else is refused.
+    """
+
+    # Check-ins are written in place, so only journal appends can be buffered
+    DEFERRABLE = frozenset({JOURNAL})
+
+    def __init__(self, journal_dir: Path = JOURNAL_DIR, binary_dir: Path = BINARY_CHECKIN_DIR,
+                 compact_threshold: float = 0.25, rollup_dir: Path = ROLLUP_DIR,
+                 max_open_guilds: int = 128):
+        super().__init__(journal_dir, compact_threshold=compact_threshold, rollup_dir=rollup_dir)
+        self.binary_dir = Path(binary_dir)
+        self.max_open_guilds = max(1, max_open_guilds)
+        # LRU of open guild files; always taken before any guild's own lock
+        self._guilds = OrderedDict()
+        self._guilds_lock = threading.Lock()
+
+    def _guild(self, guild_id, create: bool = False):
+        """The guild's open file, or None if it has no check-ins and <create> is False."""
+        guild_id = str(guild_id)
+        with self._guilds_lock:
+            guild = self._guilds.get(guild_id)
+            if guild is not None:
+                self._guilds.move_to_end(guild_id)
+                return guild
+
+            folder = self.binary_dir / guild_id
+            if not create and not (folder / "records.bin").exists():
+                return None
+
+            while len(self._guilds) >= self.max_open_guilds:
+                _, evicted = self._guilds.popitem(last=False)
+                # Waits for a call in progress; nobody can reopen it meanwhile
+                with evicted.lock:
+                    evicted.close()
+
+            guild = self._guilds[guild_id] = _GuildFile(folder)
+            return guild
+
+    @contextlib.contextmanager
+    def _locked(self, guild_id, create: bool = False):
+        """The guild's open file with its lock held (None if it has no check-ins)."""
+        while True:
+            guild = self._guild(guild_id, create)
+            if guild is None:
+                yield None
+                return
+            with guild.lock:
+                # Evicted between the lookup and the lock: open it again
+                if not guild.closed:
+                    yield guild
+                    return
+
+    # --------------- LISTING -----------------
+
+    def iter_checkin_users(self):
+        if not self.binary_dir.exists():
+            return
+        for guild_folder in self.binary_dir.iterdir():
+            records = guild_folder / "records.bin"
+            if not records.exists():
+                continue
+            block_count = records.stat().st_size // BLOCK_SIZE
+            for user_id in read_directory(guild_folder / "directory.bin", block_count):
+                yield guild_folder.name, str(user_id)
+
+    # --------------- CHECK-INS -----------------
+
+    def read_checkin_series(self, guild_id, user_id) -> CheckInSeries:
+        with self._locked(guild_id) as guild:
+            if guild is None:
+                return CheckInSeries()
+            days, codes = guild.read(int(user_id))
+
+        # Stored codes are 1-based, the series' are 0-based into MOODS
+        return CheckInSeries.from_arrays(days, array("B", (code - 1 for code in codes)))
+
+    def load_checkins(self, guild_id, user_id) -> list:
+        return self.read_checkin_series(guild_id, user_id).entries()
+
+    def append_checkin(self, guild_id, user_id, date_str: str, mood: str) -> bool:
+        code = MOOD_CODES.get(str(mood).lower())
+        if code is None:
+            raise ValueError(f"mood '{mood}' can't be stored in the binary format (expected one of {MOODS})")
+
+        day = date.fromisoformat(date_str).toordinal()
+
+        with self._locked(guild_id, create=True) as guild:
+            days, _ = guild.read(int(user_id))
+            if day in days:
+                return False
+            guild.append(int(user_id), day, code)
+        return True
+
+    def delete_checkin(self, guild_id, user_id, date_str: str) -> bool:
+        with self._locked(guild_id) as guild:
+            if guild is None:
+                return False
+            return guild.delete(int(user_id), date.fromisoformat(date_str).toordinal()) > 0
+
+    def import_user(self, guild_id, user_id, rows):
+        """
+        Bulk-writes (day ordinal, mood) rows for one user without the
+        per-row duplicate check. Used by the converter.
+        """
+        with self._locked(guild_id, create=True) as guild:
+            for day, mood in rows:
+                guild.append(int(user_id), day, MOOD_CODES[mood])
+
+    # --------------- MAINTENANCE -----------------
+
+    def stamp(self, kind: str, guild_id, user_id):
+        if kind != CHECKIN:
+            return super().stamp(kind, guild_id, user_id)
+
+        with self._locked(guild_id) as guild:
+            if guild is None:
+                return None
+            return guild.stamp(int(user_id))
+
+    def compact(self, kind: str, guild_id, user_id) -> bool:
+        if kind != CHECKIN:
+            return super().compact(kind, guild_id, user_id)
+        # Deleted slots are small and fixed-size; they're left in place
+        return False
+
+    def close(self):
+        with self._guilds_lock:
+            for guild in self._guilds.values():
+                with guild.lock:
+                    guild.close()
+            self._guilds.clear()
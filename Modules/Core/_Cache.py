@@ -0,0 +1,125 @@
+import sys
+import time
+from collections import OrderedDict
+
+# --------------------------------------------------------
+# Bounded LRU cache of parsed per-user documents (journal entry lists,
+# check-in logs). Shared by every cog through the storage layer, so an
+# autocomplete keystroke doesn't re-read and re-parse the user's file.
+# --------------------------------------------------------
+
+
+def estimate_size(doc) -> int:
+    """Rough in-memory size of a parsed list of flat dicts, in bytes."""
+    if hasattr(doc, "estimated_size"):
+        return doc.estimated_size()
+
+    size = sys.getsizeof(doc)
+    for entry in doc:
+        size += sys.getsizeof(entry)
+        for value in entry.values():
+            size += sys.getsizeof(value)
+    return size
+
+
+class CachedDoc:
+    __slots__ = ("value", "stamp", "size", "checked_at")
+
+    def __init__(self, value, stamp, size: int):
+        self.value = value
+        self.stamp = stamp
+        self.size = size
+        self.checked_at = time.monotonic()
+
+
+class DocumentCache:
+    """
+    LRU keyed by (kind, guild_id, user_id), bounded by entry count and
+    approximate bytes. Each entry remembers the backend's stamp (mtime and
+    size of the file) so edits made outside the bot can be caught.
+    """
+
+    def __init__(self, max_entries: int = 2048, max_bytes: int = 64 * 1024 * 1024,
+                 revalidate_after: float = 2.0):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.revalidate_after = revalidate_after
+
+        self._docs = OrderedDict()
+        self.total_bytes = 0
+        # Called as on_remove(key, CachedDoc, evicted) whenever an entry leaves
+        self.on_remove = None
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+        self.stale = 0
+
+    def __len__(self):
+        return len(self._docs)
+
+    def get(self, key):
+        """Returns the CachedDoc (marked recently used) or None."""
+        cached = self._docs.get(key)
+        if cached is not None:
+            self._docs.move_to_end(key)
+        return cached
+
+    def needs_revalidation(self, cached: CachedDoc) -> bool:
+        return time.monotonic() - cached.checked_at >= self.revalidate_after
+
+    def mark_checked(self, cached: CachedDoc):
+        cached.checked_at = time.monotonic()
+
+    def put(self, key, value, stamp):
+        self.invalidate(key, count=False)
+
+        size = estimate_size(value)
+        if size > self.max_bytes:
+            return
+
+        self._docs[key] = CachedDoc(value, stamp, size)
+        self.total_bytes += size
+
+        while len(self._docs) > self.max_entries or self.total_bytes > self.max_bytes:
+            evicted_key, evicted = self._docs.popitem(last=False)
+            self.total_bytes -= evicted.size
+            self.evictions += 1
+            if self.on_remove is not None:
+                self.on_remove(evicted_key, evicted, True)
+
+    def updated(self, key, stamp, added_bytes: int = 0):
+        """The cached value was updated in place by a write; keep it instead of dropping it."""
+        cached = self._docs.get(key)
+        if cached is None:
+            return
+
+        cached.stamp = stamp
+        cached.size += added_bytes
+        self.total_bytes += added_bytes
+        self.mark_checked(cached)
+
+    def invalidate(self, key, count: bool = True):
+        cached = self._docs.pop(key, None)
+        if cached is not None:
+            self.total_bytes -= cached.size
+            if count:
+                self.invalidations += 1
+            if self.on_remove is not None:
+                self.on_remove(key, cached, False)
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._docs),
+            "bytes": self.total_bytes,
+            "max_entries": self.max_entries,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+            "stale": self.stale
+        }
@@ -0,0 +1,113 @@
+from array import array
+from bisect import bisect_left, bisect_right
+from datetime import date
+
+from Modules.Core._MoodRollup import MOODS
+
+# --------------------------------------------------------
+# In-memory form of a user's check-in log, built once per cache load.
+#
+#   days[i]   -> date ordinal of check-in i (sorted, oldest first)
+#   codes[i]  -> its mood, as an index into .moods
+#
+# Dates are parsed when the log is loaded, so a window query is two
+# bisects and a slice instead of parsing and filtering the whole history.
+# --------------------------------------------------------
+
+
+class CheckInSeries:
+    def __init__(self, history: list = ()):
+        # Known moods first; anything else found in old data is appended
+        self.moods = list(MOODS)
+        self._codes = {mood: code for code, mood in enumerate(self.moods)}
+
+        rows = []
+        for entry in history:
+            try:
+                day = date.fromisoformat(entry.get("date")).toordinal()
+            except Exception:
+                continue
+            rows.append((day, self._code(str(entry.get("mood", "unknown")).lower())))
+
+        # Logs are nearly always in date order already, so this is cheap
+        rows.sort(key=lambda row: row[0])
+        self.days = array("I", (day for day, _ in rows))
+        self.codes = array("B", (code for _, code in rows))
+
+    @classmethod
+    def from_arrays(cls, days: array, codes: array) -> "CheckInSeries":
+        """Builds a series from day ordinals and 0-based MOODS codes, in any order."""
+        series = cls()
+        if any(days[i] > days[i + 1] for i in range(len(days) - 1)):
+            order = sorted(range(len(days)), key=days.__getitem__)
+            days = array("I", (days[i] for i in order))
+            codes = array("B", (codes[i] for i in order))
+        series.days = days
+        series.codes = codes
+        return series
+
+    def __len__(self):
+        return len(self.days)
+
+    def _code(self, mood: str) -> int:
+        code = self._codes.get(mood)
+        if code is None:
+            code = len(self.moods)
+            if code > 255:
+                raise ValueError("too many distinct moods for one user")
+            self.moods.append(mood)
+            self._codes[mood] = code
+        return code
+
+    # --------------- UPDATES -----------------
+
+    def add(self, day: int, mood: str):
+        pos = bisect_right(self.days, day)
+        self.days.insert(pos, day)
+        self.codes.insert(pos, self._code(str(mood).lower()))
+
+    def remove(self, day: int) -> int:
+        """Drops every check-in on <day>. Returns how many there were."""
+        lo = bisect_left(self.days, day)
+        hi = bisect_right(self.days, day, lo)
+        del self.days[lo:hi]
+        del self.codes[lo:hi]
+        return hi - lo
+
+    # --------------- QUERIES -----------------
+
+    def has(self, day: int) -> bool:
+        pos = bisect_left(self.days, day)
+        return pos < len(self.days) and self.days[pos] == day
+
+    def window(self, first: int, last: int) -> list:
+        """(date, mood) pairs for days first..last (ordinals, inclusive), oldest first."""
+        lo = bisect_left(self.days, first)
+        hi = bisect_right(self.days, last, lo)
+        moods = self.moods
+        return [
+            (date.fromordinal(day), moods[code])
+            for day, code in zip(self.days[lo:hi], self.codes[lo:hi])
+        ]
+
+    def entries(self) -> list:
+        """The whole series back as log-style dicts."""
+        return list(self.iter_entries())
+
+    def iter_entries(self):
+        """Same as entries(), one dict at a time."""
+        moods = self.moods
+        for day, code in zip(self.days, self.codes):
+            yield {"date": date.fromordinal(day).isoformat(), "mood": moods[code]}
+
+    def copy(self) -> "CheckInSeries":
+        """An independent copy, e.g. to read from another thread while this one changes."""
+        series = CheckInSeries()
+        series.moods = list(self.moods)
+        series._codes = dict(self._codes)
+        series.days = array("I", self.days)
+        series.codes = array("B", self.codes)
+        return series
+
+    def estimated_size(self) -> int:
+        return len(self.days) * 5 + 200
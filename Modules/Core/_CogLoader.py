@@ -0,0 +1,126 @@
+import asyncio
+import logging
+import importlib
+import contextvars
+from time import perf_counter
+from pathlib import Path
+
+# --------------------------------------------------------
+# Startup loading of every cog under Modules/, concurrently.
+#
+#   import     -> extension modules (and everything they import) are
+#                 executed in worker threads, side by side
+#   construct  -> setup(): the cog's __init__, on the event loop
+#   warm-up    -> cog_load() and registering the cog's commands
+#
+# load_extension() always executes the extension file afresh, so the
+# threaded import mostly pays for its dependencies; the second run of the
+# cog file itself is cheap. The setups then run as concurrent tasks, so
+# one cog waiting on a file in cog_load() doesn't hold the others up.
+# Each step is timed per cog for the startup report.
+# --------------------------------------------------------
+
+log = logging.getLogger("Mellow")
+
+COGS_DIR = Path("Modules")
+IMPORT_THREADS = 4
+
+# Timings of the extension whose setup() is running in this task
+_current = contextvars.ContextVar("cog_timing", default=None)
+
+
+class CogTiming:
+    def __init__(self, name: str):
+        self.name = name
+        self.imported = 0.0
+        self.constructed = 0.0
+        self.warmed_up = 0.0
+        self.error = None
+
+    @property
+    def total(self) -> float:
+        return self.imported + self.constructed + self.warmed_up
+
+
+def find_extensions(folder: Path = COGS_DIR) -> list:
+    """Module paths of every cog file; files starting with _ are helpers."""
+    return sorted(
+        ".".join(file.with_suffix("").parts)
+        for file in folder.rglob("*.py")
+        if not file.name.startswith("_")
+    )
+
+
+def _import(name: str) -> float:
+    """Runs in a thread. Returns how long the import took."""
+    start = perf_counter()
+    importlib.import_module(name)
+    return perf_counter() - start
+
+
+async def _import_all(names: list, timings: dict):
+    semaphore = asyncio.Semaphore(IMPORT_THREADS)
+
+    async def run(name):
+        async with semaphore:
+            try:
+                timings[name].imported = await asyncio.to_thread(_import, name)
+            except Exception:
+                # load_extension runs it again and reports the real error
+                pass
+
+    await asyncio.gather(*(run(name) for name in names))
+
+
+async def _load(bot, name: str, timing: CogTiming):
+    _current.set(timing)
+    start = perf_counter()
+    try:
+        await bot.load_extension(name)
+    except Exception as e:
+        timing.error = e
+    timing.constructed = perf_counter() - start - timing.warmed_up
+
+
+async def load_extensions(bot, names: list) -> list:
+    """Loads <names> into <bot>; returns a CogTiming per extension, failures included."""
+    timings = {name: CogTiming(name) for name in names}
+    await _import_all(names, timings)
+
+    # add_cog() runs cog_load() and registers commands: time it per task
+    add_cog = bot.add_cog
+
+    async def timed_add_cog(cog, **kwargs):
+        start = perf_counter()
+        try:
+            return await add_cog(cog, **kwargs)
+        finally:
+            timing = _current.get()
+            if timing is not None:
+                timing.warmed_up += perf_counter() - start
+
+    bot.add_cog = timed_add_cog
+    try:
+        await asyncio.gather(*(_load(bot, name, timings[name]) for name in names))
+    finally:
+        del bot.add_cog
+
+    return list(timings.values())
+
+
+def log_report(timings: list, elapsed: float):
+    """Logs one line per cog, slowest first, plus the wall-clock total."""
+    for timing in sorted(timings, key=lambda t: t.total, reverse=True):
+        if timing.error is not None:
+            log.error(f"Failed to load {timing.name}: {timing.error}")
+            continue
+
+        log.info(
+            f"Loaded cog: {timing.name} "
+            f"(import {timing.imported * 1000:.1f} ms, "
+            f"construct {timing.constructed * 1000:.1f} ms, "
+            f"warm-up {timing.warmed_up * 1000:.1f} ms)"
+        )
+
+    loaded = sum(1 for timing in timings if timing.error is None)
+    log.info(f"Loaded {loaded}/{len(timings)} cogs in {elapsed * 1000:.1f} ms")
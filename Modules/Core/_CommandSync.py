@@ -0,0 +1,76 @@
+import os
+import json
+import hashlib
+import logging
+from pathlib import Path
+
+# --------------------------------------------------------
+# Global slash-command sync, skipped when nothing changed.
+#
+# The payload Discord would receive is hashed and stored per application
+# after every successful sync. on_ready fires again on each reconnect, and
+# a restart with the same cogs produces the same hash, so neither spends
+# the global sync rate limit. !sync forces it.
+# --------------------------------------------------------
+
+log = logging.getLogger("Mellow")
+
+COMMAND_TREE_STATE = Path("Data/CommandTree.json")
+
+
+def tree_fingerprint(tree) -> str:
+    """Stable hash of the global app-command tree as it would be synced."""
+    payload = sorted(
+        (command.to_dict(tree) for command in tree.get_commands()),
+        key=lambda command: (command.get("type", 1), command["name"])
+    )
+    data = json.dumps(payload, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(data.encode("utf-8")).hexdigest()
+
+
+class CommandSync:
+    def __init__(self, tree, path: Path = COMMAND_TREE_STATE):
+        self.tree = tree
+        self.path = path
+        # Set once the tree has been compared (and synced if needed) this run
+        self.checked = False
+
+    def _read_state(self) -> dict:
+        try:
+            with self.path.open("r", encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+        except Exception as e:
+            log.warning(f"Ignoring unreadable command sync state {self.path}: {e}")
+            return {}
+
+    def _write_state(self, application_id: int, fingerprint: str):
+        state = self._read_state()
+        state[str(application_id)] = fingerprint
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_name(self.path.name + ".tmp")
+
+        with tmp_path.open("w", encoding="utf-8") as f:
+            json.dump(state, f, indent=4)
+
+        os.replace(tmp_path, self.path)
+
+    def is_current(self, application_id: int) -> bool:
+        """True if the tree Discord has for this application matches ours."""
+        return self._read_state().get(str(application_id)) == tree_fingerprint(self.tree)
+
+    async def sync(self, application_id: int, force: bool = False):
+        """
+        Syncs the global tree unless it's unchanged since the last sync.
+        Returns the synced commands, or None if the sync was skipped.
+        """
+        if not force and self.is_current(application_id):
+            self.checked = True
+            return None
+
+        synced = await self.tree.sync()
+        self._write_state(application_id, tree_fingerprint(self.tree))
+        self.checked = True
+        return synced
@@ -0,0 +1,55 @@
+import os
+import asyncio
+from time import perf_counter
+
+import discord
+
+from Modules.Core._Metrics import get_metrics
+
+# --------------------------------------------------------
+# Replies for commands whose work grows with the user's data.
+#
+# Discord drops an interaction that isn't answered within 3 seconds. If
+# the data a command needs isn't already in memory, or is big, respond()
+# defers straight away, loads it, renders the reply in a thread and sends
+# it as a followup. Small cached data is answered directly as before.
+# Either way the path taken and the render time go to the metrics.
+# --------------------------------------------------------
+
+# Cached documents above this size are treated like uncached ones
+DEFER_ABOVE_BYTES = int(float(os.getenv("DEFER_ABOVE_KB", "256")) * 1024)
+
+
+def should_defer(size) -> bool:
+    """<size>: bytes of the user's data in memory, or None if it has to come from disk."""
+    return size is None or size > DEFER_ABOVE_BYTES
+
+
+async def respond(interaction: discord.Interaction, command: str, size, load, render):
+    """
+    Answers <interaction> ephemerally with render(await load()).
+
+    load is a coroutine function; render is a blocking function returning
+    the message's keyword arguments (embed, file, view...). <size> comes
+    from Storage.cached_size().
+    """
+    metrics = get_metrics()
+    deferred = should_defer(size)
+    metrics.inc("mellow_responses_total", (("command", command), ("path", "deferred" if deferred else "direct")))
+
+    if deferred:
+        await interaction.response.defer(ephemeral=True, thinking=True)
+
+    data = await load()
+
+    started = perf_counter()
+    if deferred:
+        reply = await asyncio.to_thread(render, data)
+    else:
+        reply = render(data)
+    metrics.observe("mellow_render_seconds", perf_counter() - started, (("command", command),))
+
+    if deferred:
+        await interaction.followup.send(ephemeral=True, **reply)
+    else:
+        await interaction.response.send_message(ephemeral=True, **reply)
@@ -0,0 +1,200 @@
+import io
+import os
+import csv
+import gzip
+import zipfile
+import asyncio
+import tempfile
+
+import discord
+
+from Modules.Core._Storage import dump_line
+
+# --------------------------------------------------------
+# Streaming exports for /exportjournal and /exportcheckins.
+#
+# Rows come from an iterator and are encoded straight into a compressed
+# archive on a SpooledTemporaryFile, which stays in memory up to
+# SPOOL_BYTES and moves to a temp file past that. A part is closed once
+# it nears the upload limit and the next rows go into a new one; the
+# caller sends each part before asking for the next, so the export never
+# exists in full anywhere. Everything here is blocking: run it off the loop.
+# --------------------------------------------------------
+
+FORMATS = ("jsonl", "csv", "md")
+COMPRESSIONS = ("gzip", "zip")
+
+SPOOL_BYTES = 1024 * 1024
+# Left under the upload limit for what the compressor still holds and the archive trailer
+HEADROOM = 256 * 1024
+MAX_PARTS = 10
+
+
+class ExportKind:
+    """What's being exported: its columns and how a row looks in Markdown."""
+
+    def __init__(self, name: str, label: str, fields: tuple, md_header, md_row):
+        self.name = name
+        self.label = label
+        self.fields = fields
+        self.md_header = md_header
+        self.md_row = md_row
+
+
+JOURNAL_EXPORT = ExportKind(
+    "journal",
+    "journal",
+    ("id", "timestamp", "content"),
+    lambda title: f"# {title}\n\n",
+    lambda row: f"## Entry {row['id']} — {row['timestamp']}\n\n{row['content']}\n\n"
+)
+
+CHECKIN_EXPORT = ExportKind(
+    "checkins",
+    "check-in",
+    ("date", "mood"),
+    lambda title: f"# {title}\n\n| Date | Mood |\n| --- | --- |\n",
+    lambda row: f"| {row['date']} | {row['mood'].capitalize()} |\n"
+)
+
+
+class ExportPart:
+    """One finished archive, positioned at its start. Close it once it's been sent."""
+
+    def __init__(self, number: int, filename: str, file, size: int, rows: int, last: bool):
+        self.number = number
+        self.filename = filename
+        self.file = file
+        self.size = size
+        self.rows = rows
+        self.last = last
+
+    def close(self):
+        self.file.close()
+
+
+class _CsvEncoder:
+    """csv.writer for one line at a time, reusing a single buffer."""
+
+    def __init__(self):
+        self._buffer = io.StringIO()
+        self._writer = csv.writer(self._buffer, lineterminator="\n")
+
+    def __call__(self, values) -> str:
+        self._buffer.seek(0)
+        self._buffer.truncate()
+        self._writer.writerow(values)
+        return self._buffer.getvalue()
+
+
+def _encoder(kind: ExportKind, fmt: str):
+    if fmt == "jsonl":
+        return dump_line
+    if fmt == "csv":
+        line = _CsvEncoder()
+        return lambda row: line([row.get(field, "") for field in kind.fields])
+    return kind.md_row
+
+
+def _header(kind: ExportKind, fmt: str, title: str) -> str:
+    if fmt == "csv":
+        return _CsvEncoder()(kind.fields)
+    if fmt == "md":
+        return kind.md_header(title)
+    return ""
+
+
+def export_parts(kind: ExportKind, rows, fmt: str, compression: str, limit: int, title: str):
+    """
+    Yields ExportParts of at most <limit> bytes each, holding <rows> (dicts
+    with kind.fields) in order. Each part is a complete archive on its own
+    with its own header, so any one of them can be opened alone.
+    """
+    if fmt not in FORMATS or compression not in COMPRESSIONS:
+        raise ValueError(f"unsupported export {fmt}/{compression}")
+
+    encode = _encoder(kind, fmt)
+    rows = iter(rows)
+    pending = next(rows, None)
+    # Too small a limit would leave no room for rows at all
+    budget = max(limit - HEADROOM, limit // 2)
+    number = 0
+
+    while True:
+        number += 1
+        spool = tempfile.SpooledTemporaryFile(max_size=SPOOL_BYTES)
+        inner = f"{kind.name}_export.{fmt}"
+
+        if compression == "gzip":
+            archive = None
+            stream = gzip.GzipFile(filename=inner, mode="wb", fileobj=spool, mtime=0)
+        else:
+            archive = zipfile.ZipFile(spool, "w", compression=zipfile.ZIP_DEFLATED)
+            stream = archive.open(inner, "w")
+
+        stream.write(_header(kind, fmt, title).encode("utf-8"))
+        count = 0
+        while pending is not None and spool.tell() < budget:
+            stream.write(encode(pending).encode("utf-8"))
+            count += 1
+            pending = next(rows, None)
+
+        stream.close()
+        if archive is not None:
+            archive.close()
+
+        last = pending is None
+        size = spool.seek(0, os.SEEK_END)
+        spool.seek(0)
+
+        base = kind.name + "_export" if number == 1 and last else f"{kind.name}_export_part{number}"
+        filename = f"{base}.{fmt}.gz" if compression == "gzip" else f"{base}.zip"
+
+        yield ExportPart(number, filename, spool, size, count, last)
+        if last:
+            return
+
+
+def next_part(parts):
+    """next() for running the generator a step at a time in a thread. None when done."""
+    return next(parts, None)
+
+
+async def send_export(interaction: discord.Interaction, kind: ExportKind, rows, fmt: str,
+                      compression: str, title: str):
+    """
+    Builds the export part by part in a thread and sends each one as an
+    ephemeral followup. The interaction must already be deferred.
+    """
+    limit = getattr(interaction.guild, "filesize_limit", discord.utils.DEFAULT_FILE_SIZE_LIMIT_BYTES)
+    parts = export_parts(kind, rows, fmt, compression, limit, title)
+
+    try:
+        while True:
+            part = await asyncio.to_thread(next_part, parts)
+            if part is None:
+                return
+
+            try:
+                if part.number == 1 and part.last:
+                    content = f"Here's your {kind.label} export ({part.rows} rows)."
+                else:
+                    content = f"Here's your {kind.label} export, part {part.number} ({part.rows} rows)."
+                await interaction.followup.send(
+                    content=content,
+                    file=discord.File(part.file, filename=part.filename),
+                    ephemeral=True
+                )
+            finally:
+                part.close()
+
+            if part.last:
+                return
+            if part.number >= MAX_PARTS:
+                await interaction.followup.send(
+                    f"That's the most one export sends ({MAX_PARTS} parts); the rest was left out.",
+                    ephemeral=True
+                )
+                return
+    finally:
+        parts.close()
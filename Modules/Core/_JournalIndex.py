@@ -0,0 +1,119 @@
+from array import array
+from bisect import bisect_left, bisect_right
+
+from Modules.Core._Cache import estimate_size
+
+# --------------------------------------------------------
+# Per-user journal index, built once when the journal is loaded and kept
+# up to date by the storage layer on every append:
+#   ids      -> sorted array of entry IDs (prefix autocomplete, paging)
+#   offsets  -> entry ID -> positions in `entries` (direct lookup)
+#   next_id  -> persisted counter, so deleted IDs are never handed out again
+#
+# Journals written before per-user locking can hold several entries with
+# the same ID. Like the log's tombstones, the index treats them as one ID:
+# each is listed and paged, and deleting the ID removes all of them.
+# --------------------------------------------------------
+
+
+class JournalIndex:
+    def __init__(self, entries: list, next_id: int = 1):
+        self.entries = entries
+        self.ids = array("q", sorted(e["id"] for e in entries))
+        self.offsets = {}
+        for pos, e in enumerate(entries):
+            self.offsets.setdefault(e["id"], []).append(pos)
+        self.next_id = max(next_id, self.ids[-1] + 1 if self.ids else 1)
+
+    def __len__(self):
+        return len(self.ids)
+
+    def get(self, entry_id: int):
+        """O(1) lookup by ID (the first entry if the ID is duplicated)."""
+        positions = self.offsets.get(entry_id)
+        return self.entries[positions[0]] if positions else None
+
+    def add(self, entry: dict):
+        """Records a freshly allocated entry. IDs only grow, so this is an append."""
+        self.offsets.setdefault(entry["id"], []).append(len(self.entries))
+        self.entries.append(entry)
+        self.ids.append(entry["id"])
+        self.next_id = max(self.next_id, entry["id"] + 1)
+
+    def remove(self, entry_id: int) -> list:
+        """Drops every entry with <entry_id> and returns them; later offsets shift down."""
+        positions = self.offsets.pop(entry_id, [])
+        removed = [self.entries[pos] for pos in positions]
+        for pos in reversed(positions):
+            del self.entries[pos]
+        del self.ids[bisect_left(self.ids, entry_id):bisect_right(self.ids, entry_id)]
+
+        if positions:
+            first = positions[0]
+            later_ids = {later["id"] for later in self.entries[first:]}
+            for later_id in later_ids:
+                self.offsets[later_id] = [pos for pos in self.offsets[later_id] if pos < first]
+            for pos in range(first, len(self.entries)):
+                self.offsets[self.entries[pos]["id"]].append(pos)
+        return removed
+
+    def page(self, page: int, per_page: int) -> list:
+        """Entries on one page (oldest first), looked up through the offsets."""
+        start = page * per_page
+        entries = []
+        for pos in range(start, min(start + per_page, len(self.ids))):
+            entry_id = self.ids[pos]
+            positions = self.offsets.get(entry_id, ())
+            # The n-th copy of a duplicated ID is its n-th entry
+            nth = pos - bisect_left(self.ids, entry_id)
+            if nth < len(positions):
+                entries.append(self.entries[positions[nth]])
+        return entries
+
+    def page_of(self, entry_id: int, per_page: int):
+        """Page number holding <entry_id>, or None if there's no such entry."""
+        if entry_id not in self.offsets:
+            return None
+        return bisect_left(self.ids, entry_id) // per_page
+
+    def search_prefix(self, prefix: str, limit: int = 25) -> list:
+        """
+        IDs whose decimal form starts with <prefix>, newest first.
+
+        IDs starting with "12" are exactly the ranges [12, 13), [120, 130),
+        [1200, 1300)... so each range is two bisects instead of a scan.
+        """
+        ids = self.ids
+        prefix = prefix.strip()
+
+        if not ids:
+            return []
+        if not prefix:
+            return ids[-limit:].tolist()[::-1]
+        if not (prefix.isascii() and prefix.isdigit()) or prefix[0] == "0":
+            return []
+
+        base = int(prefix)
+        results = []
+
+        # Longer IDs are always larger, so walk the widest range first
+        for extra_digits in range(len(str(ids[-1])) - len(prefix), -1, -1):
+            scale = 10 ** extra_digits
+            lo = bisect_left(ids, base * scale)
+            hi = bisect_left(ids, (base + 1) * scale)
+
+            for pos in range(hi - 1, lo - 1, -1):
+                if results and results[-1] == ids[pos]:
+                    continue
+                results.append(ids[pos])
+                if len(results) >= limit:
+                    return results
+
+        return results
+
+    def estimated_size(self) -> int:
+        return (
+            estimate_size(self.entries)
+            + self.ids.itemsize * len(self.ids)
+            + 100 * len(self.offsets)
+        )
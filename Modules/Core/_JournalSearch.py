@@ -0,0 +1,135 @@
+import re
+import heapq
+from array import array
+from bisect import bisect_left, insort
+
+# --------------------------------------------------------
+# Per-user inverted index for /searchjournal.
+#
+#   postings      -> token -> sorted array of entry IDs containing it
+#   entry_tokens  -> entry ID -> its tokens (so a delete knows what to undo)
+#
+# Built once when the user first searches, then kept up to date by the
+# storage layer on every add/delete. Searching only walks posting lists,
+# rarest term first, and never looks at entry bodies.
+# --------------------------------------------------------
+
+_TOKEN = re.compile(r"\w+")
+
+STOPWORDS = frozenset(
+    "a an and are as at be been but by did do for from had has have he her him his i if in is it "
+    "its just me my no not of on or our she so than that the them then there they this to too was "
+    "we were what when which who will with you your".split()
+)
+MIN_TOKEN_LENGTH = 2
+
+
+def tokenize(text: str) -> set:
+    return {
+        token for token in _TOKEN.findall(text.lower())
+        if len(token) >= MIN_TOKEN_LENGTH and token not in STOPWORDS
+    }
+
+
+def _contains(posting: array, entry_id: int) -> bool:
+    pos = bisect_left(posting, entry_id)
+    return pos < len(posting) and posting[pos] == entry_id
+
+
+class JournalSearchIndex:
+    def __init__(self, entries: list = ()):
+        self.postings = {}
+        self.entry_tokens = {}
+        self._size = 200
+
+        for entry in sorted(entries, key=lambda e: e["id"]):
+            self.add(entry["id"], entry["content"])
+
+    def __len__(self):
+        return len(self.entry_tokens)
+
+    # --------------- UPDATES -----------------
+
+    def add(self, entry_id: int, content: str):
+        tokens = tuple(tokenize(content))
+        known = self.entry_tokens.get(entry_id)
+        if known is not None:
+            # A duplicated ID: its entries share one set of postings
+            tokens = tuple(token for token in tokens if token not in known)
+            self.entry_tokens[entry_id] = known + tokens
+        else:
+            self.entry_tokens[entry_id] = tokens
+            self._size += 60
+        self._size += 8 * len(tokens)
+
+        for token in tokens:
+            posting = self.postings.get(token)
+            if posting is None:
+                self.postings[token] = array("q", [entry_id])
+                self._size += 100 + len(token)
+            elif posting[-1] < entry_id:
+                # New entries always have the highest ID
+                posting.append(entry_id)
+            else:
+                insort(posting, entry_id)
+            self._size += 8
+
+    def remove(self, entry_id: int):
+        tokens = self.entry_tokens.pop(entry_id, ())
+        self._size -= 60 + 8 * len(tokens)
+
+        for token in tokens:
+            posting = self.postings[token]
+            del posting[bisect_left(posting, entry_id)]
+            self._size -= 8
+            if not posting:
+                del self.postings[token]
+                self._size -= 100 + len(token)
+
+    # --------------- QUERIES -----------------
+
+    def search(self, query: str, limit: int = 10) -> list:
+        """
+        Returns up to <limit> (matched terms, entry ID) pairs: most query terms
+        matched first, newest first among equals.
+
+        An entry matching at least k of the m terms must contain one of the
+        (m - k + 1) rarest ones, so the rare lists are walked first and the
+        common lists are only probed by bisect. Once <limit> entries are
+        known to beat everything not yet seen, the rest is skipped.
+        """
+        postings = sorted(
+            (self.postings[token] for token in tokenize(query) if token in self.postings),
+            key=len
+        )
+        if not postings:
+            return []
+
+        terms = len(postings)
+        scores = {}
+
+        # Newest entries matching every term can't be outranked: often
+        # only the tail of the rarest list needs looking at
+        full = []
+        for entry_id in reversed(postings[0]):
+            score = scores[entry_id] = sum(1 for p in postings if _contains(p, entry_id))
+            if score == terms:
+                full.append((score, entry_id))
+                if len(full) >= limit:
+                    return full
+
+        for used, posting in enumerate(postings[1:], start=2):
+            for entry_id in posting:
+                if entry_id not in scores:
+                    scores[entry_id] = sum(1 for p in postings if _contains(p, entry_id))
+
+            # Every entry matching at least this many terms has been scored
+            complete = terms - used + 1
+            qualified = [(score, entry_id) for entry_id, score in scores.items() if score >= complete]
+            if len(qualified) >= limit:
+                return heapq.nlargest(limit, qualified)
+
+        return heapq.nlargest(limit, ((score, entry_id) for entry_id, score in scores.items()))
+
+    def estimated_size(self) -> int:
+        return self._size
@@ -0,0 +1,84 @@
+import os
+import json
+import logging
+from pathlib import Path
+
+# --------------------------------------------------------
+# Latest check-in day per user, held in memory so /dailycheckin can turn
+# away a second check-in without reading the user's history.
+#
+# Saved to a snapshot on shutdown and consumed (deleted) on startup, so a
+# crash can never leave a stale snapshot behind. Each entry keeps the log
+# stamp it was taken at; entries restored from a snapshot are checked
+# against the log once before they're trusted. Users missing from the
+# index are looked up lazily.
+# --------------------------------------------------------
+
+log = logging.getLogger("Mellow.Storage")
+
+LAST_CHECKIN_SNAPSHOT = Path("Data/LastCheckIns.json")
+
+
+class LastCheckIns:
+    def __init__(self):
+        # (guild, user) -> (day ordinal, 0 if none; log stamp)
+        self.entries = {}
+        # Restored from a snapshot and not yet checked against the log
+        self.unverified = set()
+
+    def __len__(self):
+        return len(self.entries)
+
+    def get(self, key):
+        return self.entries.get(key)
+
+    def set(self, key, day: int, stamp):
+        self.entries[key] = (day, stamp)
+        self.unverified.discard(key)
+
+    def drop(self, key):
+        self.entries.pop(key, None)
+        self.unverified.discard(key)
+
+    def merge(self, snapshot: dict):
+        """Adds snapshot entries for users not already looked up this run."""
+        for key, entry in snapshot.items():
+            if key not in self.entries:
+                self.entries[key] = entry
+                self.unverified.add(key)
+
+    # --------------- SNAPSHOT (blocking) -----------------
+
+    @staticmethod
+    def read_snapshot(path: Path) -> dict:
+        """Reads and deletes the snapshot. Returns {} if there isn't a usable one."""
+        try:
+            with path.open("r", encoding="utf-8") as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return {}
+        except Exception as e:
+            log.warning(f"Ignoring unreadable {path}: {e}")
+            data = {}
+        finally:
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+        snapshot = {}
+        for guild_id, users in data.items():
+            for user_id, (day, stamp) in users.items():
+                snapshot[(guild_id, user_id)] = (day, tuple(stamp) if stamp is not None else None)
+        return snapshot
+
+    def write_snapshot(self, path: Path):
+        data = {}
+        for (guild_id, user_id), (day, stamp) in self.entries.items():
+            data.setdefault(guild_id, {})[user_id] = [day, list(stamp) if stamp is not None else None]
+
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(path.name + ".tmp")
+        with tmp_path.open("w", encoding="utf-8") as f:
+            json.dump(data, f, separators=(",", ":"))
+        os.replace(tmp_path, path)
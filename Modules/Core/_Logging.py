@@ -0,0 +1,136 @@
+import os
+import sys
+import json
+import queue
+import logging
+import logging.handlers
+from pathlib import Path
+from datetime import datetime, timezone
+
+from Modules.Core._Metrics import get_metrics
+
+# --------------------------------------------------------
+# Non-blocking logging.
+#
+# Loggers only put records on a bounded queue; a QueueListener thread
+# (in the supervisor, when sharded) owns the console and the rotating
+# Logs/Mellow.log. If the queue is full the record is dropped and
+# counted instead of making the event loop wait on the disk, and a
+# warning with the number lost goes out once there's room again.
+# --------------------------------------------------------
+
+LOG_DIR = Path("Logs")
+LOG_FILE = LOG_DIR / "Mellow.log"
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line, for log shippers."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        data = {
+            "time": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "process": record.processName,
+            "message": record.getMessage()
+        }
+        if record.exc_info:
+            data["exception"] = self.formatException(record.exc_info)
+        return json.dumps(data, ensure_ascii=False)
+
+
+class DroppingQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler for a bounded queue: drops (and counts) records rather than block."""
+
+    def __init__(self, log_queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+        self._reported = 0
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+            get_metrics().inc("mellow_log_records_dropped_total")
+            return
+
+        if self.dropped > self._reported:
+            lost = self.dropped - self._reported
+            self._reported = self.dropped
+            try:
+                self.queue.put_nowait(logging.makeLogRecord({
+                    "name": "Mellow.Logging",
+                    "levelno": logging.WARNING,
+                    "levelname": "WARNING",
+                    "msg": f"Dropped {lost} log record(s): the log queue was full"
+                }))
+            except queue.Full:
+                pass
+
+
+class QueueListener(logging.handlers.QueueListener):
+    def enqueue_sentinel(self):
+        # The queue may be full at shutdown: wait for room instead of raising
+        self.queue.put(self._sentinel)
+
+
+def build_handlers(text_format: str) -> list:
+    """Console + rotating file handlers, configured from .env."""
+    LOG_DIR.mkdir(exist_ok=True)
+    backups = int(os.getenv("LOG_BACKUPS", "5"))
+    rotate = os.getenv("LOG_ROTATE", "size").lower()
+
+    if rotate == "size":
+        file_handler = logging.handlers.RotatingFileHandler(
+            LOG_FILE,
+            maxBytes=int(float(os.getenv("LOG_MAX_MB", "10")) * 1024 * 1024),
+            backupCount=backups,
+            encoding="utf-8"
+        )
+    else:
+        # Any TimedRotatingFileHandler "when": midnight, h, d, w0-w6...
+        file_handler = logging.handlers.TimedRotatingFileHandler(
+            LOG_FILE,
+            when=rotate,
+            backupCount=backups,
+            encoding="utf-8"
+        )
+
+    if os.getenv("LOG_JSON", "0").lower() in ("1", "true", "yes"):
+        formatter = JsonFormatter()
+    else:
+        formatter = logging.Formatter(text_format)
+
+    handlers = [logging.StreamHandler(sys.stdout), file_handler]
+    for handler in handlers:
+        handler.setFormatter(formatter)
+    return handlers
+
+
+def queue_size() -> int:
+    return int(os.getenv("LOG_QUEUE_SIZE", "10000"))
+
+
+def attach_queue(log_queue, level: int = logging.INFO) -> DroppingQueueHandler:
+    """Routes every record of this process to <log_queue>."""
+    handler = DroppingQueueHandler(log_queue)
+    root = logging.getLogger()
+    root.handlers[:] = [handler]
+    root.setLevel(level)
+    return handler
+
+
+def start_logging(text_format: str, log_queue=None) -> QueueListener:
+    """
+    Queues this process's records and starts the listener thread that
+    writes them (and those of any other process sharing <log_queue>).
+    Call stop() on the result before exiting to flush what's queued.
+    """
+    if log_queue is None:
+        log_queue = queue.Queue(maxsize=queue_size())
+
+    listener = QueueListener(log_queue, *build_handlers(text_format), respect_handler_level=True)
+    listener.start()
+    attach_queue(log_queue)
+    return listener
@@ -0,0 +1,283 @@
+import math
+import time
+import asyncio
+import logging
+import threading
+from time import perf_counter
+
+import discord
+from discord import app_commands
+
+# --------------------------------------------------------
+# In-process metrics: counters, gauges and fixed-bucket histograms,
+# rendered in the Prometheus text format.
+#
+#   mellow_command_*        -> every app command and autocomplete call,
+#                              timed by InstrumentedTree
+#   mellow_storage_io_*     -> storage pool calls and Coping.json loads,
+#                              timed per subsystem (journal, checkin, coping)
+#   mellow_event_loop_lag_* -> how late a sleep(interval) wakes up
+#
+# Recording is a dict update under a lock, so storage threads can report
+# without touching the event loop. Anything that's cheaper to read on
+# demand (cache stats) is a collector called at render time.
+# --------------------------------------------------------
+
+log = logging.getLogger("Mellow.Metrics")
+
+# Seconds; the last bucket is +Inf
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+HELP = {
+    "mellow_command_latency_seconds": ("histogram", "App command and autocomplete handler latency."),
+    "mellow_command_total": ("counter", "App command and autocomplete calls by outcome."),
+    "mellow_storage_io_seconds": ("histogram", "Time spent in blocking storage calls."),
+    "mellow_storage_io_bytes_total": ("counter", "Bytes read or written by storage calls."),
+    "mellow_responses_total": ("counter", "Replies to data-heavy commands, sent directly or deferred."),
+    "mellow_render_seconds": ("histogram", "Time spent rendering replies to data-heavy commands."),
+    "mellow_chart_cache_total": ("counter", "Mood charts served from memory, from disk, or drawn."),
+    "mellow_event_loop_lag_seconds": ("histogram", "Extra delay of a timed sleep on the event loop."),
+    "mellow_event_loop_lag_last_seconds": ("gauge", "Most recent event loop lag sample."),
+    "mellow_cache_entries": ("gauge", "Parsed user documents in the storage cache."),
+    "mellow_cache_bytes": ("gauge", "Approximate memory used by the storage cache."),
+    "mellow_cache_hits_total": ("counter", "Storage cache lookups served from memory."),
+    "mellow_cache_misses_total": ("counter", "Storage cache lookups that read from disk."),
+    "mellow_cache_evictions_total": ("counter", "Documents evicted from the storage cache."),
+    "mellow_cache_invalidations_total": ("counter", "Documents dropped from the storage cache."),
+    "mellow_cache_stale_total": ("counter", "Cached documents found changed on disk."),
+    "mellow_last_checkins_entries": ("gauge", "Users in the in-memory last check-in index."),
+    "mellow_write_behind_pending_users": ("gauge", "Users with buffered writes waiting for a flush."),
+    "mellow_write_behind_flushes_total": ("counter", "Write-behind batches written to disk."),
+    "mellow_write_behind_records_total": ("counter", "Buffered records written by write-behind flushes."),
+}
+
+
+class Histogram:
+    __slots__ = ("counts", "sum", "count")
+
+    def __init__(self):
+        self.counts = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        for pos, bound in enumerate(LATENCY_BUCKETS):
+            if value <= bound:
+                break
+        else:
+            pos = len(LATENCY_BUCKETS)
+        self.counts[pos] += 1
+        self.sum += value
+        self.count += 1
+
+    def quantile(self, q: float) -> float:
+        """Upper bound of the bucket holding the q-th observation (inf if past the last)."""
+        if not self.count:
+            return 0.0
+        rank = math.ceil(q * self.count)
+        seen = 0
+        for pos, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank:
+                return LATENCY_BUCKETS[pos] if pos < len(LATENCY_BUCKETS) else math.inf
+        return math.inf
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(labels: tuple) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in labels) + "}"
+
+
+class Metrics:
+    def __init__(self):
+        self._lock = threading.Lock()
+        # (name, labels) -> value / Histogram; labels is a tuple of (key, value)
+        self.counters = {}
+        self.gauges = {}
+        self.histograms = {}
+        # Called at render time; each returns [(name, labels, value, type)]
+        self._collectors = []
+        self.started_at = time.time()
+
+    # --------------- RECORDING -----------------
+
+    def inc(self, name: str, labels: tuple = (), value: float = 1):
+        key = (name, labels)
+        with self._lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def set(self, name: str, value: float, labels: tuple = ()):
+        with self._lock:
+            self.gauges[(name, labels)] = value
+
+    def observe(self, name: str, value: float, labels: tuple = ()):
+        key = (name, labels)
+        with self._lock:
+            histogram = self.histograms.get(key)
+            if histogram is None:
+                histogram = self.histograms[key] = Histogram()
+            histogram.observe(value)
+
+    def add_collector(self, collector):
+        self._collectors.append(collector)
+
+    def remove_collector(self, collector):
+        if collector in self._collectors:
+            self._collectors.remove(collector)
+
+    # --------------- OUTPUT -----------------
+
+    def _samples(self):
+        with self._lock:
+            counters = dict(self.counters)
+            gauges = dict(self.gauges)
+            histograms = {
+                key: (list(h.counts), h.sum, h.count)
+                for key, h in self.histograms.items()
+            }
+
+        for collector in self._collectors:
+            try:
+                for name, labels, value, kind in collector():
+                    (counters if kind == "counter" else gauges)[(name, labels)] = value
+            except Exception as e:
+                log.warning(f"Metrics collector {collector} failed: {e}")
+
+        return counters, gauges, histograms
+
+    def render(self) -> str:
+        """Everything in the Prometheus text exposition format."""
+        counters, gauges, histograms = self._samples()
+        lines = []
+        described = set()
+
+        def describe(name, kind):
+            if name not in described:
+                described.add(name)
+                help_text = HELP.get(name, (kind, name.replace("_", " ")))[1]
+                lines.append(f"# HELP {name} {help_text}")
+                lines.append(f"# TYPE {name} {kind}")
+
+        for (name, labels), value in sorted(counters.items()):
+            describe(name, "counter")
+            lines.append(f"{name}{_labels(labels)} {value}")
+
+        for (name, labels), value in sorted(gauges.items()):
+            describe(name, "gauge")
+            lines.append(f"{name}{_labels(labels)} {value}")
+
+        for (name, labels), (counts, total, count) in sorted(histograms.items()):
+            describe(name, "histogram")
+            seen = 0
+            for bound, bucket in zip(LATENCY_BUCKETS + ("+Inf",), counts):
+                seen += bucket
+                lines.append(f"{name}_bucket{_labels(labels + (('le', bound),))} {seen}")
+            lines.append(f"{name}_sum{_labels(labels)} {total}")
+            lines.append(f"{name}_count{_labels(labels)} {count}")
+
+        return "\n".join(lines) + "\n"
+
+    def histogram(self, name: str, labels: tuple = ()):
+        with self._lock:
+            return self.histograms.get((name, labels))
+
+    def matching(self, name: str) -> dict:
+        """labels -> Histogram for every series of histogram <name>."""
+        with self._lock:
+            return {labels: h for (n, labels), h in self.histograms.items() if n == name}
+
+    def counter(self, name: str, labels: tuple = ()) -> float:
+        with self._lock:
+            return self.counters.get((name, labels), 0)
+
+
+_metrics = Metrics()
+
+
+def get_metrics() -> Metrics:
+    """Process-wide metrics registry."""
+    return _metrics
+
+
+# --------------------------------------------------------
+# Storage I/O
+# --------------------------------------------------------
+_io = threading.local()
+
+
+def count_bytes(read: int = 0, written: int = 0):
+    """Called by backends from inside a timed_io call to report bytes moved."""
+    tally = getattr(_io, "tally", None)
+    if tally is not None:
+        tally[0] += read
+        tally[1] += written
+
+
+def timed_io(subsystem: str, op: str, func, *args):
+    """Blocking: runs func(*args), recording its duration and bytes under <subsystem>/<op>."""
+    outer = getattr(_io, "tally", None)
+    tally = _io.tally = [0, 0]
+    start = perf_counter()
+    try:
+        return func(*args)
+    finally:
+        elapsed = perf_counter() - start
+        _io.tally = outer
+
+        labels = (("subsystem", subsystem), ("op", op))
+        _metrics.observe("mellow_storage_io_seconds", elapsed, labels)
+        if tally[0]:
+            _metrics.inc("mellow_storage_io_bytes_total", (("subsystem", subsystem), ("direction", "read")), tally[0])
+        if tally[1]:
+            _metrics.inc("mellow_storage_io_bytes_total", (("subsystem", subsystem), ("direction", "write")), tally[1])
+
+
+# --------------------------------------------------------
+# App commands
+# --------------------------------------------------------
+class InstrumentedTree(app_commands.CommandTree):
+    """CommandTree that times every command and autocomplete it dispatches."""
+
+    async def _call(self, interaction: discord.Interaction):
+        start = perf_counter()
+        failed = False
+        try:
+            await super()._call(interaction)
+        except Exception:
+            failed = True
+            raise
+        finally:
+            command = interaction.command
+            name = command.qualified_name if command is not None else "unknown"
+            kind = "autocomplete" if interaction.type is discord.InteractionType.autocomplete else "command"
+            status = "error" if failed or interaction.command_failed else "ok"
+            # discord.py logs and swallows autocomplete errors; a callback that
+            # raised never got to send its choices
+            if kind == "autocomplete" and not interaction.response.is_done():
+                status = "error"
+
+            _metrics.observe(
+                "mellow_command_latency_seconds",
+                perf_counter() - start,
+                (("command", name), ("type", kind))
+            )
+            _metrics.inc("mellow_command_total", (("command", name), ("type", kind), ("status", status)))
+
+
+# --------------------------------------------------------
+# Event loop lag
+# --------------------------------------------------------
+async def sample_loop_lag(interval: float = 1.0):
+    """Runs until cancelled, recording how late each sleep(interval) returns."""
+    loop = asyncio.get_running_loop()
+    while True:
+        start = loop.time()
+        await asyncio.sleep(interval)
+        lag = max(0.0, loop.time() - start - interval)
+        _metrics.observe("mellow_event_loop_lag_seconds", lag)
+        _metrics.set("mellow_event_loop_lag_last_seconds", lag)
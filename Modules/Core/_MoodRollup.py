@@ -0,0 +1,138 @@
+from array import array
+from datetime import datetime
+
+# --------------------------------------------------------
+# Per-user mood rollup, maintained on every check-in so /checkinstats
+# never has to rescan the raw history.
+#
+#   codes[i]      -> mood code logged on day (start + i), 0 = no check-in
+#   prefix[m][i]  -> how many of codes[0:i] are mood m
+#
+# The count for any window of days is prefix[m][hi] - prefix[m][lo].
+# --------------------------------------------------------
+
+MOODS = ("happy", "stressed", "sad", "neutral", "motivated")
+MOOD_CODES = {mood: code for code, mood in enumerate(MOODS, start=1)}
+
+
+class MoodRollup:
+    def __init__(self, start: int = 0, codes=b""):
+        self.start = start
+        self.codes = bytearray(codes)
+        self._rebuild_prefix()
+
+    def _rebuild_prefix(self):
+        running = [0] * len(MOODS)
+        self.prefix = [array("I", [0]) for _ in MOODS]
+
+        for code in self.codes:
+            if code:
+                running[code - 1] += 1
+            for mood_pos, counts in enumerate(self.prefix):
+                counts.append(running[mood_pos])
+
+    # --------------- BUILDING -----------------
+
+    @classmethod
+    def from_history(cls, history: list) -> "MoodRollup":
+        """Builds a rollup from a raw check-in log (used for users who predate rollups)."""
+        rollup = cls()
+        days = {}
+
+        for entry in history:
+            code = MOOD_CODES.get(str(entry.get("mood", "unknown")).lower())
+            try:
+                ordinal = datetime.strptime(entry.get("date"), "%Y-%m-%d").date().toordinal()
+            except Exception:
+                continue
+            if code:
+                days[ordinal] = code
+
+        if days:
+            rollup.start = min(days)
+            rollup.codes = bytearray(max(days) - rollup.start + 1)
+            for ordinal, code in days.items():
+                rollup.codes[ordinal - rollup.start] = code
+            rollup._rebuild_prefix()
+
+        return rollup
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "MoodRollup":
+        return cls(data["start"], bytes(c - 48 for c in data["codes"].encode("ascii")))
+
+    def to_dict(self, stamp) -> dict:
+        """
+        Serialisable form. <stamp> identifies the raw log version this rollup
+        matches, so a stale rollup (e.g. after a crash) gets rebuilt.
+        """
+        return {
+            "stamp": list(stamp) if stamp is not None else None,
+            "start": self.start,
+            "codes": bytes(c + 48 for c in self.codes).decode("ascii")
+        }
+
+    # --------------- UPDATES -----------------
+
+    def add(self, ordinal: int, mood: str):
+        """Records a check-in. Appending a new latest day is O(days since the last check-in)."""
+        code = MOOD_CODES.get(str(mood).lower())
+        if not code:
+            return
+
+        if not self.codes:
+            self.start = ordinal
+
+        if ordinal < self.start:
+            # Backfill before the first day: shift everything right
+            self.codes[0:0] = bytes(self.start - ordinal)
+            self.start = ordinal
+
+        pos = ordinal - self.start
+
+        if pos < len(self.codes):
+            # Rewriting a day already covered: rare, so just recount
+            self.codes[pos] = code
+            self._rebuild_prefix()
+            return
+
+        new_days = pos - len(self.codes) + 1
+        self.codes.extend(bytes(new_days - 1))
+        self.codes.append(code)
+
+        for counts in self.prefix:
+            counts.extend(array("I", [counts[-1]]) * new_days)
+        self.prefix[code - 1][-1] += 1
+
+    # --------------- QUERIES -----------------
+
+    @property
+    def last_day(self):
+        """Ordinal of the latest check-in, or None."""
+        return self.start + len(self.codes) - 1 if self.codes else None
+
+    def counts(self, first: int, last: int):
+        """Mood counts for days first..last (ordinals, inclusive). Returns (counts, total)."""
+        lo = max(first - self.start, 0)
+        hi = min(last - self.start + 1, len(self.codes))
+
+        if hi <= lo:
+            counts = {mood: 0 for mood in MOODS}
+        else:
+            counts = {
+                mood: self.prefix[mood_pos][hi] - self.prefix[mood_pos][lo]
+                for mood_pos, mood in enumerate(MOODS)
+            }
+        return counts, sum(counts.values())
+
+    def window(self, first: int, last: int) -> bytes:
+        """Mood code per day for days first..last (ordinals, inclusive), 0 where there's no check-in."""
+        codes = bytearray(last - first + 1)
+        lo = max(first, self.start)
+        hi = min(last, self.start + len(self.codes) - 1)
+        if lo <= hi:
+            codes[lo - first:hi - first + 1] = self.codes[lo - self.start:hi - self.start + 1]
+        return bytes(codes)
+
+    def estimated_size(self) -> int:
+        return len(self.codes) + sum(c.itemsize * len(c) for c in self.prefix) + 200
@@ -0,0 +1,293 @@
+import json
+import queue
+import sqlite3
+from pathlib import Path
+from datetime import date
+from contextlib import contextmanager
+
+from Modules.Core._CheckInSeries import CheckInSeries
+
+# --------------------------------------------------------
+# SQLite storage backend (STORAGE_BACKEND=sqlite).
+#
+# One database file instead of one JSON file per user. Runs in WAL mode
+# so autocomplete reads never wait on a writer, and keeps a small pool of
+# connections that the storage thread pool borrows from.
+# --------------------------------------------------------
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS journals (
+    guild_id  TEXT    NOT NULL,
+    user_id   INTEGER NOT NULL,
+    id        INTEGER NOT NULL,
+    timestamp TEXT    NOT NULL,
+    content   TEXT    NOT NULL,
+    PRIMARY KEY (guild_id, user_id, id)
+);
+
+CREATE TABLE IF NOT EXISTS journal_counters (
+    guild_id TEXT    NOT NULL,
+    user_id  INTEGER NOT NULL,
+    next_id  INTEGER NOT NULL,
+    PRIMARY KEY (guild_id, user_id)
+);
+
+CREATE TABLE IF NOT EXISTS checkins (
+    guild_id TEXT    NOT NULL,
+    user_id  INTEGER NOT NULL,
+    date     TEXT    NOT NULL,
+    mood     TEXT    NOT NULL
+);
+
+CREATE INDEX IF NOT EXISTS idx_checkins_user_date
+    ON checkins (guild_id, user_id, date);
+
+CREATE TABLE IF NOT EXISTS mood_rollups (
+    guild_id TEXT    NOT NULL,
+    user_id  INTEGER NOT NULL,
+    data     TEXT    NOT NULL,
+    PRIMARY KEY (guild_id, user_id)
+);
+
+-- Bumped by every change to a user's check-ins, whoever makes it
+CREATE TABLE IF NOT EXISTS checkin_generations (
+    guild_id   TEXT    NOT NULL,
+    user_id    INTEGER NOT NULL,
+    generation INTEGER NOT NULL,
+    PRIMARY KEY (guild_id, user_id)
+);
+"""
+
+# One trigger per kind of change, each bumping the rows' owners
+_GENERATION_TRIGGER = """
+CREATE TRIGGER IF NOT EXISTS checkins_generation_{event} AFTER {event} ON checkins
+BEGIN
+    INSERT OR IGNORE INTO checkin_generations (guild_id, user_id, generation)
+        VALUES ({row}.guild_id, {row}.user_id, 0);
+    UPDATE checkin_generations SET generation = generation + 1
+        WHERE guild_id = {row}.guild_id AND user_id = {row}.user_id;
+END;
+"""
+SCHEMA += "".join(
+    _GENERATION_TRIGGER.format(event=event, row=row)
+    for event, row in (("INSERT", "NEW"), ("UPDATE", "NEW"), ("DELETE", "OLD"))
+)
+
+
+class SQLiteBackend:
+    """Blocking SQLite storage with the same interface as JsonBackend."""
+
+    def __init__(self, path="Data/Mellow.db", pool_size: int = 4):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+
+        self._pool = queue.Queue()
+        for _ in range(max(1, pool_size)):
+            self._pool.put(self._connect())
+
+        with self._conn() as conn:
+            conn.executescript(SCHEMA)
+
+    # --------------- CONNECTIONS -----------------
+
+    def _connect(self) -> sqlite3.Connection:
+        # Connections move between pool threads, but only one uses each at a time
+        conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    @contextmanager
+    def _conn(self):
+        """Borrows a connection; commits on success, rolls back on error."""
+        conn = self._pool.get()
+        try:
+            with conn:
+                yield conn
+        finally:
+            self._pool.put(conn)
+
+    # --------------- LISTING -----------------
+
+    def iter_journal_users(self):
+        with self._conn() as conn:
+            rows = conn.execute("SELECT DISTINCT guild_id, user_id FROM journals").fetchall()
+        for row in rows:
+            yield row["guild_id"], str(row["user_id"])
+
+    def iter_checkin_users(self):
+        with self._conn() as conn:
+            rows = conn.execute("SELECT DISTINCT guild_id, user_id FROM checkins").fetchall()
+        for row in rows:
+            yield row["guild_id"], str(row["user_id"])
+
+    # --------------- JOURNALS -----------------
+
+    def read_journal(self, guild_id, user_id):
+        """Returns (entries, next ID). IDs of deleted entries are never reused."""
+        with self._conn() as conn:
+            rows = conn.execute(
+                "SELECT id, timestamp, content FROM journals "
+                "WHERE guild_id = ? AND user_id = ? ORDER BY id",
+                (str(guild_id), int(user_id))
+            ).fetchall()
+            counter = conn.execute(
+                "SELECT next_id FROM journal_counters WHERE guild_id = ? AND user_id = ?",
+                (str(guild_id), int(user_id))
+            ).fetchone()
+
+        entries = [dict(row) for row in rows]
+        next_id = max(counter[0] if counter else 1, entries[-1]["id"] + 1 if entries else 1)
+        return entries, next_id
+
+    def load_journal(self, guild_id, user_id) -> list:
+        return self.read_journal(guild_id, user_id)[0]
+
+    def append_journal(self, guild_id, user_id, entry: dict):
+        with self._conn() as conn:
+            conn.execute(
+                "INSERT INTO journals (guild_id, user_id, id, timestamp, content) VALUES (?, ?, ?, ?, ?)",
+                (str(guild_id), int(user_id), entry["id"], entry["timestamp"], entry["content"])
+            )
+            conn.execute(
+                "INSERT INTO journal_counters (guild_id, user_id, next_id) VALUES (?, ?, ?) "
+                "ON CONFLICT (guild_id, user_id) DO UPDATE SET next_id = MAX(next_id, excluded.next_id)",
+                (str(guild_id), int(user_id), entry["id"] + 1)
+            )
+
+    def delete_journal(self, guild_id, user_id, entry_id: int):
+        with self._conn() as conn:
+            conn.execute(
+                "DELETE FROM journals WHERE guild_id = ? AND user_id = ? AND id = ?",
+                (str(guild_id), int(user_id), entry_id)
+            )
+
+    # --------------- CHECK-INS -----------------
+
+    def load_checkins(self, guild_id, user_id) -> list:
+        with self._conn() as conn:
+            rows = conn.execute(
+                "SELECT date, mood FROM checkins "
+                "WHERE guild_id = ? AND user_id = ? ORDER BY date",
+                (str(guild_id), int(user_id))
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+    def read_checkin_series(self, guild_id, user_id) -> CheckInSeries:
+        return CheckInSeries(self.load_checkins(guild_id, user_id))
+
+    def last_checkin_day(self, guild_id, user_id) -> int:
+        with self._conn() as conn:
+            row = conn.execute(
+                "SELECT MAX(date) FROM checkins WHERE guild_id = ? AND user_id = ?",
+                (str(guild_id), int(user_id))
+            ).fetchone()
+        return date.fromisoformat(row[0]).toordinal() if row[0] else 0
+
+    def append_checkin(self, guild_id, user_id, date: str, mood: str) -> bool:
+        with self._conn() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            exists = conn.execute(
+                "SELECT 1 FROM checkins WHERE guild_id = ? AND user_id = ? AND date = ?",
+                (str(guild_id), int(user_id), date)
+            ).fetchone()
+            if exists:
+                return False
+
+            conn.execute(
+                "INSERT INTO checkins (guild_id, user_id, date, mood) VALUES (?, ?, ?, ?)",
+                (str(guild_id), int(user_id), date, mood)
+            )
+        return True
+
+    def delete_checkin(self, guild_id, user_id, date: str) -> bool:
+        with self._conn() as conn:
+            cursor = conn.execute(
+                "DELETE FROM checkins WHERE guild_id = ? AND user_id = ? AND date = ?",
+                (str(guild_id), int(user_id), date)
+            )
+        return cursor.rowcount > 0
+
+    # --------------- ROLLUPS -----------------
+
+    def load_rollup(self, guild_id, user_id):
+        with self._conn() as conn:
+            row = conn.execute(
+                "SELECT data FROM mood_rollups WHERE guild_id = ? AND user_id = ?",
+                (str(guild_id), int(user_id))
+            ).fetchone()
+        return json.loads(row["data"]) if row else None
+
+    def save_rollup(self, guild_id, user_id, data: dict):
+        with self._conn() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO mood_rollups (guild_id, user_id, data) VALUES (?, ?, ?)",
+                (str(guild_id), int(user_id), json.dumps(data, separators=(",", ":")))
+            )
+
+    # --------------- MAINTENANCE -----------------
+
+    def stamp(self, kind: str, guild_id, user_id):
+        if kind == "checkin":
+            # (generation, rows, latest date): lets a saved rollup tell whether
+            # it still matches the table. The generation changes on every
+            # insert, update or delete; rows and date alone repeat after a
+            # delete followed by a backfill.
+            with self._conn() as conn:
+                row = conn.execute(
+                    "SELECT (SELECT generation FROM checkin_generations WHERE guild_id = ?1 AND user_id = ?2), "
+                    "COUNT(*), MAX(date) FROM checkins WHERE guild_id = ?1 AND user_id = ?2",
+                    (str(guild_id), int(user_id))
+                ).fetchone()
+            return (row[0] or 0, row[1], row[2])
+
+        # Every write goes through the storage layer, which invalidates the cache itself
+        return None
+
+    def compact(self, kind: str, guild_id, user_id) -> bool:
+        # Deleted rows are already gone; SQLite reuses their pages itself
+        return False
+
+    # --------------- BULK IMPORT -----------------
+
+    def import_rows(self, journal_rows, checkin_rows, counter_rows=()):
+        """
+        Inserts pre-built rows in one transaction. Used by the migration tool.
+        journal_rows: (guild_id, user_id, id, timestamp, content)
+        checkin_rows: (guild_id, user_id, date, mood)
+        counter_rows: (guild_id, user_id, next_id)
+        """
+        with self._conn() as conn:
+            conn.executemany(
+                "INSERT INTO journals (guild_id, user_id, id, timestamp, content) VALUES (?, ?, ?, ?, ?)",
+                journal_rows
+            )
+            conn.executemany(
+                "INSERT INTO checkins (guild_id, user_id, date, mood) VALUES (?, ?, ?, ?)",
+                checkin_rows
+            )
+            conn.executemany(
+                "INSERT OR REPLACE INTO journal_counters (guild_id, user_id, next_id) VALUES (?, ?, ?)",
+                counter_rows
+            )
+
+    def count_rows(self) -> int:
+        with self._conn() as conn:
+            journals = conn.execute("SELECT COUNT(*) FROM journals").fetchone()[0]
+            checkins = conn.execute("SELECT COUNT(*) FROM checkins").fetchone()[0]
+        return journals + checkins
+
+    def clear(self):
+        with self._conn() as conn:
+            conn.execute("DELETE FROM journals")
+            conn.execute("DELETE FROM journal_counters")
+            conn.execute("DELETE FROM checkins")
+            conn.execute("DELETE FROM checkin_generations")
+            conn.execute("DELETE FROM mood_rollups")
+
+    # ---------------------------------------------------
+
+    def close(self):
+        while not self._pool.empty():
+            self._pool.get_nowait().close()
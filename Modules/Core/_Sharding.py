@@ -0,0 +1,66 @@
+import json
+import urllib.request
+
+# --------------------------------------------------------
+# Shard bookkeeping for the multi-process mode (SHARD_PROCESSES > 0).
+#
+# Discord routes a guild to shard (guild_id >> 22) % shard_count, and DMs
+# to shard 0. Each worker process runs a contiguous range of shards, so
+# it only ever sees (and writes files for) the guilds on those shards.
+# --------------------------------------------------------
+
+GATEWAY_URL = "https://discord.com/api/v10/gateway/bot"
+
+
+def shard_for(guild_id, shard_count: int) -> int:
+    """Shard that carries <guild_id> ("DM" for direct messages)."""
+    if guild_id == "DM" or guild_id is None:
+        return 0
+    return (int(guild_id) >> 22) % shard_count
+
+
+def assign_shards(shard_count: int, processes: int) -> list:
+    """Splits shard IDs into <processes> contiguous, near-equal ranges."""
+    processes = max(1, min(processes, shard_count))
+    base, extra = divmod(shard_count, processes)
+
+    ranges = []
+    start = 0
+    for worker in range(processes):
+        size = base + (1 if worker < extra else 0)
+        ranges.append(list(range(start, start + size)))
+        start += size
+    return ranges
+
+
+def fetch_recommended_shards(token: str) -> int:
+    """Blocking: asks Discord how many shards this bot should run."""
+    request = urllib.request.Request(GATEWAY_URL, headers={
+        "Authorization": f"Bot {token}",
+        "User-Agent": "Mellow (sharded launcher)"
+    })
+    with urllib.request.urlopen(request, timeout=30) as response:
+        return int(json.load(response)["shards"])
+
+
+class GuildPartition:
+    """The guilds one worker process owns, by shard."""
+
+    def __init__(self, shard_ids: list, shard_count: int, worker: int):
+        self.shard_ids = frozenset(shard_ids)
+        self.shard_count = shard_count
+        self.worker = worker
+
+    def owns(self, guild_id) -> bool:
+        return shard_for(guild_id, self.shard_count) in self.shard_ids
+
+    def check(self, guild_id):
+        """Raises if writing <guild_id>'s files would step on another worker."""
+        if not self.owns(guild_id):
+            raise RuntimeError(
+                f"Worker {self.worker} doesn't own guild {guild_id} "
+                f"(shard {shard_for(guild_id, self.shard_count)} of {self.shard_count})"
+            )
+
+    def __repr__(self):
+        return f"GuildPartition(worker={self.worker}, shards={sorted(self.shard_ids)}/{self.shard_count})"
@@ -0,0 +1,1163 @@
+import os
+import json
+import shutil
+import asyncio
+import contextlib
+import logging
+import weakref
+from pathlib import Path
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+
+from Modules.Core._Cache import DocumentCache, estimate_size
+from Modules.Core._Metrics import timed_io, count_bytes
+from Modules.Core._JournalIndex import JournalIndex
+from Modules.Core._MoodRollup import MoodRollup
+from Modules.Core._CheckInSeries import CheckInSeries
+from Modules.Core._JournalSearch import JournalSearchIndex
+from Modules.Core._LastCheckIn import LastCheckIns, LAST_CHECKIN_SNAPSHOT
+
+# --------------------------------------------------------
+# Shared storage layer for every cog.
+#
+# All file I/O runs in a bounded thread pool so a slow disk never blocks
+# the event loop, and every read-modify-write of a user's file happens
+# under a per-(kind, guild, user) asyncio lock so overlapping commands
+# from the same user can't lose each other's updates.
+# --------------------------------------------------------
+
+log = logging.getLogger("Mellow.Storage")
+
+JOURNAL_DIR = Path("Data/Journals")
+CHECKIN_DIR = Path("Data/CheckIns")
+ROLLUP_DIR = Path("Data/Rollups")
+# Unreadable files are moved (or copied) here instead of being overwritten
+QUARANTINE_DIR = Path("Data/Quarantine")
+
+JOURNAL = "journal"
+CHECKIN = "checkin"
+# Derived documents share the lock and stamp of the log they're built from
+ROLLUP = "rollup"
+SEARCH = "search"
+SOURCE_KIND = {ROLLUP: CHECKIN, SEARCH: JOURNAL}
+DERIVED_KINDS = {CHECKIN: (ROLLUP,), JOURNAL: (SEARCH,)}
+# Metrics label for the I/O of each kind
+SUBSYSTEM = {JOURNAL: "journal", SEARCH: "journal", CHECKIN: "checkin", ROLLUP: "checkin"}
+
+# "No stamp known", as opposed to a backend stamp of None
+_UNKNOWN = object()
+
+# Data only is enough for an append; not every platform has it
+_fdatasync = getattr(os, "fdatasync", os.fsync)
+
+
+def dump_line(record: dict) -> str:
+    """One compact JSON record per line."""
+    return json.dumps(record, ensure_ascii=False, separators=(",", ":")) + "\n"
+
+
+class JsonBackend:
+    """
+    Blocking per-user file storage. Only ever called from the pool.
+
+    Each user has an append-only JSON-lines log:
+        Data/Journals/<guild>/<user>_journal.jsonl
+        Data/CheckIns/<guild>/<user>.jsonl
+
+    plus a mood rollup per user in Data/Rollups/<guild>/<user>.json.
+
+    Adding an entry appends one line. Deleting appends a tombstone
+    ({"deleted": <id or date>}) and compact() rewrites the log once enough
+    of it is dead, keeping a {"next_id": n} record so IDs aren't reused.
+    Old-style .json files are still read, and get upgraded to a log the
+    first time they're written to.
+
+    Files that can't be parsed are never overwritten: an unreadable legacy
+    file is moved to Data/Quarantine/ (and the user starts afresh), and a
+    log with unreadable lines is copied there before compaction drops them.
+    """
+
+    # Kinds whose writes can be buffered and appended in batches (write-behind)
+    DEFERRABLE = frozenset({JOURNAL, CHECKIN})
+
+    def __init__(self, journal_dir: Path = JOURNAL_DIR, checkin_dir: Path = CHECKIN_DIR,
+                 compact_threshold: float = 0.25, rollup_dir: Path = ROLLUP_DIR,
+                 quarantine_dir: Path = QUARANTINE_DIR):
+        self.journal_dir = Path(journal_dir)
+        self.checkin_dir = Path(checkin_dir)
+        self.rollup_dir = Path(rollup_dir)
+        self.quarantine_dir = Path(quarantine_dir)
+        self.compact_threshold = compact_threshold
+
+    # --------------- PATHS -----------------
+
+    def journal_file(self, guild_id, user_id) -> Path:
+        return self.journal_dir / str(guild_id) / f"{user_id}_journal.jsonl"
+
+    def checkin_file(self, guild_id, user_id) -> Path:
+        return self.checkin_dir / str(guild_id) / f"{user_id}.jsonl"
+
+    def rollup_file(self, guild_id, user_id) -> Path:
+        return self.rollup_dir / str(guild_id) / f"{user_id}.json"
+
+    def _file(self, kind: str, guild_id, user_id) -> Path:
+        if kind == JOURNAL:
+            return self.journal_file(guild_id, user_id)
+        return self.checkin_file(guild_id, user_id)
+
+    # --------------- RAW I/O -----------------
+
+    def quarantine(self, path: Path, copy: bool = False) -> Path:
+        """Moves (or copies) <path> under the quarantine folder, keeping its place in Data/."""
+        try:
+            relative = path.resolve().relative_to(self.journal_dir.resolve().parent)
+        except ValueError:
+            relative = Path(path.name)
+
+        stamp = datetime.utcnow().strftime("%Y%m%dT%H%M%S%f")
+        target = self.quarantine_dir / relative.with_name(f"{relative.name}.{stamp}")
+        target.parent.mkdir(parents=True, exist_ok=True)
+
+        if copy:
+            shutil.copy2(path, target)
+        else:
+            os.replace(path, target)
+        return target
+
+    def read_legacy(self, path: Path) -> list:
+        """Records of an old-style .json file. Raises ValueError if it can't be parsed."""
+        data = path.read_bytes()
+        count_bytes(read=len(data))
+        records = json.loads(data)
+        if not isinstance(records, list) or not all(isinstance(record, dict) for record in records):
+            raise ValueError("expected a list of objects")
+        return records
+
+    def _read_legacy(self, path: Path) -> list:
+        try:
+            return self.read_legacy(path)
+        except ValueError as e:
+            moved = self.quarantine(path)
+            log.error(f"Could not parse {path} ({e}); moved it to {moved}")
+            return []
+
+    def scan_log(self, path: Path):
+        """
+        Returns (records, unreadable line count) for a log. A torn last line
+        (from a crash, or an append still in flight) counts as unreadable.
+        """
+        records = []
+        bad = 0
+        size = 0
+        with path.open("rb") as f:
+            for line in f:
+                size += len(line)
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    record = None
+                if isinstance(record, dict):
+                    records.append(record)
+                elif line.strip():
+                    bad += 1
+        count_bytes(read=size)
+        return records, bad
+
+    def _read(self, path: Path) -> list:
+        """Returns every record in the log (or legacy file), tombstones included."""
+        if not path.exists():
+            legacy = path.with_suffix(".json")
+            return self._read_legacy(legacy) if legacy.exists() else []
+
+        records, bad = self.scan_log(path)
+        if bad:
+            log.debug(f"Skipped {bad} unreadable line(s) in {path}")
+        return records
+
+    def fold(self, records: list, key: str):
+        """Applies tombstones in order. Returns (live entries, tombstone count)."""
+        entries = []
+        positions = {}
+        tombstones = 0
+
+        for record in records:
+            if "next_id" in record:
+                continue
+            if "deleted" in record:
+                tombstones += 1
+                for pos in positions.pop(record["deleted"], ()):
+                    entries[pos] = None
+            else:
+                positions.setdefault(record.get(key), []).append(len(entries))
+                entries.append(record)
+
+        return [e for e in entries if e is not None], tombstones
+
+    def rewrite(self, path: Path, records: list, sync: bool = False):
+        """Writes a fresh log to a temp file and swaps it in."""
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(path.name + ".tmp")
+
+        with tmp_path.open("w", encoding="utf-8") as f:
+            for record in records:
+                f.write(dump_line(record))
+            count_bytes(written=f.tell())
+            if sync:
+                f.flush()
+                _fdatasync(f.fileno())
+
+        os.replace(tmp_path, path)
+
+    def _append(self, path: Path, records: list, sync: bool = False):
+        """Appends <records> in one write; with <sync>, waits until they're on disk."""
+        legacy = path.with_suffix(".json")
+
+        # First write to an old-style file: upgrade it to a log
+        if not path.exists() and legacy.exists():
+            self.rewrite(path, self._read_legacy(legacy) + records, sync)
+            # Already gone if it was quarantined
+            legacy.unlink(missing_ok=True)
+            return
+
+        data = "".join(dump_line(record) for record in records).encode("utf-8")
+
+        try:
+            f = path.open("a+b")
+        except FileNotFoundError:
+            # First file in this guild's folder
+            path.parent.mkdir(parents=True, exist_ok=True)
+            f = path.open("a+b")
+
+        with f:
+            # Never glue a new record onto a torn last line
+            if f.tell() > 0:
+                f.seek(-1, os.SEEK_END)
+                if f.read(1) != b"\n":
+                    data = b"\n" + data
+            f.write(data)
+            if sync:
+                f.flush()
+                _fdatasync(f.fileno())
+        count_bytes(written=len(data))
+
+    def append_records(self, kind: str, guild_id, user_id, records: list, sync: bool = False):
+        """Appends several raw records to a log in one write (write-behind flushes)."""
+        self._append(self._file(kind, guild_id, user_id), records, sync)
+
+    def stamp(self, kind: str, guild_id, user_id):
+        """(mtime, size) of the user's file, used to spot edits made outside the bot."""
+        path = self._file(kind, guild_id, user_id)
+        for candidate in (path, path.with_suffix(".json")):
+            try:
+                st = candidate.stat()
+            except FileNotFoundError:
+                continue
+            return (st.st_mtime_ns, st.st_size)
+        return None
+
+    # --------------- LISTING -----------------
+
+    def _iter_users(self, base_dir: Path, suffix: str):
+        if not base_dir.exists():
+            return
+        for guild_folder in base_dir.iterdir():
+            if not guild_folder.is_dir():
+                continue
+            seen = set()
+            for pattern in (f"*{suffix}.jsonl", f"*{suffix}.json"):
+                for file in guild_folder.glob(pattern):
+                    user_id = file.name[:-len(suffix + file.suffix)]
+                    if user_id not in seen:
+                        seen.add(user_id)
+                        yield guild_folder.name, user_id
+
+    def iter_journal_users(self):
+        """Yields (guild_id, user_id) for every journal file on disk."""
+        yield from self._iter_users(self.journal_dir, "_journal")
+
+    def iter_checkin_users(self):
+        """Yields (guild_id, user_id) for every check-in file on disk."""
+        yield from self._iter_users(self.checkin_dir, "")
+
+    # --------------- JOURNALS -----------------
+
+    def read_journal(self, guild_id, user_id):
+        """Returns (live entries, next ID). IDs of deleted entries are never reused."""
+        records = self._read(self.journal_file(guild_id, user_id))
+        entries, _ = self.fold(records, "id")
+        return entries, self.next_id(records)
+
+    def next_id(self, records: list) -> int:
+        next_id = 1
+        for record in records:
+            if "id" in record:
+                next_id = max(next_id, record["id"] + 1)
+            elif "next_id" in record:
+                next_id = max(next_id, record["next_id"])
+        return next_id
+
+    def load_journal(self, guild_id, user_id) -> list:
+        return self.read_journal(guild_id, user_id)[0]
+
+    def append_journal(self, guild_id, user_id, entry: dict):
+        self._append(self.journal_file(guild_id, user_id), [entry])
+
+    def delete_journal(self, guild_id, user_id, entry_id: int):
+        self._append(self.journal_file(guild_id, user_id), [{"deleted": entry_id}])
+
+    # --------------- CHECK-INS -----------------
+
+    def load_checkins(self, guild_id, user_id) -> list:
+        history, _ = self.fold(self._read(self.checkin_file(guild_id, user_id)), "date")
+        return history
+
+    def read_checkin_series(self, guild_id, user_id) -> CheckInSeries:
+        return CheckInSeries(self.load_checkins(guild_id, user_id))
+
+    def last_checkin_day(self, guild_id, user_id) -> int:
+        """Ordinal of the user's latest check-in, or 0."""
+        series = self.read_checkin_series(guild_id, user_id)
+        return series.days[-1] if len(series) else 0
+
+    def append_checkin(self, guild_id, user_id, date: str, mood: str) -> bool:
+        """
+        Appends without reading the log: the storage layer has already made
+        sure there's no check-in for <date>.
+        """
+        self._append(self.checkin_file(guild_id, user_id), [{
+            "date": date,
+            "mood": mood
+        }])
+        return True
+
+    def delete_checkin(self, guild_id, user_id, date: str) -> bool:
+        history = self.load_checkins(guild_id, user_id)
+
+        if not any(entry.get("date") == date for entry in history):
+            return False
+
+        self._append(self.checkin_file(guild_id, user_id), [{"deleted": date}])
+        return True
+
+    # --------------- ROLLUPS -----------------
+
+    def load_rollup(self, guild_id, user_id):
+        """The saved rollup dict, or None if there isn't a usable one."""
+        path = self.rollup_file(guild_id, user_id)
+        try:
+            data = path.read_bytes()
+            count_bytes(read=len(data))
+            return json.loads(data)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            log.warning(f"Could not read {path}, it will be rebuilt: {e}")
+            return None
+
+    def save_rollup(self, guild_id, user_id, data: dict):
+        path = self.rollup_file(guild_id, user_id)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(path.name + ".tmp")
+
+        with tmp_path.open("w", encoding="utf-8") as f:
+            json.dump(data, f, separators=(",", ":"))
+            count_bytes(written=f.tell())
+
+        os.replace(tmp_path, path)
+
+    # --------------- MAINTENANCE -----------------
+
+    def compact(self, kind: str, guild_id, user_id) -> bool:
+        """Rewrites a log without its dead records once enough of it is tombstones."""
+        path = self._file(kind, guild_id, user_id)
+        if not path.exists():
+            return False
+
+        records, bad = self.scan_log(path)
+        _, tombstones = self.fold(records, "id" if kind == JOURNAL else "date")
+
+        if not records or tombstones / len(records) < self.compact_threshold:
+            return False
+
+        if bad:
+            # The rewrite drops unreadable lines: keep the original for recovery
+            kept = self.quarantine(path, copy=True)
+            log.warning(f"{path} has {bad} unreadable line(s); kept a copy in {kept}")
+
+        entries = self.live_records(kind, records)
+        self.rewrite(path, entries)
+        log.info(f"Compacted {path}: {len(records)} -> {len(entries)} records")
+        return True
+
+    def live_records(self, kind: str, records: list) -> list:
+        """What a compacted log keeps of <records>: the live entries (and the journal ID counter)."""
+        entries, _ = self.fold(records, "id" if kind == JOURNAL else "date")
+
+        if kind == JOURNAL:
+            # Keep the ID counter alive once the deleted entries are gone
+            next_id = self.next_id(records)
+            if next_id > max((e["id"] for e in entries), default=0) + 1:
+                entries = [{"next_id": next_id}] + entries
+        return entries
+
+    def close(self):
+        pass
+
+
+class Storage:
+    """
+    Async facade over a blocking backend.
+    Backends (JsonBackend, SQLiteBackend, BinaryCheckInBackend) share the
+    same method names and are only ever called from the pool.
+    """
+
+    def __init__(self, backend=None, max_workers: int = 4, cache: DocumentCache = None,
+                 snapshot_path: Path = LAST_CHECKIN_SNAPSHOT, partition=None,
+                 write_behind: float = 0, max_dirty: int = 500):
+        self.backend = backend or JsonBackend()
+        self.cache = cache if cache is not None else DocumentCache()
+        # GuildPartition in sharded mode: refuses writes to other workers' guilds
+        self.partition = partition
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers,
+            thread_name_prefix="mellow-storage"
+        )
+        # Locks only live while a command holds or waits on them
+        self._locks = weakref.WeakValueDictionary()
+
+        # Background compaction of logs with many tombstones
+        self._compact_queue = None
+        self._compact_pending = set()
+        self._compactor = None
+
+        # Latest check-in day per user, for the /dailycheckin duplicate check
+        self.last_checkins = LastCheckIns()
+        self._snapshot_path = Path(snapshot_path)
+        self._snapshot_loaded = False
+
+        # Rollups updated in memory but not saved yet. Only cached ones are
+        # tracked: one evicted from the cache moves to _evicted_rollups and
+        # is saved in the background (or taken back if it's needed first),
+        # so it's never rebuilt from the whole history. The rest are saved
+        # on close.
+        self._dirty_rollups = set()
+        self._evicted_rollups = {}
+        self._rollup_saver = None
+        self.cache.on_remove = self._on_cache_remove
+
+        # Write-behind: seconds a write may wait in memory (0 = write at once),
+        # and how many dirty users trigger an early flush
+        self.write_behind = write_behind if getattr(self.backend, "DEFERRABLE", None) else 0
+        if write_behind and not self.write_behind:
+            log.warning(f"{type(self.backend).__name__} can't buffer writes; write-behind is off")
+        self.max_dirty = max(1, max_dirty)
+        # (kind, guild, user) -> [log stamp before the first buffered write, records]
+        self._pending = {}
+        # Same key -> (that stamp, future) while its records are being written
+        self._inflight = {}
+        # Flushes use at most half the pool, so commands keep the rest
+        self._flush_slots = asyncio.Semaphore(max(1, max_workers // 2))
+        self._flush_lock = asyncio.Lock()
+        self._flush_task = None
+        self.flushes = 0
+        self.flushed_records = 0
+
+    # --------------- INTERNAL HELPERS -----------------
+
+    def _lock(self, kind: str, guild_id, user_id) -> asyncio.Lock:
+        key = (SOURCE_KIND.get(kind, kind), str(guild_id), str(user_id))
+        lock = self._locks.get(key)
+        if lock is None:
+            lock = asyncio.Lock()
+            self._locks[key] = lock
+        return lock
+
+    async def _run(self, func, *args, io: tuple = None):
+        """Runs func(*args) in the pool; io=(subsystem, op) also records it in the metrics."""
+        loop = asyncio.get_running_loop()
+        if io is None:
+            return await loop.run_in_executor(self._executor, func, *args)
+        return await loop.run_in_executor(self._executor, timed_io, *io, func, *args)
+
+    def _stamp(self, kind: str, guild_id, user_id):
+        return self.backend.stamp(SOURCE_KIND.get(kind, kind), guild_id, user_id)
+
+    def _read_doc(self, kind: str, guild_id, user_id):
+        """Runs in the pool. Stamp first, so a concurrent edit shows up as stale later."""
+        stamp = self._stamp(kind, guild_id, user_id)
+        if kind == JOURNAL:
+            entries, next_id = self.backend.read_journal(guild_id, user_id)
+            return stamp, JournalIndex(entries, next_id)
+        if kind == ROLLUP:
+            return stamp, self._read_rollup(guild_id, user_id, stamp)
+        if kind == SEARCH:
+            return stamp, JournalSearchIndex(self.backend.load_journal(guild_id, user_id))
+        return stamp, self.backend.read_checkin_series(guild_id, user_id)
+
+    def _read_rollup(self, guild_id, user_id, stamp) -> MoodRollup:
+        """Runs in the pool. Uses the saved rollup if it matches the log, else rebuilds it."""
+        saved = self.backend.load_rollup(guild_id, user_id)
+        if saved is not None and stamp is not None and saved.get("stamp") == list(stamp):
+            try:
+                return MoodRollup.from_dict(saved)
+            except Exception as e:
+                log.warning(f"Bad rollup for {guild_id}/{user_id}, rebuilding: {e}")
+
+        # First stats request since the feature shipped, or the log changed outside the bot
+        rollup = MoodRollup.from_history(self.backend.load_checkins(guild_id, user_id))
+        self.backend.save_rollup(guild_id, user_id, rollup.to_dict(stamp))
+        return rollup
+
+    def _write(self, func, kind: str, guild_id, user_id, *args):
+        """Runs in the pool. Applies a backend write and returns (result, the file's new stamp)."""
+        if self.partition is not None:
+            self.partition.check(guild_id)
+        result = func(guild_id, user_id, *args)
+        return result, self.backend.stamp(kind, guild_id, user_id)
+
+    async def _load(self, kind: str, guild_id, user_id):
+        """
+        Returns the user's parsed document, from the cache when possible.
+        Journals come back as a JournalIndex, check-ins as a CheckInSeries,
+        rollups as a MoodRollup, search indexes as a JournalSearchIndex.
+        Either way the value is shared: treat it as read-only.
+        """
+        cached = self.cache.get((kind, str(guild_id), str(user_id)))
+        if cached is not None and not self.cache.needs_revalidation(cached):
+            self.cache.hits += 1
+            return cached.value
+
+        # Loads share the writers' lock, so a stale read can never be cached
+        # after a write has invalidated it (and concurrent misses load once)
+        async with self._lock(kind, guild_id, user_id):
+            return await self._load_locked(kind, guild_id, user_id)
+
+    async def _load_locked(self, kind: str, guild_id, user_id):
+        """Same as _load, for callers already holding the user's lock."""
+        key = (kind, str(guild_id), str(user_id))
+        cache = self.cache
+
+        cached = cache.get(key)
+        if cached is not None:
+            if not cache.needs_revalidation(cached):
+                cache.hits += 1
+                return cached.value
+
+            # Buffered writes don't change the stamp, so this needs no flush;
+            # one being written right now will update the document itself
+            if (SOURCE_KIND.get(kind, kind), key[1], key[2]) in self._inflight:
+                cache.hits += 1
+                return cached.value
+            stamp = await self._run(self._stamp, kind, guild_id, user_id, io=(SUBSYSTEM[kind], "stamp"))
+            if stamp == cached.stamp:
+                cache.mark_checked(cached)
+                cache.hits += 1
+                return cached.value
+
+            # Changed on disk behind our back
+            cache.stale += 1
+            cache.invalidate(key, count=False)
+
+        if kind == ROLLUP:
+            rollup = await self._reclaim_rollup(guild_id, user_id)
+            if rollup is not None:
+                cache.hits += 1
+                return rollup
+
+        cache.misses += 1
+        await self._flush_user(kind, guild_id, user_id)
+        stamp, value = await self._run(self._read_doc, kind, guild_id, user_id, io=(SUBSYSTEM[kind], "read"))
+        cache.put(key, value, stamp)
+        return value
+
+    def _cached_stamp(self, kind: str, guild_id, user_id):
+        cached = self.cache.get((kind, str(guild_id), str(user_id)))
+        return _UNKNOWN if cached is None else cached.stamp
+
+    def cached_size(self, kind: str, guild_id, user_id):
+        """Approximate bytes of the user's cached document, or None if it has to be read from disk."""
+        cached = self.cache.get((kind, str(guild_id), str(user_id)))
+        return None if cached is None else cached.size
+
+    def _invalidate(self, kind: str, guild_id, user_id):
+        self.cache.invalidate((kind, str(guild_id), str(user_id)))
+
+    def _update_cached(self, kind: str, guild_id, user_id, stamp, update, previous=_UNKNOWN):
+        """
+        Applies a write to the cached document in place with update(value).
+        Drops it instead if it might already be out of date: it's due for
+        revalidation and doesn't match <previous>, the stamp from just
+        before the write (if the caller knows it).
+        """
+        key = (kind, str(guild_id), str(user_id))
+        cached = self.cache.get(key)
+        if cached is None:
+            return
+        if self.cache.needs_revalidation(cached) and cached.stamp != previous:
+            self.cache.invalidate(key, count=False)
+            return
+        size = estimate_size(cached.value)
+        update(cached.value)
+        self.cache.updated(key, stamp, estimate_size(cached.value) - size)
+
+    def _schedule_compaction(self, kind: str, guild_id, user_id):
+        key = (kind, guild_id, user_id)
+        if key in self._compact_pending:
+            return
+
+        if self._compactor is None:
+            self._compact_queue = asyncio.Queue()
+            self._compactor = asyncio.create_task(self._compact_worker())
+
+        self._compact_pending.add(key)
+        self._compact_queue.put_nowait(key)
+
+    async def _compact_worker(self):
+        """Compacts one user at a time so it never competes much with commands."""
+        while True:
+            key = await self._compact_queue.get()
+            if key is None:
+                return
+
+            self._compact_pending.discard(key)
+            kind, guild_id, user_id = key
+            try:
+                async with self._lock(kind, guild_id, user_id):
+                    await self._flush_user(kind, guild_id, user_id)
+                    if await self._run(self.backend.compact, kind, guild_id, user_id, io=(SUBSYSTEM[kind], "compact")):
+                        self._invalidate(kind, guild_id, user_id)
+                        if kind == CHECKIN:
+                            self._invalidate(ROLLUP, guild_id, user_id)
+                            self.last_checkins.drop((str(guild_id), str(user_id)))
+            except Exception as e:
+                log.error(f"Compaction failed for {kind} {guild_id}/{user_id}: {e}")
+
+    # --------------- WRITE-BEHIND -----------------
+    #
+    # With write_behind > 0, log records are buffered per user instead of
+    # appended right away. The in-memory documents are updated as usual and
+    # keep the log's stamp from before the first buffered record, so they
+    # still look current. flush() (run every write_behind seconds by the
+    # StorageFlush cog, early once max_dirty users are waiting, and on close)
+    # takes each user's records under their lock, then appends and fsyncs
+    # the logs with no user locks held, several users at a time in the pool.
+    # Records buffered meanwhile start a new batch. Anything about to read a
+    # log flushes that user first, waiting for a write already in flight.
+
+    def _deferred(self, kind: str) -> bool:
+        return self.write_behind > 0 and kind in self.backend.DEFERRABLE
+
+    async def _defer(self, kind: str, guild_id, user_id, record: dict):
+        """Buffers a log record. Caller holds the user's lock. Returns the log's stamp as last flushed."""
+        if self.partition is not None:
+            self.partition.check(guild_id)
+
+        key = (kind, str(guild_id), str(user_id))
+        pending = self._pending.get(key)
+        if pending is None:
+            inflight = self._inflight.get(key)
+            if inflight is not None:
+                # Documents keep the in-flight batch's stamp until it lands; so does this
+                before = inflight[0]
+            else:
+                before = await self._run(self.backend.stamp, kind, guild_id, user_id, io=(SUBSYSTEM[kind], "stamp"))
+            pending = self._pending[key] = [before, []]
+        pending[1].append(record)
+
+        if len(self._pending) >= self.max_dirty and (self._flush_task is None or self._flush_task.done()):
+            self._flush_task = asyncio.create_task(self.flush())
+        return pending[0]
+
+    async def _write_or_defer(self, func, kind: str, guild_id, user_id, record: dict, *args):
+        """
+        Caller holds the user's lock. Buffers <record> in write-behind mode,
+        else applies func(guild_id, user_id, *args) now. Returns (result, stamp)
+        like _write; a buffered write always succeeds.
+        """
+        if self._deferred(kind):
+            return True, await self._defer(kind, guild_id, user_id, record)
+        return await self._run(self._write, func, kind, guild_id, user_id, *args, io=(SUBSYSTEM[kind], "write"))
+
+    def _write_user(self, kind: str, guild_id, user_id, before, records: list):
+        """
+        Runs in the pool. Appends one user's buffered records in one write
+        and fsyncs the log. Returns (new stamp, changed outside the bot).
+        """
+        outside = self.backend.stamp(kind, guild_id, user_id) != before
+        self.backend.append_records(kind, guild_id, user_id, records, sync=True)
+        return self.backend.stamp(kind, guild_id, user_id), outside
+
+    def _take(self, key: tuple):
+        """Moves a user's buffered records to in-flight. Caller holds the user's lock."""
+        pending = self._pending.pop(key, None)
+        if pending is None:
+            return None
+        before, records = pending
+        self._inflight[key] = (before, asyncio.get_running_loop().create_future())
+        return (*key, before, records)
+
+    async def _write_batch(self, batch: list):
+        """Writes taken records, a few users at a time in the pool, holding no user locks."""
+        async def write(entry):
+            async with self._flush_slots:
+                try:
+                    result = await self._run(self._write_user, *entry, io=("storage", "flush"))
+                except Exception as e:
+                    result = e
+            self._written(entry, result)
+
+        await asyncio.gather(*(write(entry) for entry in batch))
+        self.flushes += 1
+
+    def _written(self, entry: tuple, result):
+        """Applies one user's finished write to the in-memory state and wakes anyone waiting on it."""
+        kind, guild_id, user_id, before, records = entry
+        key = (kind, guild_id, user_id)
+        _, done = self._inflight.pop(key)
+        # Records buffered while this write was in flight (same before stamp)
+        newer = self._pending.get(key)
+
+        try:
+            if isinstance(result, Exception):
+                log.error(f"Could not flush {len(records)} {kind} record(s) for {guild_id}/{user_id}: {result}")
+                if newer is not None:
+                    newer[1][:0] = records
+                else:
+                    self._pending[key] = [before, records]
+                return
+
+            stamp, outside = result
+            self.flushed_records += len(records)
+            if newer is not None:
+                newer[0] = stamp
+
+            for doc_kind in (kind,) + DERIVED_KINDS[kind]:
+                doc_key = (doc_kind, guild_id, user_id)
+                cached = self.cache.get(doc_key)
+                if cached is None or cached.stamp != before:
+                    continue
+                if outside:
+                    # Someone else wrote to the log too: read it again
+                    self.cache.invalidate(doc_key)
+                else:
+                    self.cache.updated(doc_key, stamp)
+
+            evicted = self._evicted_rollups.get((guild_id, user_id)) if kind == CHECKIN else None
+            if evicted is not None and evicted[1] == before:
+                if outside:
+                    del self._evicted_rollups[(guild_id, user_id)]
+                else:
+                    self._evicted_rollups[(guild_id, user_id)] = (evicted[0], stamp)
+
+            if kind == CHECKIN:
+                user = (guild_id, user_id)
+                last = self.last_checkins.get(user)
+                if last is not None and last[1] == before:
+                    if outside:
+                        self.last_checkins.drop(user)
+                    else:
+                        self.last_checkins.set(user, last[0], stamp)
+        finally:
+            done.set_result(None)
+
+    async def _flush_user(self, kind: str, guild_id, user_id):
+        """Writes one user's buffered records before their log is read. Caller holds the lock."""
+        key = (SOURCE_KIND.get(kind, kind), str(guild_id), str(user_id))
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            await asyncio.shield(inflight[1])
+
+        entry = self._take(key)
+        if entry is not None:
+            await self._write_batch([entry])
+
+    async def flush(self):
+        """Writes every buffered record, max_dirty users per batch."""
+        async with self._flush_lock:
+            keys = sorted(self._pending)
+            for start in range(0, len(keys), self.max_dirty):
+                batch = []
+                for key in keys[start:start + self.max_dirty]:
+                    # Only held while the records change hands; the writes don't need it
+                    async with self._lock(*key):
+                        entry = self._take(key)
+                    if entry is not None:
+                        batch.append(entry)
+                if batch:
+                    await self._write_batch(batch)
+
+    def pending_users(self) -> int:
+        return len(self._pending)
+
+    # --------------- JOURNALS -----------------
+
+    async def get_journal(self, guild_id, user_id) -> list:
+        """Returns all journal entries for the user, oldest first."""
+        index = await self._load(JOURNAL, guild_id, user_id)
+        return index.entries
+
+    async def get_journal_entry(self, guild_id, user_id, entry_id: int):
+        """Returns a single journal entry or None."""
+        index = await self._load(JOURNAL, guild_id, user_id)
+        return index.get(entry_id)
+
+    async def get_journal_page(self, guild_id, user_id, page: int, per_page: int):
+        """One page of entries, oldest first. Returns (entries, total entry count)."""
+        index = await self._load(JOURNAL, guild_id, user_id)
+        return index.page(page, per_page), len(index)
+
+    async def get_journal_page_of(self, guild_id, user_id, entry_id: int, per_page: int):
+        """Page number holding <entry_id>, or None if it doesn't exist."""
+        index = await self._load(JOURNAL, guild_id, user_id)
+        return index.page_of(entry_id, per_page)
+
+    async def search_journal(self, guild_id, user_id, query: str, limit: int = 10) -> list:
+        """
+        Entries matching <query> as (matched terms, entry) pairs, best first:
+        most terms matched, then newest. Only the returned entries are looked up.
+        """
+        search = await self._load(SEARCH, guild_id, user_id)
+        hits = search.search(query, limit)
+        if not hits:
+            return []
+
+        index = await self._load(JOURNAL, guild_id, user_id)
+        return [
+            (score, entry)
+            for score, entry in ((score, index.get(entry_id)) for score, entry_id in hits)
+            if entry is not None
+        ]
+
+    async def search_journal_ids(self, guild_id, user_id, prefix: str, limit: int = 25) -> list:
+        """Entry IDs starting with <prefix>, newest first (for autocomplete)."""
+        index = await self._load(JOURNAL, guild_id, user_id)
+        return index.search_prefix(prefix, limit)
+
+    async def export_journal(self, guild_id, user_id) -> list:
+        """All entries, oldest first, in a list later writes won't change (for exports)."""
+        index = await self._load(JOURNAL, guild_id, user_id)
+        return list(index.entries)
+
+    async def append_journal(self, guild_id, user_id, content: str) -> dict:
+        """Adds a new journal entry and returns it (with its allocated ID)."""
+        timestamp = datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S")
+
+        async with self._lock(JOURNAL, guild_id, user_id):
+            index = await self._load_locked(JOURNAL, guild_id, user_id)
+            previous = self._cached_stamp(JOURNAL, guild_id, user_id)
+
+            entry = {
+                "id": index.next_id,
+                "timestamp": timestamp,
+                "content": content
+            }
+            _, stamp = await self._write_or_defer(self.backend.append_journal, JOURNAL, guild_id, user_id, entry, entry)
+
+            index.add(entry)
+            self.cache.updated((JOURNAL, str(guild_id), str(user_id)), stamp, estimate_size([entry]))
+            self._update_cached(SEARCH, guild_id, user_id, stamp,
+                                lambda search: search.add(entry["id"], content), previous)
+            return entry
+
+    async def delete_journal(self, guild_id, user_id, entry_id: int) -> bool:
+        """Removes a journal entry. Returns False if it didn't exist."""
+        async with self._lock(JOURNAL, guild_id, user_id):
+            index = await self._load_locked(JOURNAL, guild_id, user_id)
+            if index.get(entry_id) is None:
+                return False
+            previous = self._cached_stamp(JOURNAL, guild_id, user_id)
+
+            _, stamp = await self._write_or_defer(self.backend.delete_journal, JOURNAL, guild_id, user_id,
+                                                  {"deleted": entry_id}, entry_id)
+
+            removed = index.remove(entry_id)
+            self.cache.updated((JOURNAL, str(guild_id), str(user_id)), stamp, -estimate_size(removed))
+            self._update_cached(SEARCH, guild_id, user_id, stamp,
+                                lambda search: search.remove(entry_id), previous)
+
+        self._schedule_compaction(JOURNAL, guild_id, user_id)
+        return True
+
+    # --------------- CHECK-INS -----------------
+
+    async def get_checkins(self, guild_id, user_id) -> CheckInSeries:
+        """Returns the user's check-ins as a (shared, read-only) CheckInSeries."""
+        return await self._load(CHECKIN, guild_id, user_id)
+
+    async def export_checkins(self, guild_id, user_id) -> CheckInSeries:
+        """A private copy of the user's check-ins, safe to read from another thread."""
+        series = await self._load(CHECKIN, guild_id, user_id)
+        return series.copy()
+
+    async def get_checkin_window(self, guild_id, user_id, days: int) -> list:
+        """(date, mood) pairs for the last <days> days (inclusive of today), oldest first."""
+        series = await self._load(CHECKIN, guild_id, user_id)
+        today = datetime.now().date().toordinal()
+        return series.window(today - days + 1, today)
+
+    async def get_mood_counts(self, guild_id, user_id, days: int):
+        """Mood counts over the last <days> days (inclusive of today). Returns (counts, total)."""
+        rollup = await self._load(ROLLUP, guild_id, user_id)
+        today = datetime.now().date().toordinal()
+        return rollup.counts(today - days + 1, today)
+
+    async def get_mood_days(self, guild_id, user_id, days: int):
+        """
+        Mood code per day over the last <days> days (inclusive of today, 0 = no
+        check-in), oldest first, and the day of the latest check-in (or None).
+        """
+        rollup = await self._load(ROLLUP, guild_id, user_id)
+        today = datetime.now().date().toordinal()
+        return rollup.window(today - days + 1, today), rollup.last_day
+
+    def _read_last_checkin(self, guild_id, user_id):
+        """Runs in the pool. Returns (latest check-in day, log stamp)."""
+        stamp = self.backend.stamp(CHECKIN, guild_id, user_id)
+        return self.backend.last_checkin_day(guild_id, user_id), stamp
+
+    async def load_last_checkins(self):
+        """Restores the last check-in snapshot once; later calls do nothing."""
+        if not self._snapshot_loaded:
+            self._snapshot_loaded = True
+            snapshot = await self._run(LastCheckIns.read_snapshot, self._snapshot_path, io=("checkin", "read"))
+            self.last_checkins.merge(snapshot)
+
+    async def _last_checkin(self, guild_id, user_id) -> int:
+        """Latest check-in day (ordinal, 0 if none). Caller holds the user's check-in lock."""
+        await self.load_last_checkins()
+
+        key = (str(guild_id), str(user_id))
+        entry = self.last_checkins.get(key)
+
+        if entry is None or key in self.last_checkins.unverified:
+            await self._flush_user(CHECKIN, guild_id, user_id)
+
+        if entry is not None and key in self.last_checkins.unverified:
+            # From the last run: only trust it if the log hasn't changed since
+            stamp = await self._run(self.backend.stamp, CHECKIN, guild_id, user_id, io=("checkin", "stamp"))
+            if stamp == entry[1]:
+                self.last_checkins.set(key, *entry)
+            else:
+                entry = None
+
+        if entry is None:
+            day, stamp = await self._run(self._read_last_checkin, guild_id, user_id, io=("checkin", "read"))
+            self.last_checkins.set(key, day, stamp)
+            return day
+
+        return entry[0]
+
+    async def append_checkin(self, guild_id, user_id, mood: str, date: str = None) -> bool:
+        """
+        Logs a check-in for <date> (default today) and updates the user's mood rollup.
+        Returns False if the user already checked in on that day.
+
+        The duplicate check normally comes from memory, and accepting a
+        check-in is a single append; the rollup is saved when it leaves the
+        cache or on close.
+        """
+        date = date or datetime.now().strftime("%Y-%m-%d")
+        day = datetime.strptime(date, "%Y-%m-%d").date().toordinal()
+        key = (str(guild_id), str(user_id))
+
+        async with self._lock(CHECKIN, guild_id, user_id):
+            last = await self._last_checkin(guild_id, user_id)
+            if day == last:
+                return False
+            if day < last:
+                # Backfilling an earlier day: the only case that needs the history
+                series = await self._load_locked(CHECKIN, guild_id, user_id)
+                if series.has(day):
+                    return False
+
+            # Loaded (or rebuilt) against the log as it is before this write
+            rollup = await self._load_locked(ROLLUP, guild_id, user_id)
+
+            added, stamp = await self._write_or_defer(self.backend.append_checkin, CHECKIN, guild_id, user_id,
+                                                      {"date": date, "mood": mood}, date, mood)
+            if not added:
+                return False
+
+            self.last_checkins.set(key, max(day, last), stamp)
+            self._update_cached(CHECKIN, guild_id, user_id, stamp, lambda series: series.add(day, mood))
+
+            size = rollup.estimated_size()
+            rollup.add(day, mood)
+            self.cache.updated((ROLLUP, key[0], key[1]), stamp, rollup.estimated_size() - size)
+            self._dirty_rollups.add(key)
+            return True
+
+    async def delete_checkin(self, guild_id, user_id, date: str) -> bool:
+        """Removes the check-in(s) for <date>. Returns False if there were none."""
+        day = datetime.strptime(date, "%Y-%m-%d").date().toordinal()
+
+        async with self._lock(CHECKIN, guild_id, user_id):
+            if self._deferred(CHECKIN):
+                # The backend checks the log itself; a buffered tombstone can't
+                series = await self._load_locked(CHECKIN, guild_id, user_id)
+                if not series.has(day):
+                    return False
+
+            removed, stamp = await self._write_or_defer(self.backend.delete_checkin, CHECKIN, guild_id, user_id,
+                                                        {"deleted": date}, date)
+            if removed:
+                key = (str(guild_id), str(user_id))
+                self._update_cached(CHECKIN, guild_id, user_id, stamp, lambda series: series.remove(day))
+
+                # The saved rollup no longer matches the log and gets rebuilt on next use
+                self._invalidate(ROLLUP, guild_id, user_id)
+                self._evicted_rollups.pop(key, None)
+
+                entry = self.last_checkins.get(key)
+                if entry is not None:
+                    if entry[0] == day or key in self.last_checkins.unverified:
+                        self.last_checkins.drop(key)
+                    else:
+                        self.last_checkins.set(key, entry[0], stamp)
+
+        if removed:
+            self._schedule_compaction(CHECKIN, guild_id, user_id)
+        return removed
+
+    # --------------- UNSAVED ROLLUPS -----------------
+
+    def _on_cache_remove(self, key, cached, evicted: bool):
+        if key[0] != ROLLUP or key[1:] not in self._dirty_rollups:
+            return
+        self._dirty_rollups.discard(key[1:])
+        # Invalidated ones no longer match the log; evicted ones are still good
+        if evicted:
+            self._evicted_rollups[key[1:]] = (cached.value, cached.stamp)
+            if self._rollup_saver is None or self._rollup_saver.done():
+                self._rollup_saver = asyncio.create_task(self._save_evicted_rollups())
+
+    async def _reclaim_rollup(self, guild_id, user_id):
+        """Puts an evicted, unsaved rollup back in the cache if the log hasn't changed. Caller holds the lock."""
+        key = (str(guild_id), str(user_id))
+        entry = self._evicted_rollups.pop(key, None)
+        if entry is None:
+            return None
+
+        rollup, stamp = entry
+        # Buffered check-ins leave the stamp as it was, like for any cached document
+        if await self._run(self._stamp, ROLLUP, guild_id, user_id, io=("checkin", "stamp")) != stamp:
+            return None
+        self.cache.put((ROLLUP, *key), rollup, stamp)
+        self._dirty_rollups.add(key)
+        return rollup
+
+    async def _save_evicted_rollups(self):
+        """Saves evicted rollups one user at a time, each under the user's lock."""
+        while self._evicted_rollups:
+            guild_id, user_id = next(iter(self._evicted_rollups))
+            try:
+                async with self._lock(CHECKIN, guild_id, user_id):
+                    entry = self._evicted_rollups.pop((guild_id, user_id), None)
+                    if entry is None:
+                        continue
+                    rollup, stamp = entry
+
+                    if (CHECKIN, guild_id, user_id) in self._pending:
+                        # It already counts the buffered check-ins: save it against the log they land in
+                        if await self._run(self._stamp, CHECKIN, guild_id, user_id) != stamp:
+                            continue
+                        await self._flush_user(CHECKIN, guild_id, user_id)
+                        stamp = await self._run(self._stamp, CHECKIN, guild_id, user_id)
+
+                    await self._run(self._flush_rollups, [(guild_id, user_id, rollup.to_dict(stamp))],
+                                    io=("checkin", "write"))
+            except Exception as e:
+                log.error(f"Could not save evicted rollup for {guild_id}/{user_id}: {e}")
+
+    def _flush_rollups(self, rollups: list):
+        """Runs in the pool. Saves (guild, user, data) rollups."""
+        for guild_id, user_id, data in rollups:
+            try:
+                self.backend.save_rollup(guild_id, user_id, data)
+            except Exception as e:
+                log.error(f"Could not save rollup for {guild_id}/{user_id}: {e}")
+
+    async def aclose(self):
+        """Waits for queued I/O to finish, writes buffered records, saves in-memory state and stops the pool."""
+        if self._compactor is not None:
+            self._compact_queue.put_nowait(None)
+            await self._compactor
+
+        await self.flush()
+
+        if self._rollup_saver is not None:
+            await self._rollup_saver
+        await self._save_evicted_rollups()
+
+        rollups = []
+        for guild_id, user_id in self._dirty_rollups:
+            cached = self.cache.get((ROLLUP, guild_id, user_id))
+            if cached is not None:
+                rollups.append((guild_id, user_id, cached.value.to_dict(cached.stamp)))
+        self._dirty_rollups.clear()
+
+        await self._run(self._flush_rollups, rollups, io=("checkin", "write"))
+        if self._snapshot_loaded:
+            await self._run(self.last_checkins.write_snapshot, self._snapshot_path, io=("checkin", "write"))
+
+        await asyncio.to_thread(self._executor.shutdown, True)
+        self.backend.close()
+        log.info(f"Storage cache stats: {self.cache.stats()}")
+
+
+_storage = None
+
+
+def get_storage(partition=None) -> Storage:
+    """
+    Process-wide storage instance shared by all cogs.
+    Built on first use so settings from .env are already loaded.
+
+    Sharded workers call this with their GuildPartition before loading
+    any cogs; the per-process files (the last check-in snapshot) then get
+    the worker's number in their name.
+    """
+    global _storage
+    if _storage is None:
+        workers = int(os.getenv("STORAGE_WORKERS", "4"))
+        backend_name = os.getenv("STORAGE_BACKEND", "json").lower()
+
+        if backend_name == "sqlite":
+            from Modules.Core._SQLiteBackend import SQLiteBackend
+            backend = SQLiteBackend(
+                os.getenv("SQLITE_PATH", "Data/Mellow.db"),
+                pool_size=workers
+            )
+        elif backend_name == "json":
+            compact_threshold = float(os.getenv("COMPACT_THRESHOLD", "0.25"))
+            checkin_format = os.getenv("CHECKIN_FORMAT", "jsonl").lower()
+
+            if checkin_format == "binary":
+                from Modules.Core._BinaryCheckIns import BinaryCheckInBackend
+                backend = BinaryCheckInBackend(
+                    compact_threshold=compact_threshold,
+                    max_open_guilds=int(os.getenv("BINARY_OPEN_GUILDS", "128"))
+                )
+            elif checkin_format == "jsonl":
+                backend = JsonBackend(compact_threshold=compact_threshold)
+            else:
+                raise RuntimeError(f"Unknown CHECKIN_FORMAT '{checkin_format}' (expected jsonl or binary)")
+        else:
+            raise RuntimeError(f"Unknown STORAGE_BACKEND '{backend_name}' (expected json or sqlite)")
+
+        cache = DocumentCache(
+            max_entries=int(os.getenv("CACHE_MAX_ENTRIES", "2048")),
+            max_bytes=int(os.getenv("CACHE_MAX_MB", "64")) * 1024 * 1024,
+            revalidate_after=float(os.getenv("CACHE_REVALIDATE_SECONDS", "2"))
+        )
+
+        snapshot_path = LAST_CHECKIN_SNAPSHOT
+        if partition is not None:
+            snapshot_path = snapshot_path.with_name(f"{snapshot_path.stem}-{partition.worker}{snapshot_path.suffix}")
+
+        log.info(f"Using {backend_name} storage backend with {workers} worker(s)")
+        _storage = Storage(backend, max_workers=workers, cache=cache,
+                           snapshot_path=snapshot_path, partition=partition,
+                           write_behind=float(os.getenv("WRITE_BEHIND_SECONDS", "0")),
+                           max_dirty=int(os.getenv("WRITE_BEHIND_MAX_DIRTY", "500")))
+    return _storage
@@ -0,0 +1,117 @@
+import time
+import signal
+import logging
+import multiprocessing
+
+# --------------------------------------------------------
+# Keeps a fixed set of worker processes running.
+#
+# A worker that exits with an error is restarted after a delay that
+# doubles on every quick crash (and resets once it has stayed up for a
+# while). A worker that exits cleanly is left alone. Ctrl+C / SIGTERM
+# stop everything, giving workers time to flush their storage first.
+# --------------------------------------------------------
+
+log = logging.getLogger("Mellow.Supervisor")
+
+
+class Supervisor:
+    def __init__(self, target, worker_args: list, restart_delay: float = 5.0,
+                 max_restart_delay: float = 300.0, stable_after: float = 120.0,
+                 shutdown_timeout: float = 30.0):
+        """<target>(*worker_args[n]) runs in worker process n."""
+        self.target = target
+        self.worker_args = worker_args
+        self.restart_delay = restart_delay
+        self.max_restart_delay = max_restart_delay
+        self.stable_after = stable_after
+        self.shutdown_timeout = shutdown_timeout
+
+        self._context = multiprocessing.get_context("spawn")
+        self._processes = {}
+        self._started_at = {}
+        self._delays = {}
+        self._restart_at = {}
+        self._finished = set()
+        self._stopping = False
+
+    def _start(self, worker: int):
+        process = self._context.Process(
+            target=self.target,
+            args=self.worker_args[worker],
+            name=f"worker-{worker}"
+        )
+        process.start()
+        self._processes[worker] = process
+        self._started_at[worker] = time.monotonic()
+        log.info(f"Started worker {worker} (pid {process.pid})")
+
+    def _check(self, worker: int):
+        if worker in self._finished:
+            return
+
+        process = self._processes.get(worker)
+
+        if process is None:
+            # Waiting out a restart delay
+            if time.monotonic() >= self._restart_at[worker]:
+                self._start(worker)
+            return
+
+        if process.is_alive():
+            return
+
+        code = process.exitcode
+        del self._processes[worker]
+
+        if code == 0:
+            log.info(f"Worker {worker} exited cleanly; not restarting it")
+            self._finished.add(worker)
+            return
+
+        uptime = time.monotonic() - self._started_at[worker]
+        if uptime >= self.stable_after:
+            self._delays[worker] = self.restart_delay
+        delay = self._delays.get(worker, self.restart_delay)
+        self._delays[worker] = min(delay * 2, self.max_restart_delay)
+
+        log.error(f"Worker {worker} crashed (exit code {code}) after {uptime:.0f}s; restarting in {delay:.0f}s")
+        self._restart_at[worker] = time.monotonic() + delay
+
+    def _request_stop(self, *_):
+        self._stopping = True
+
+    def run(self):
+        """Blocks until every worker has exited cleanly or a stop is requested."""
+        signal.signal(signal.SIGTERM, self._request_stop)
+
+        for worker in range(len(self.worker_args)):
+            self._start(worker)
+
+        try:
+            while not self._stopping and len(self._finished) < len(self.worker_args):
+                for worker in range(len(self.worker_args)):
+                    self._check(worker)
+                time.sleep(1)
+        except KeyboardInterrupt:
+            # Ctrl+C reaches the workers too; they shut down on their own
+            pass
+        finally:
+            self._shutdown()
+
+    def _shutdown(self):
+        log.info("Stopping workers...")
+        for process in self._processes.values():
+            if process.is_alive():
+                process.terminate()  # SIGTERM: workers close the bot and flush storage
+
+        deadline = time.monotonic() + self.shutdown_timeout
+        for worker, process in self._processes.items():
+            process.join(max(0.0, deadline - time.monotonic()))
+            if process.is_alive():
+                log.warning(f"Worker {worker} didn't stop in time; killing it")
+                process.kill()
+                process.join()
+
+        self._processes.clear()
+        log.info("All workers stopped")
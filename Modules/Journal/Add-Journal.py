@@ -1,18 +1,14 @@
 import discord
 from discord import app_commands
 from discord.ext import commands
-import json
-from pathlib import Path
-from datetime import datetime
 
-
-BASE_DIR = Path("Data/Journals")
+from Modules.Core._Storage import get_storage
 
 
 class JournalCog(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
-        BASE_DIR.mkdir(parents=True, exist_ok=True)
+        self.storage = get_storage()
 
     # ------------------------------------------------------------------
     # /journal <content>
@@ -27,38 +23,9 @@ class JournalCog(commands.Cog):
         guild_id = interaction.guild.id if interaction.guild else "DM"
         user_id = interaction.user.id
 
-        # folder for this server
-        guild_folder = BASE_DIR / str(guild_id)
-        guild_folder.mkdir(parents=True, exist_ok=True)
-
-        # file for this user
-        journal_file = guild_folder / f"{user_id}_journal.json"
-
-        # load previous entries
-        if journal_file.exists():
-            try:
-                with journal_file.open("r", encoding="utf-8") as f:
-                    journal_data = json.load(f)
-            except Exception:
-                journal_data = []
-        else:
-            journal_data = []
-
-        # Determine next ID
-        next_id = 1 if len(journal_data) == 0 else max(entry["id"] for entry in journal_data) + 1
-
-        # Create new journal entry
-        entry = {
-            "id": next_id,
-            "timestamp": datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S"),
-            "content": content
-        }
-
-        journal_data.append(entry)
-
-        # Save updated journal
-        with journal_file.open("w", encoding="utf-8") as f:
-            json.dump(journal_data, f, indent=4)
+        # Allocate the next ID and save, serialized per user
+        entry = await self.storage.append_journal(guild_id, user_id, content)
+        next_id = entry["id"]
 
         # ------------------------------------------------------------
         # Embed Response
@@ -0,0 +1,60 @@
+import discord
+from discord import app_commands
+from discord.ext import commands
+
+from Modules.Core._Storage import get_storage
+from Modules.Core._Export import JOURNAL_EXPORT, send_export
+
+
+class JournalExportCog(commands.Cog):
+    def __init__(self, bot):
+        self.bot = bot
+        self.storage = get_storage()
+
+    # ------------------------------------------------------------------
+    # /exportjournal [format] [compression]
+    # ------------------------------------------------------------------
+    @app_commands.command(
+        name="exportjournal",
+        description="Download all of your journal entries as a file."
+    )
+    @app_commands.describe(
+        format="File format (default: JSON Lines)",
+        compression="Archive type (default: gzip)"
+    )
+    @app_commands.choices(
+        format=[
+            app_commands.Choice(name="JSON Lines", value="jsonl"),
+            app_commands.Choice(name="CSV", value="csv"),
+            app_commands.Choice(name="Markdown", value="md"),
+        ],
+        compression=[
+            app_commands.Choice(name="gzip (.gz)", value="gzip"),
+            app_commands.Choice(name="zip", value="zip"),
+        ]
+    )
+    async def exportjournal(self, interaction: discord.Interaction,
+                            format: app_commands.Choice[str] = None,
+                            compression: app_commands.Choice[str] = None):
+
+        guild_id = interaction.guild.id if interaction.guild else "DM"
+        user_id = interaction.user.id
+
+        # Big journals take a while to pack: answer Discord first
+        await interaction.response.defer(ephemeral=True, thinking=True)
+
+        entries = await self.storage.export_journal(guild_id, user_id)
+        if not entries:
+            await interaction.followup.send("You don't have any journal entries to export yet.", ephemeral=True)
+            return
+
+        await send_export(
+            interaction, JOURNAL_EXPORT, entries,
+            format.value if format else "jsonl",
+            compression.value if compression else "gzip",
+            f"Journal of {interaction.user}"
+        )
+
+
+async def setup(bot):
+    await bot.add_cog(JournalExportCog(bot))
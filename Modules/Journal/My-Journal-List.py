@@ -1,17 +1,16 @@
 import discord
 from discord import app_commands
 from discord.ext import commands
-import json
-from pathlib import Path
 
-
-BASE_DIR = Path("Data/Journals")
+from Modules.Core._Storage import get_storage, JOURNAL
+from Modules.Core._Deferral import respond
+from Modules.Journal._JournalPages import JournalPageView, PAGE_SIZE, render_page
 
 
 class JournalListCog(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
-        BASE_DIR.mkdir(parents=True, exist_ok=True)
+        self.storage = get_storage()
 
     # ------------------------------------------------------------------
     # /myjournallist
@@ -25,49 +24,39 @@ class JournalListCog(commands.Cog):
         guild_id = interaction.guild.id if interaction.guild else "DM"
         user_id = interaction.user.id
 
-        guild_folder = BASE_DIR / str(guild_id)
-        journal_file = guild_folder / f"{user_id}_journal.json"
-
-        # No journal file
-        if not journal_file.exists():
-            embed = discord.Embed(
-                description="You don't have any journal entries yet.",
-                color=discord.Color.blurple()
-            )
-            return await interaction.response.send_message(embed=embed, ephemeral=True)
+        async def load():
+            # Only the first page is loaded now; the rest as the user pages through
+            entries, total = await self.storage.get_journal_page(guild_id, user_id, 0, PAGE_SIZE)
+            if total == 0:
+                return entries, None
+
+            # Views are built on the event loop
+            view = JournalPageView(self.storage, guild_id, user_id, total)
+            view.interaction = interaction
+            return entries, view
+
+        # Deferred (and rendered off the loop) when the journal isn't in memory yet
+        await respond(
+            interaction, "myjournallist",
+            self.storage.cached_size(JOURNAL, guild_id, user_id),
+            load,
+            self.render_first_page
+        )
 
-        # Load data
-        try:
-            with journal_file.open("r", encoding="utf-8") as f:
-                journal_data = json.load(f)
-        except Exception:
-            journal_data = []
+    def render_first_page(self, loaded) -> dict:
+        entries, view = loaded
 
-        # Empty file
-        if len(journal_data) == 0:
+        # No entries yet
+        if view is None:
             embed = discord.Embed(
                 description="You don't have any journal entries yet.",
                 color=discord.Color.blurple()
             )
-            return await interaction.response.send_message(embed=embed, ephemeral=True)
-
-        # Build formatted text
-        lines = []
-        for entry in journal_data:
-            lines.append(
-                f"**ID {entry['id']} — {entry['timestamp']}**\n"
-                f"{entry['content']}\n"
-            )
-
-        embed = discord.Embed(
-            title="Your Journal Entries",
-            description="\n".join(lines),
-            color=discord.Color.blurple()
-        )
-
-        embed.set_footer(text="Use /myjournals <id> to view a specific entry.")
+            return {"embed": embed}
 
-        await interaction.response.send_message(embed=embed, ephemeral=True)
+        embed = render_page(entries, 0, view.page_count, view.total)
+        view.remember(0, embed)
+        return {"embed": embed, "view": view}
 
 
 async def setup(bot):
@@ -1,16 +1,14 @@
 import discord
 from discord import app_commands
 from discord.ext import commands
-import json
-from pathlib import Path
 
-
-BASE_DIR = Path("Data/Journals")
+from Modules.Core._Storage import get_storage
 
 
 class JournalViewCog(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
+        self.storage = get_storage()
 
     # ------------------------------------------------------------
     # AUTOCOMPLETE: Suggest the user's journal IDs
@@ -19,26 +17,13 @@ class JournalViewCog(commands.Cog):
         guild_id = interaction.guild.id if interaction.guild else "DM"
         user_id = interaction.user.id
 
-        journal_file = BASE_DIR / str(guild_id) / f"{user_id}_journal.json"
-
-        choices = []
+        # Newest IDs starting with what's been typed so far
+        entry_ids = await self.storage.search_journal_ids(guild_id, user_id, current, limit=25)
 
-        if journal_file.exists():
-            try:
-                with journal_file.open("r", encoding="utf-8") as f:
-                    journal_data = json.load(f)
-            except Exception:
-                journal_data = []
-        else:
-            journal_data = []
-
-        # Filter by typing (optional)
-        for entry in journal_data:
-            entry_id = str(entry["id"])
-            if current in entry_id:
-                choices.append(
-                    app_commands.Choice(name=f"ID {entry_id}", value=entry_id)
-                )
+        choices = [
+            app_commands.Choice(name=f"ID {entry_id}", value=str(entry_id))
+            for entry_id in entry_ids
+        ]
 
         return choices[:25]  # Discord limit
 
@@ -57,25 +42,16 @@ class JournalViewCog(commands.Cog):
         user_id = interaction.user.id
         entry_id = int(entry_id)
 
-        journal_file = BASE_DIR / str(guild_id) / f"{user_id}_journal.json"
+        # Find entry
+        entry = await self.storage.get_journal_entry(guild_id, user_id, entry_id)
 
-        if not journal_file.exists():
+        if not entry and not await self.storage.get_journal(guild_id, user_id):
             embed = discord.Embed(
                 description="You don't have any journal entries yet.",
                 color=discord.Color.red()
             )
             return await interaction.response.send_message(embed=embed, ephemeral=True)
 
-        # Load entries
-        try:
-            with journal_file.open("r", encoding="utf-8") as f:
-                journal_data = json.load(f)
-        except Exception:
-            journal_data = []
-
-        # Find entry
-        entry = next((e for e in journal_data if e["id"] == entry_id), None)
-
         if not entry:
             embed = discord.Embed(
                 description=f"No journal entry with ID **{entry_id}** was found.",
@@ -1,16 +1,14 @@
 import discord
 from discord import app_commands
 from discord.ext import commands
-import json
-from pathlib import Path
 
-
-BASE_DIR = Path("Data/Journals")
+from Modules.Core._Storage import get_storage
 
 
 class RemoveJournalCog(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
+        self.storage = get_storage()
 
     # ------------------------------------------------------------
     # AUTOCOMPLETE: list journal IDs
@@ -19,23 +17,12 @@ class RemoveJournalCog(commands.Cog):
         guild_id = interaction.guild.id if interaction.guild else "DM"
         user_id = interaction.user.id
 
-        journal_file = BASE_DIR / str(guild_id) / f"{user_id}_journal.json"
-
-        choices = []
-
-        if journal_file.exists():
-            try:
-                with journal_file.open("r", encoding="utf-8") as f:
-                    journal_data = json.load(f)
-            except:
-                journal_data = []
-        else:
-            journal_data = []
+        entry_ids = await self.storage.search_journal_ids(guild_id, user_id, current, limit=25)
 
-        for entry in journal_data:
-            entry_id = str(entry["id"])
-            if current in entry_id:
-                choices.append(app_commands.Choice(name=f"ID {entry_id}", value=entry_id))
+        choices = [
+            app_commands.Choice(name=f"ID {entry_id}", value=str(entry_id))
+            for entry_id in entry_ids
+        ]
 
         return choices[:25]
 
@@ -54,39 +41,24 @@ class RemoveJournalCog(commands.Cog):
         user_id = interaction.user.id
         entry_id = int(entry_id)
 
-        journal_file = BASE_DIR / str(guild_id) / f"{user_id}_journal.json"
+        # Remove the entry, serialized per user
+        removed = await self.storage.delete_journal(guild_id, user_id, entry_id)
 
-        # If no file exists
-        if not journal_file.exists():
+        # If no entries exist
+        if not removed and not await self.storage.get_journal(guild_id, user_id):
             embed = discord.Embed(
                 description="You don't have any journal entries to remove.",
                 color=discord.Color.red()
             )
             return await interaction.response.send_message(embed=embed, ephemeral=True)
 
-        # Load entries
-        try:
-            with journal_file.open("r", encoding="utf-8") as f:
-                journal_data = json.load(f)
-        except:
-            journal_data = []
-
-        # Find entry
-        before_count = len(journal_data)
-        journal_data = [e for e in journal_data if e["id"] != entry_id]
-        after_count = len(journal_data)
-
-        if before_count == after_count:
+        if not removed:
             embed = discord.Embed(
                 description=f"No journal entry with ID **{entry_id}** was found.",
                 color=discord.Color.red()
             )
             return await interaction.response.send_message(embed=embed, ephemeral=True)
 
-        # Save the reduced list
-        with journal_file.open("w", encoding="utf-8") as f:
-            json.dump(journal_data, f, indent=4)
-
         embed = discord.Embed(
             description=f"Your journal entry (ID **{entry_id}**) has been removed.",
             color=discord.Color.green()
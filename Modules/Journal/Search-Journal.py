@@ -0,0 +1,56 @@
+import discord
+from discord import app_commands
+from discord.ext import commands
+
+from Modules.Core._Storage import get_storage
+from Modules.Journal._JournalPages import preview
+
+MAX_RESULTS = 10
+
+
+class JournalSearchCog(commands.Cog):
+    def __init__(self, bot):
+        self.bot = bot
+        self.storage = get_storage()
+
+    # ------------------------------------------------------------------
+    # /searchjournal <query>
+    # ------------------------------------------------------------------
+    @app_commands.command(
+        name="searchjournal",
+        description="Search your journal entries for words."
+    )
+    @app_commands.describe(query="Words to look for in your journal entries.")
+    async def searchjournal(self, interaction: discord.Interaction, query: app_commands.Range[str, 1, 200]):
+
+        guild_id = interaction.guild.id if interaction.guild else "DM"
+        user_id = interaction.user.id
+
+        results = await self.storage.search_journal(guild_id, user_id, query, limit=MAX_RESULTS)
+
+        if not results:
+            embed = discord.Embed(
+                description=f"No journal entries matched **{discord.utils.escape_markdown(query)}**.",
+                color=discord.Color.red()
+            )
+            return await interaction.response.send_message(embed=embed, ephemeral=True)
+
+        lines = []
+        for matched, entry in results:
+            lines.append(
+                f"**ID {entry['id']} — {entry['timestamp']}** ({matched} matching word{'s' if matched != 1 else ''})\n"
+                f"{preview(entry['content'], 200)}\n"
+            )
+
+        embed = discord.Embed(
+            title="Journal Search Results",
+            description="\n".join(lines),
+            color=discord.Color.blurple()
+        )
+        embed.set_footer(text="Best matches first, newest first among equals. Use /myjournals <id> to read one in full.")
+
+        await interaction.response.send_message(embed=embed, ephemeral=True)
+
+
+async def setup(bot):
+    await bot.add_cog(JournalSearchCog(bot))
@@ -0,0 +1,126 @@
+import math
+
+import discord
+
+# --------------------------------------------------------
+# Paged view for /myjournallist.
+#
+# Each page is fetched from the user's journal index only when it's first
+# shown, rendered once and kept for as long as the view lives, so flipping
+# back and forth never touches storage again.
+# --------------------------------------------------------
+
+PAGE_SIZE = 5
+PREVIEW_CHARS = 300
+VIEW_TIMEOUT = 300
+
+
+def preview(content: str, limit: int = PREVIEW_CHARS) -> str:
+    if len(content) <= limit:
+        return content
+    return content[:limit].rstrip() + "…"
+
+
+def render_page(entries: list, page: int, page_count: int, total: int) -> discord.Embed:
+    lines = []
+    for entry in entries:
+        lines.append(
+            f"**ID {entry['id']} — {entry['timestamp']}**\n"
+            f"{preview(entry['content'])}\n"
+        )
+
+    embed = discord.Embed(
+        title="Your Journal Entries",
+        description="\n".join(lines) or "Nothing on this page anymore.",
+        color=discord.Color.blurple()
+    )
+    embed.set_footer(
+        text=f"Page {page + 1}/{page_count} · {total} entries · Use /myjournals <id> to read one in full."
+    )
+    return embed
+
+
+class JumpToEntryModal(discord.ui.Modal, title="Jump to entry"):
+    entry_id = discord.ui.TextInput(label="Entry ID", placeholder="e.g. 42", max_length=18)
+
+    def __init__(self, view: "JournalPageView"):
+        super().__init__()
+        self.page_view = view
+
+    async def on_submit(self, interaction: discord.Interaction):
+        value = self.entry_id.value.strip()
+        if not value.isdigit():
+            await interaction.response.send_message("Please enter a number.", ephemeral=True)
+            return
+        await self.page_view.jump_to(interaction, int(value))
+
+
+class JournalPageView(discord.ui.View):
+    def __init__(self, storage, guild_id, user_id: int, total: int, per_page: int = PAGE_SIZE):
+        super().__init__(timeout=VIEW_TIMEOUT)
+        self.storage = storage
+        self.guild_id = guild_id
+        self.user_id = user_id
+        self.per_page = per_page
+        self.total = total
+        self.page_count = max(1, math.ceil(total / per_page))
+        self.page = 0
+        self.next_page.disabled = self.page_count <= 1
+
+        # page number -> rendered embed
+        self._rendered = {}
+        # The /myjournallist interaction, so the buttons can be disabled on timeout
+        self.interaction = None
+
+    async def render(self, page: int) -> discord.Embed:
+        embed = self._rendered.get(page)
+        if embed is None:
+            entries, _ = await self.storage.get_journal_page(self.guild_id, self.user_id, page, self.per_page)
+            embed = render_page(entries, page, self.page_count, self.total)
+            self._rendered[page] = embed
+        return embed
+
+    def remember(self, page: int, embed: discord.Embed):
+        """Keeps a page rendered elsewhere (e.g. the first one, by /myjournallist)."""
+        self._rendered[page] = embed
+
+    async def show(self, interaction: discord.Interaction, page: int):
+        self.page = max(0, min(page, self.page_count - 1))
+        self.previous_page.disabled = self.page == 0
+        self.next_page.disabled = self.page >= self.page_count - 1
+
+        embed = await self.render(self.page)
+        await interaction.response.edit_message(embed=embed, view=self)
+
+    async def jump_to(self, interaction: discord.Interaction, entry_id: int):
+        page = await self.storage.get_journal_page_of(self.guild_id, self.user_id, entry_id, self.per_page)
+        if page is None:
+            await interaction.response.send_message(f"No journal entry found with ID {entry_id}.", ephemeral=True)
+            return
+        await self.show(interaction, page)
+
+    async def interaction_check(self, interaction: discord.Interaction) -> bool:
+        return interaction.user.id == self.user_id
+
+    async def on_timeout(self):
+        for item in self.children:
+            item.disabled = True
+        if self.interaction is not None:
+            try:
+                await self.interaction.edit_original_response(view=self)
+            except discord.HTTPException:
+                pass
+
+    # --------------- BUTTONS -----------------
+
+    @discord.ui.button(label="◀ Previous", style=discord.ButtonStyle.secondary, disabled=True)
+    async def previous_page(self, interaction: discord.Interaction, button: discord.ui.Button):
+        await self.show(interaction, self.page - 1)
+
+    @discord.ui.button(label="Next ▶", style=discord.ButtonStyle.secondary)
+    async def next_page(self, interaction: discord.Interaction, button: discord.ui.Button):
+        await self.show(interaction, self.page + 1)
+
+    @discord.ui.button(label="Jump to ID", style=discord.ButtonStyle.primary)
+    async def jump(self, interaction: discord.Interaction, button: discord.ui.Button):
+        await interaction.response.send_modal(JumpToEntryModal(self))
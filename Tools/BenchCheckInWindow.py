@@ -0,0 +1,112 @@
+"""
+Micro-benchmark for /checkinhistory window queries.
+
+Builds synthetic multi-year check-in histories and times the old
+parse-filter-sort implementation against CheckInSeries.window() for
+1-30 day windows. No bot token or network needed:
+
+    python -m Tools.BenchCheckInWindow [--years 3] [--users 200] [--queries 20000]
+"""
+import sys
+import time
+import random
+import argparse
+from datetime import date, datetime, timedelta
+
+from Modules.Core._CheckInSeries import CheckInSeries
+from Modules.Core._MoodRollup import MOODS
+
+
+def make_history(years: int, rng: random.Random) -> list:
+    """A check-in on most days, ending today, like a long-time daily user."""
+    today = date.today()
+    return [
+        {"date": (today - timedelta(days=offset)).strftime("%Y-%m-%d"), "mood": rng.choice(MOODS)}
+        for offset in range(years * 365, -1, -1)
+        if rng.random() < 0.8
+    ]
+
+
+def filter_history_by_days(history, days: int):
+    """The pre-series implementation, for comparison."""
+    if not history:
+        return []
+
+    today = datetime.now().date()
+    cutoff = today - timedelta(days=days - 1)
+
+    filtered = []
+    for entry in history:
+        try:
+            entry_date = datetime.strptime(entry.get("date"), "%Y-%m-%d").date()
+        except Exception:
+            continue
+
+        if entry_date >= cutoff:
+            filtered.append({"date": entry_date, "mood": entry.get("mood", "unknown")})
+
+    filtered.sort(key=lambda x: x["date"])
+    return filtered
+
+
+def series_window(series: CheckInSeries, days: int):
+    today = date.today().toordinal()
+    return series.window(today - days + 1, today)
+
+
+def measure(func, queries: list) -> dict:
+    timings = []
+    for query in queries:
+        started = time.perf_counter_ns()
+        func(*query)
+        timings.append(time.perf_counter_ns() - started)
+
+    timings.sort()
+    return {
+        "p50_us": timings[len(timings) // 2] / 1000,
+        "p99_us": timings[int(len(timings) * 0.99)] / 1000,
+        "max_us": timings[-1] / 1000
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark check-in window queries.")
+    parser.add_argument("--years", type=int, default=3)
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--queries", type=int, default=20000)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    histories = [make_history(args.years, rng) for _ in range(args.users)]
+
+    started = time.perf_counter()
+    series = [CheckInSeries(history) for history in histories]
+    build_ms = (time.perf_counter() - started) * 1000
+
+    # Same users and window sizes for both implementations
+    picks = [(rng.randrange(args.users), rng.randint(1, 30)) for _ in range(args.queries)]
+
+    # Sanity check: both give the same rows
+    for user, days in picks[:100]:
+        old = [(e["date"], e["mood"]) for e in filter_history_by_days(histories[user], days)]
+        assert old == series_window(series[user], days)
+
+    entries = sum(len(history) for history in histories)
+    print(f"{args.users} users, {entries} check-ins ({entries // args.users} per user)")
+    print(f"Series built in {build_ms:.0f} ms (once per cache load)")
+    print(f"{args.queries} queries\n")
+    print(f"{'':<16}{'p50 (us)':>10}{'p99 (us)':>10}{'max (us)':>10}")
+
+    for name, func, queries in (
+        ("CheckInSeries", series_window, [(series[user], days) for user, days in picks]),
+        ("parse + filter", filter_history_by_days, [(histories[user], days) for user, days in picks])
+    ):
+        result = measure(func, queries)
+        print(f"{name:<16}{result['p50_us']:>10.1f}{result['p99_us']:>10.1f}{result['max_us']:>10.1f}")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,281 @@
+"""
+Offline benchmark of every cog command against generated data.
+
+For each (users, entries per user) scale it builds a Data/ tree of
+journals and check-ins in a temporary folder, loads the real cogs into a
+bot that never connects, and drives each command through fake
+interactions. Each scale runs in its own process, so peak RSS is that
+scale's own. Results go to a JSON file that can be diffed between
+commits. No bot token or network needed:
+
+    python -m Tools.BenchCommands [--users 100,1000,10000,100000] [--entries 10,100,1000,10000]
+                                  [--ops 2000] [--out bench_commands.json]
+
+Every users x entries combination is run, except those whose record count
+would pass --max-records (5 million by default).
+"""
+import os
+import sys
+import json
+import time
+import random
+import shutil
+import asyncio
+import logging
+import argparse
+import platform
+import tempfile
+import subprocess
+import multiprocessing
+from pathlib import Path
+from datetime import date, datetime, timedelta
+
+from Modules.Core._MoodRollup import MOODS
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+MAP_PATH = Path("Modules/Maps/Coping.json")
+GUILDS = 10
+
+WORDS = ("today felt long but the walk after work helped me slow down and breathe "
+         "talked with a friend about the week tired anxious calm grateful proud "
+         "slept badly again meeting went better than expected need more rest").split()
+
+
+# --------------------------------------------------------
+# Synthetic data
+# --------------------------------------------------------
+def user_ids(users: int) -> list:
+    return [(1000 + n % GUILDS, 10 ** 17 + n) for n in range(users)]
+
+
+def make_entry(entry_id: int, when: datetime, rng: random.Random) -> str:
+    content = " ".join(rng.choice(WORDS) for _ in range(rng.randint(8, 40)))
+    return json.dumps({
+        "id": entry_id,
+        "timestamp": when.strftime("%Y-%m-%d %H:%M:%S"),
+        "content": content
+    }, separators=(",", ":")) + "\n"
+
+
+def generate(users: int, entries: int, seed: int) -> int:
+    """Writes Data/ under the current directory. Returns the number of records."""
+    rng = random.Random(seed)
+    journal_dir = Path("Data/Journals")
+    checkin_dir = Path("Data/CheckIns")
+    start = datetime.utcnow() - timedelta(days=entries)
+    yesterday = date.today() - timedelta(days=1)
+    records = 0
+
+    for guild_id, user_id in user_ids(users):
+        (journal_dir / str(guild_id)).mkdir(parents=True, exist_ok=True)
+        (checkin_dir / str(guild_id)).mkdir(parents=True, exist_ok=True)
+
+        with open(journal_dir / str(guild_id) / f"{user_id}_journal.jsonl", "w", encoding="utf-8") as f:
+            f.writelines(
+                make_entry(entry_id, start + timedelta(days=entry_id), rng)
+                for entry_id in range(1, entries + 1)
+            )
+
+        # One check-in on most days, ending yesterday so /dailycheckin can still accept today's
+        with open(checkin_dir / str(guild_id) / f"{user_id}.jsonl", "w", encoding="utf-8") as f:
+            for offset in range(entries, 0, -1):
+                if rng.random() < 0.8:
+                    day = yesterday - timedelta(days=offset - 1)
+                    f.write(f'{{"date":"{day.isoformat()}","mood":"{rng.choice(MOODS)}"}}\n')
+                    records += 1
+
+        records += entries
+    return records
+
+
+# --------------------------------------------------------
+# Commands
+# --------------------------------------------------------
+def scenarios(bot, entries: int) -> list:
+    """(name, call(interaction, rng) coroutine function) for every benchmarked handler."""
+    from Tools._Fakes import command_callback
+
+    journal = command_callback(bot, "journal")
+    myjournallist = command_callback(bot, "myjournallist")
+    myjournals = command_callback(bot, "myjournals")
+    removejournal = command_callback(bot, "removejournal")
+    searchjournal = command_callback(bot, "searchjournal")
+    cope = command_callback(bot, "cope")
+    dailycheckin = command_callback(bot, "dailycheckin")
+    checkinhistory = command_callback(bot, "checkinhistory")
+    checkinstats = command_callback(bot, "checkinstats")
+
+    view_cog = bot.get_cog("JournalViewCog")
+    remove_cog = bot.get_cog("RemoveJournalCog")
+    coping_cog = bot.get_cog("CopingCog")
+    topics = list(coping_cog.coping_map.topics)
+
+    from discord import app_commands
+    moods = [app_commands.Choice(name=mood.title(), value=mood) for mood in MOODS]
+
+    def some_id(rng):
+        return str(rng.randint(1, max(1, entries)))
+
+    return [
+        ("journal", lambda i, rng: journal(i, " ".join(rng.choice(WORDS) for _ in range(20)))),
+        ("myjournallist", lambda i, rng: myjournallist(i)),
+        ("myjournals", lambda i, rng: myjournals(i, some_id(rng))),
+        ("myjournals.autocomplete", lambda i, rng: view_cog.journal_id_autocomplete(i, some_id(rng)[:2])),
+        ("removejournal.autocomplete", lambda i, rng: remove_cog.journal_id_autocomplete(i, some_id(rng)[:1])),
+        ("removejournal", lambda i, rng: removejournal(i, some_id(rng))),
+        ("searchjournal", lambda i, rng: searchjournal(i, " ".join(rng.sample(WORDS, 2)))),
+        ("cope", lambda i, rng: cope(i, rng.choice(topics))),
+        ("cope.autocomplete", lambda i, rng: coping_cog.topic_autocomplete(i, rng.choice(topics)[:rng.randint(1, 4)])),
+        ("dailycheckin", lambda i, rng: dailycheckin(i, rng.choice(moods))),
+        ("checkinhistory", lambda i, rng: checkinhistory(i, rng.randint(1, 30))),
+        ("checkinstats", lambda i, rng: checkinstats(i, rng.randint(1, 30))),
+    ]
+
+
+def percentile(timings: list, q: float) -> float:
+    return timings[min(len(timings) - 1, int(len(timings) * q))]
+
+
+async def run_scenarios(users: int, entries: int, ops: int, seed: int) -> dict:
+    from Tools._Fakes import FakeInteraction, load_bot
+    from Modules.Core._Storage import get_storage
+
+    bot = await load_bot()
+    rng = random.Random(seed)
+    people = user_ids(users)
+    results = {}
+
+    try:
+        for name, call in scenarios(bot, entries):
+            timings = []
+            errors = 0
+            started = time.perf_counter()
+
+            for _ in range(ops):
+                guild_id, user_id = rng.choice(people)
+                interaction = FakeInteraction(guild_id, user_id)
+
+                op_started = time.perf_counter()
+                try:
+                    await call(interaction, rng)
+                except Exception:
+                    errors += 1
+                timings.append(time.perf_counter() - op_started)
+
+            elapsed = time.perf_counter() - started
+            timings.sort()
+            results[name] = {
+                "ops": ops,
+                "ops_per_sec": round(ops / elapsed, 1),
+                "p50_ms": round(percentile(timings, 0.50) * 1000, 3),
+                "p99_ms": round(percentile(timings, 0.99) * 1000, 3),
+                "errors": errors
+            }
+            print(f"  {name:<28}{results[name]['ops_per_sec']:>10.0f} ops/s"
+                  f"{results[name]['p50_ms']:>10.2f} ms p50{results[name]['p99_ms']:>10.2f} ms p99", flush=True)
+    finally:
+        for extension in list(bot.extensions):
+            await bot.unload_extension(extension)
+        await get_storage().aclose()
+
+    return results
+
+
+def peak_rss_mb():
+    try:
+        import resource
+    except ImportError:
+        return None  # Windows
+    # KiB on Linux, bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def run_scale(users: int, entries: int, ops: int, seed: int, workdir: str) -> dict:
+    """Runs in a fresh process, inside <workdir>."""
+    os.chdir(workdir)
+    sys.path.insert(0, str(REPO_ROOT))
+    os.environ["STORAGE_BACKEND"] = "json"
+    os.environ["CHECKIN_FORMAT"] = "jsonl"
+    os.environ.pop("METRICS_PORT", None)
+    logging.basicConfig(level=logging.WARNING)
+
+    MAP_PATH.parent.mkdir(parents=True, exist_ok=True)
+    shutil.copy(REPO_ROOT / MAP_PATH, MAP_PATH)
+
+    started = time.perf_counter()
+    records = generate(users, entries, seed)
+    generate_s = time.perf_counter() - started
+    print(f"  generated {records} records in {generate_s:.1f} s", flush=True)
+
+    commands = asyncio.run(run_scenarios(users, entries, ops, seed))
+    return {
+        "users": users,
+        "entries_per_user": entries,
+        "records": records,
+        "generate_s": round(generate_s, 2),
+        "peak_rss_mb": peak_rss_mb(),
+        "commands": commands
+    }
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"], cwd=REPO_ROOT,
+            capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except Exception:
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark every cog command offline.")
+    parser.add_argument("--users", default="100,1000,10000,100000", help="comma-separated user counts")
+    parser.add_argument("--entries", default="10,100,1000,10000", help="comma-separated entries per user")
+    parser.add_argument("--ops", type=int, default=2000, help="calls per command per scale")
+    parser.add_argument("--max-records", type=int, default=5_000_000)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--out", default="bench_commands.json")
+    parser.add_argument("--keep", action="store_true", help="keep the generated Data/ folders")
+    args = parser.parse_args()
+
+    scales = []
+    context = multiprocessing.get_context("spawn")
+
+    for users in (int(n) for n in args.users.split(",")):
+        for entries in (int(n) for n in args.entries.split(",")):
+            # Journal entries plus (about as many) check-ins
+            if users * entries * 2 > args.max_records:
+                print(f"Skipping {users} users x {entries} entries: over --max-records")
+                continue
+
+            print(f"{users} users x {entries} entries per user", flush=True)
+            workdir = tempfile.mkdtemp(prefix="mellow-bench-")
+            try:
+                with context.Pool(1) as pool:
+                    scales.append(pool.apply(run_scale, (users, entries, args.ops, args.seed, workdir)))
+            finally:
+                if args.keep:
+                    print(f"  data kept in {workdir}")
+                else:
+                    shutil.rmtree(workdir, ignore_errors=True)
+
+    report = {
+        "generated_at": datetime.utcnow().strftime("%Y-%m-%dT%H:%M:%SZ"),
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "ops_per_command": args.ops,
+        "seed": args.seed,
+        "scales": scales
+    }
+    with open(args.out, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=4)
+
+    print(f"Wrote {args.out}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,125 @@
+"""
+Micro-benchmark for /cope topic autocomplete.
+
+Builds a synthetic coping map (default 5,000 topics with aliases) and
+times TopicIndex.suggest() against the old linear substring scan, per
+keystroke-sized query. No bot token or network needed:
+
+    python -m Tools.BenchTopicAutocomplete [--topics 5000] [--queries 20000]
+"""
+import sys
+import time
+import random
+import argparse
+
+from Modules.Coping._TopicIndex import TopicIndex
+
+ONSETS = ["", "b", "c", "d", "f", "g", "h", "l", "m", "n", "p", "r", "s", "t", "v", "w",
+          "br", "cl", "dr", "fl", "gr", "pl", "sh", "st", "th", "tr"]
+VOWELS = ["a", "e", "i", "o", "u", "ai", "ea", "ou"]
+CODAS = ["", "", "n", "r", "s", "t", "l", "m", "ng", "st", "ss"]
+
+
+def make_word(rng: random.Random) -> str:
+    """Pronounceable made-up word, so trigram statistics look like real topic names."""
+    return "".join(
+        rng.choice(ONSETS) + rng.choice(VOWELS) + rng.choice(CODAS)
+        for _ in range(rng.randint(2, 3))
+    )
+
+
+def make_map(count: int, rng: random.Random) -> dict:
+    coping_map = {}
+    while len(coping_map) < count:
+        topic = "_".join(make_word(rng) for _ in range(rng.randint(1, 2)))
+        coping_map[topic] = {
+            "aliases": [make_word(rng) for _ in range(rng.randint(0, 3))],
+            "responses": []
+        }
+    return coping_map
+
+
+def make_queries(coping_map: dict, count: int, rng: random.Random) -> list:
+    """(kind, query) pairs: "prefix" for partially typed names, "typo" for misspellings/noise."""
+    topics = list(coping_map)
+    queries = []
+    for _ in range(count):
+        topic = rng.choice(topics).replace("_", " ")
+        roll = rng.random()
+
+        if roll < 0.5:
+            # Typing the start of a name, one keystroke at a time
+            queries.append(("prefix", topic[:rng.randint(1, len(topic))]))
+        elif roll < 0.7:
+            # Start of a later word
+            word = rng.choice(topic.split(" "))
+            queries.append(("prefix", word[:rng.randint(1, len(word))]))
+        elif roll < 0.9 and len(topic) > 3:
+            # Two neighbouring letters swapped
+            pos = rng.randint(0, len(topic) - 2)
+            queries.append(("typo", topic[:pos] + topic[pos + 1] + topic[pos] + topic[pos + 2:]))
+        else:
+            noise = "".join(rng.choice("abcdefghijklmnopqrstuvwxyz") for _ in range(rng.randint(1, 6)))
+            queries.append(("typo", noise))
+    return queries
+
+
+def linear_scan(coping_map: dict, current: str) -> list:
+    """The pre-index implementation, for comparison."""
+    current = current.lower()
+    return [topic for topic in coping_map if current in topic][:25]
+
+
+def measure(func, queries: list) -> dict:
+    timings = []
+    for query in queries:
+        started = time.perf_counter_ns()
+        func(query)
+        timings.append(time.perf_counter_ns() - started)
+
+    timings.sort()
+    return {
+        "p50_us": timings[len(timings) // 2] / 1000,
+        "p99_us": timings[int(len(timings) * 0.99)] / 1000,
+        "max_us": timings[-1] / 1000
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark /cope topic autocomplete.")
+    parser.add_argument("--topics", type=int, default=5000)
+    parser.add_argument("--queries", type=int, default=20000)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    coping_map = make_map(args.topics, rng)
+    queries = make_queries(coping_map, args.queries, rng)
+
+    started = time.perf_counter()
+    index = TopicIndex(coping_map)
+    build_ms = (time.perf_counter() - started) * 1000
+
+    print(f"{len(coping_map)} topics, {len(index.terms)} names/aliases, index built in {build_ms:.0f} ms")
+    print(f"{len(queries)} queries\n")
+    print(f"{'':<14}{'queries':<9}{'p50 (us)':>10}{'p99 (us)':>10}{'max (us)':>10}")
+
+    groups = (
+        ("all", [q for _, q in queries]),
+        ("prefix", [q for kind, q in queries if kind == "prefix"]),
+        ("typo", [q for kind, q in queries if kind == "typo"])
+    )
+
+    for name, func in (
+        ("TopicIndex", index.suggest),
+        ("linear scan", lambda q: linear_scan(coping_map, q))
+    ):
+        for group, group_queries in groups:
+            result = measure(func, group_queries)
+            print(f"{name:<14}{group:<9}{result['p50_us']:>10.1f}{result['p99_us']:>10.1f}{result['max_us']:>10.1f}")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,164 @@
+"""
+Converts the Data/CheckIns JSON tree (old .json files and .jsonl logs)
+into the binary check-in store, then verifies the round trip.
+
+Run from the bot's root folder with the bot stopped:
+
+    python -m Tools.ConvertCheckInsToBinary [--out Data/CheckInsBin] [--force]
+    python -m Tools.ConvertCheckInsToBinary --verify-only
+
+The binary format holds one check-in per day and only the five known
+moods, so unknown moods are skipped and only the last check-in of a day
+is kept, as /checkinstats already counts it (both are counted).
+Afterwards set CHECKIN_FORMAT=binary in .env.
+"""
+import sys
+import time
+import shutil
+import argparse
+from pathlib import Path
+from datetime import date, datetime
+
+from Modules.Core._Storage import JsonBackend
+from Modules.Core._BinaryCheckIns import BinaryCheckInBackend, BINARY_CHECKIN_DIR
+from Modules.Core._MoodRollup import MOOD_CODES
+
+
+def parse_day(value):
+    """Ordinal of a YYYY-MM-DD date, or None. Same rule as MoodRollup.from_history."""
+    try:
+        return datetime.strptime(value, "%Y-%m-%d").date().toordinal()
+    except (TypeError, ValueError):
+        return None
+
+
+def storable_rows(history: list, skipped: dict) -> list:
+    """
+    (day ordinal, mood) rows the binary store can hold: known moods, and
+    the last of them on each day, the one MoodRollup.from_history counts.
+    """
+    rows = {}
+    for entry in history:
+        mood = str(entry.get("mood", "unknown")).lower()
+        day = parse_day(entry.get("date"))
+        if day is None:
+            skipped["bad date"] += 1
+        elif mood not in MOOD_CODES:
+            skipped["unknown mood"] += 1
+        else:
+            if day in rows:
+                skipped["same day"] += 1
+            rows[day] = mood
+    return sorted(rows.items())
+
+
+def logged_checkins(source: JsonBackend, guild_id, user_id) -> list:
+    """
+    (date, mood) pairs verify() expects, read straight from the user's log
+    (or old .json file) rather than through storable_rows: tombstones drop
+    their day, and the last known mood of a day wins. Never moves files.
+    """
+    path = source.checkin_file(guild_id, user_id)
+    if path.exists():
+        records, _ = source.scan_log(path)
+    else:
+        try:
+            records = source.read_legacy(path.with_suffix(".json"))
+        except (OSError, ValueError):
+            records = []
+
+    days = {}
+    for record in records:
+        if "deleted" in record:
+            days.pop(record["deleted"], None)
+            continue
+        mood = str(record.get("mood", "unknown")).lower()
+        day = parse_day(record.get("date"))
+        if day is not None and mood in MOOD_CODES:
+            days[record["date"]] = (day, mood)
+
+    return [(date.fromordinal(day).isoformat(), mood) for day, mood in sorted(days.values())]
+
+
+def convert(source: JsonBackend, target: BinaryCheckInBackend) -> dict:
+    totals = {"users": 0, "check-ins": 0}
+    skipped = {"bad date": 0, "unknown mood": 0, "same day": 0}
+
+    for guild_id, user_id in source.iter_checkin_users():
+        if not user_id.isdigit():
+            print(f"Skipping {guild_id}/{user_id}: not a user ID")
+            continue
+
+        rows = storable_rows(source.load_checkins(guild_id, user_id), skipped)
+        target.import_user(guild_id, user_id, rows)
+        totals["users"] += 1
+        totals["check-ins"] += len(rows)
+
+    return {**totals, **{f"skipped ({reason})": count for reason, count in skipped.items()}}
+
+
+def verify(source: JsonBackend, target: BinaryCheckInBackend) -> int:
+    """Compares every user's data in both stores. Returns the number of mismatches."""
+    mismatches = 0
+    expected_users = set()
+
+    for guild_id, user_id in source.iter_checkin_users():
+        if not user_id.isdigit():
+            continue
+        expected_users.add((guild_id, user_id))
+
+        expected = logged_checkins(source, guild_id, user_id)
+        actual = [(e["date"], e["mood"]) for e in target.load_checkins(guild_id, user_id)]
+
+        if actual != expected:
+            mismatches += 1
+            print(f"Mismatch for {guild_id}/{user_id}: {len(expected)} expected, {len(actual)} stored")
+
+    for guild_id, user_id in target.iter_checkin_users():
+        if (guild_id, user_id) not in expected_users:
+            mismatches += 1
+            print(f"Unexpected user {guild_id}/{user_id} in the binary store")
+
+    return mismatches
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Convert Mellow's check-ins to the binary format.")
+    parser.add_argument("--out", default=str(BINARY_CHECKIN_DIR), help="Binary store folder to write")
+    parser.add_argument("--force", action="store_true", help="Replace an existing binary store")
+    parser.add_argument("--verify-only", action="store_true", help="Only compare the two stores")
+    args = parser.parse_args()
+
+    out = Path(args.out)
+    source = JsonBackend()
+
+    if not args.verify_only:
+        if out.exists() and any(out.iterdir()):
+            if not args.force:
+                print(f"{out} already has data. Re-run with --force to replace it.")
+                return 1
+            shutil.rmtree(out)
+
+        target = BinaryCheckInBackend(binary_dir=out)
+        started = time.perf_counter()
+        totals = convert(source, target)
+        target.close()
+
+        for name, count in totals.items():
+            print(f"{name}: {count}")
+        print(f"Converted in {time.perf_counter() - started:.1f}s")
+
+    target = BinaryCheckInBackend(binary_dir=out)
+    mismatches = verify(source, target)
+    target.close()
+
+    if mismatches:
+        print(f"Verification FAILED: {mismatches} mismatch(es)")
+        return 1
+
+    print("Verification passed: every check-in round-trips")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,234 @@
+"""
+Offline maintenance of the Data/ tree used by the json backend.
+
+For every journal and check-in log it:
+
+    - rewrites the log compactly: one minified record per line, deleted
+      entries and their tombstones dropped, old-style .json files (often
+      indent=4) upgraded to logs
+    - keeps only the latest check-in of each day, the one /checkinstats
+      already counts
+    - moves files that can't be parsed to Data/Quarantine/ instead of
+      letting the bot start them afresh, and keeps a copy of logs with
+      unreadable lines there before those lines are dropped
+    - rebuilds every mood rollup, and drops the last check-in snapshots
+      (the bot rebuilds them as users check in)
+    - removes temp files left behind by a crash mid-rewrite
+
+Guild folders are processed in parallel by a pool of processes. Run from
+the bot's root folder with the bot stopped:
+
+    python -m Tools.MaintainData [--data Data] [--workers N] [--dry-run]
+
+--dry-run reports what would change without touching anything.
+"""
+import os
+import sys
+import time
+import argparse
+from pathlib import Path
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+
+from Modules.Core._Storage import JsonBackend, JOURNAL, CHECKIN, dump_line
+from Modules.Core._MoodRollup import MoodRollup
+
+
+def backend_for(data_dir: Path) -> JsonBackend:
+    return JsonBackend(
+        journal_dir=data_dir / "Journals",
+        checkin_dir=data_dir / "CheckIns",
+        rollup_dir=data_dir / "Rollups",
+        quarantine_dir=data_dir / "Quarantine"
+    )
+
+
+def guild_users(folder: Path, suffix: str) -> list:
+    """User IDs with a log or legacy file in one guild folder."""
+    users = set()
+    for pattern in (f"*{suffix}.jsonl", f"*{suffix}.json"):
+        for file in folder.glob(pattern):
+            users.add(file.name[:-len(suffix + file.suffix)])
+    return sorted(users)
+
+
+def latest_per_day(entries: list):
+    """Keeps the last check-in of each date, in log order. Returns (entries, dropped)."""
+    last = {}
+    for pos, entry in enumerate(entries):
+        last[entry.get("date")] = pos
+
+    kept = [entry for pos, entry in enumerate(entries) if last[entry.get("date")] == pos]
+    return kept, len(entries) - len(kept)
+
+
+# --------------------------------------------------------
+# One log
+# --------------------------------------------------------
+def maintain_log(backend: JsonBackend, kind: str, guild_id: str, user_id: str,
+                 stats: Counter, quarantined: list, dry_run: bool):
+    """Compacts one user's log. Returns its live records, or None if it was quarantined."""
+    path = backend.journal_file(guild_id, user_id) if kind == JOURNAL else backend.checkin_file(guild_id, user_id)
+    legacy = path.with_suffix(".json")
+    upgrade = not path.exists()
+    source = legacy if upgrade else path
+
+    stats[f"{kind} files"] += 1
+    size = source.stat().st_size
+    stats[f"{kind} bytes before"] += size
+
+    if upgrade:
+        try:
+            records = backend.read_legacy(legacy)
+        except ValueError as e:
+            quarantined.append(f"{legacy}: {e}")
+            stats["files quarantined"] += 1
+            if not dry_run:
+                backend.quarantine(legacy)
+            return None
+        bad = 0
+    else:
+        records, bad = backend.scan_log(path)
+        if bad:
+            quarantined.append(f"{path}: {bad} unreadable line(s), copy kept")
+            stats["unreadable lines dropped"] += bad
+            stats["files quarantined"] += 1
+            if not dry_run:
+                backend.quarantine(path, copy=True)
+
+    live = backend.live_records(kind, records)
+    stats["deleted records dropped"] += len(records) - sum(1 for record in live if "next_id" not in record)
+    if kind == CHECKIN:
+        live, duplicates = latest_per_day(live)
+        stats["same-day check-ins dropped"] += duplicates
+
+    data = "".join(dump_line(record) for record in live)
+    new_size = len(data.encode("utf-8"))
+
+    if not upgrade and not bad and len(live) == len(records) and new_size == size:
+        stats[f"{kind} bytes after"] += size
+        return live
+
+    stats[f"{kind} bytes after"] += new_size
+    stats["files rewritten"] += 1
+    if upgrade:
+        stats["legacy files upgraded"] += 1
+
+    if not dry_run:
+        backend.rewrite(path, live)
+        if upgrade:
+            legacy.unlink()
+    return live
+
+
+# --------------------------------------------------------
+# One guild (runs in a worker process)
+# --------------------------------------------------------
+def maintain_guild(data_dir: str, guild_id: str, dry_run: bool):
+    """Returns (stats, quarantined file notes, seconds spent)."""
+    started = time.perf_counter()
+    backend = backend_for(Path(data_dir))
+    stats = Counter()
+    quarantined = []
+
+    for base_dir in (backend.journal_dir, backend.checkin_dir, backend.rollup_dir):
+        for tmp_file in (base_dir / guild_id).glob("*.tmp"):
+            stats["temp files removed"] += 1
+            if not dry_run:
+                tmp_file.unlink()
+
+    journal_folder = backend.journal_dir / guild_id
+    for user_id in guild_users(journal_folder, "_journal") if journal_folder.is_dir() else ():
+        maintain_log(backend, JOURNAL, guild_id, user_id, stats, quarantined, dry_run)
+
+    checkin_folder = backend.checkin_dir / guild_id
+    for user_id in guild_users(checkin_folder, "") if checkin_folder.is_dir() else ():
+        history = maintain_log(backend, CHECKIN, guild_id, user_id, stats, quarantined, dry_run)
+        if history is None or dry_run:
+            continue
+
+        # Stamped with the log as it is now, so the bot trusts it as-is
+        stamp = backend.stamp(CHECKIN, guild_id, user_id)
+        backend.save_rollup(guild_id, user_id, MoodRollup.from_history(history).to_dict(stamp))
+        stats["rollups rebuilt"] += 1
+
+    return stats, quarantined, time.perf_counter() - started
+
+
+# --------------------------------------------------------
+def guild_ids(data_dir: Path) -> list:
+    guilds = set()
+    for name in ("Journals", "CheckIns", "Rollups"):
+        folder = data_dir / name
+        if folder.is_dir():
+            guilds.update(child.name for child in folder.iterdir() if child.is_dir())
+    return sorted(guilds)
+
+
+def _mib(size: int) -> str:
+    return f"{size / 1024 / 1024:.1f} MiB"
+
+
+def print_report(stats: Counter, quarantined: list, wall: float, busy: float, workers: int, dry_run: bool):
+    print()
+    print(f"{'':<12}{'files':>10}{'before':>14}{'after':>14}{'saved':>8}")
+    for kind, label in ((JOURNAL, "Journals"), (CHECKIN, "Check-ins")):
+        before, after = stats[f"{kind} bytes before"], stats[f"{kind} bytes after"]
+        saved = f"{1 - after / before:.0%}" if before else "-"
+        print(f"{label:<12}{stats[f'{kind} files']:>10}{_mib(before):>14}{_mib(after):>14}{saved:>8}")
+
+    print()
+    for name in ("files rewritten", "legacy files upgraded", "deleted records dropped",
+                 "same-day check-ins dropped", "unreadable lines dropped", "files quarantined",
+                 "rollups rebuilt", "snapshots removed", "temp files removed"):
+        print(f"{name:<28}{stats[name]:>10}")
+
+    if quarantined:
+        print()
+        print("Quarantined:" if not dry_run else "Would quarantine:")
+        for note in quarantined:
+            print(f"  {note}")
+
+    print()
+    print(f"Done in {wall:.1f}s ({busy:.1f}s of work across {workers} process(es))"
+          + (" - dry run, nothing was changed" if dry_run else ""))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compact, check and repair Mellow's Data/ tree.")
+    parser.add_argument("--data", default="Data", help="Data folder to maintain")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Worker processes")
+    parser.add_argument("--dry-run", action="store_true", help="Report without changing anything")
+    args = parser.parse_args()
+
+    data_dir = Path(args.data)
+    if not data_dir.is_dir():
+        print(f"{data_dir} doesn't exist")
+        return 1
+
+    started = time.perf_counter()
+    guilds = guild_ids(data_dir)
+    stats = Counter()
+    quarantined = []
+    busy = 0.0
+
+    with ProcessPoolExecutor(max_workers=max(1, args.workers)) as pool:
+        runs = pool.map(maintain_guild, [str(data_dir)] * len(guilds), guilds, [args.dry_run] * len(guilds),
+                        chunksize=max(1, len(guilds) // (args.workers * 4)))
+        for guild_stats, guild_quarantined, seconds in runs:
+            stats.update(guild_stats)
+            quarantined.extend(guild_quarantined)
+            busy += seconds
+
+    # Their stamps no longer match the rewritten logs
+    for snapshot in data_dir.glob("LastCheckIns*.json"):
+        stats["snapshots removed"] += 1
+        if not args.dry_run:
+            snapshot.unlink()
+
+    print_report(stats, quarantined, time.perf_counter() - started, busy, args.workers, args.dry_run)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,154 @@
+"""
+One-shot migration of the Data/Journals and Data/CheckIns JSON trees into
+the SQLite backend.
+
+Run from the bot's root folder:
+
+    python -m Tools.MigrateToSQLite [--db Data/Mellow.db] [--batch 5000] [--force]
+
+Files are streamed one user at a time and committed in batches, so memory
+use stays flat no matter how many users there are. Journal entries whose
+ID is already taken (left by older, unlocked writes) get the next free ID,
+and check-ins without a valid date are skipped; both are counted in the
+report. The JSON tree is only read: files that can't be parsed are left
+where they are and counted too. If the migration fails partway the database is emptied again, so
+it can simply be re-run. Afterwards set STORAGE_BACKEND=sqlite in .env.
+"""
+import sys
+import time
+import argparse
+from datetime import date
+from collections import Counter
+
+from Modules.Core._Storage import JsonBackend
+from Modules.Core._SQLiteBackend import SQLiteBackend
+
+
+def read_records(source: JsonBackend, path, problems: Counter) -> list:
+    """Every record in a log (or old .json file), without quarantining anything."""
+    if path.exists():
+        records, bad = source.scan_log(path)
+        if bad:
+            problems["unreadable log lines skipped"] += bad
+        return records
+
+    legacy = path.with_suffix(".json")
+    if not legacy.exists():
+        return []
+    try:
+        return source.read_legacy(legacy)
+    except (OSError, ValueError) as e:
+        print(f"Could not read {legacy} ({e}); left it in place")
+        problems["unreadable files skipped"] += 1
+        return []
+
+
+def journal_rows(source: JsonBackend, counters: list, problems: Counter):
+    for guild_id, user_id in source.iter_journal_users():
+        records = read_records(source, source.journal_file(guild_id, user_id), problems)
+        entries, _ = source.fold(records, "id")
+        next_id = source.next_id(records)
+        seen = set()
+
+        for entry in entries:
+            entry_id = entry.get("id")
+            if not isinstance(entry_id, int) or entry_id in seen:
+                entry_id = next_id
+                problems["journal IDs reassigned"] += 1
+            seen.add(entry_id)
+            next_id = max(next_id, entry_id + 1)
+
+            yield (guild_id, int(user_id), entry_id, entry.get("timestamp") or "", entry.get("content") or "")
+
+        counters.append((guild_id, int(user_id), next_id))
+
+
+def valid_date(value) -> bool:
+    try:
+        date.fromisoformat(value)
+        return True
+    except (TypeError, ValueError):
+        return False
+
+
+def checkin_rows(source: JsonBackend, problems: Counter):
+    for guild_id, user_id in source.iter_checkin_users():
+        records = read_records(source, source.checkin_file(guild_id, user_id), problems)
+        for entry in source.fold(records, "date")[0]:
+            if not valid_date(entry.get("date")):
+                problems["check-ins without a valid date skipped"] += 1
+                continue
+            yield (guild_id, int(user_id), entry["date"], entry.get("mood", "unknown"))
+
+
+def migrate(source: JsonBackend, target: SQLiteBackend, batch_size: int):
+    totals = {}
+    counters = []
+    problems = Counter()
+    sources = (("journals", journal_rows(source, counters, problems)), ("checkins", checkin_rows(source, problems)))
+
+    for name, rows in sources:
+        batch = []
+        count = 0
+
+        for row in rows:
+            batch.append(row)
+            if len(batch) >= batch_size:
+                flush(target, name, batch)
+                count += len(batch)
+                batch = []
+
+        if batch:
+            flush(target, name, batch)
+            count += len(batch)
+
+        totals[name] = count
+        print(f"Migrated {count} {name} rows")
+
+    # One small row per journal user, so these fit in memory
+    target.import_rows([], [], counters)
+
+    for problem, count in sorted(problems.items()):
+        print(f"{count} {problem}")
+    return totals
+
+
+def flush(target: SQLiteBackend, name: str, batch: list):
+    if name == "journals":
+        target.import_rows(batch, [])
+    else:
+        target.import_rows([], batch)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Migrate Mellow's JSON data into SQLite.")
+    parser.add_argument("--db", default="Data/Mellow.db", help="SQLite database to write")
+    parser.add_argument("--batch", type=int, default=5000, help="Rows per transaction")
+    parser.add_argument("--force", action="store_true", help="Wipe an existing non-empty database first")
+    args = parser.parse_args()
+
+    target = SQLiteBackend(args.db, pool_size=1)
+
+    if target.count_rows() > 0:
+        if not args.force:
+            print(f"{args.db} already has data. Re-run with --force to replace it.")
+            target.close()
+            return 1
+        target.clear()
+
+    started = time.perf_counter()
+    try:
+        migrate(JsonBackend(), target, args.batch)
+    except BaseException:
+        # Don't leave a half-migrated database behind
+        target.clear()
+        raise
+    finally:
+        target.close()
+
+    print(f"Done in {time.perf_counter() - started:.1f}s -> {args.db}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,318 @@
+"""
+Concurrency stress test for the journal and check-in write paths.
+
+Fires thousands of overlapping fake interactions per user through the real
+cogs, then re-reads everything from disk with a fresh backend and checks:
+
+    - every /journal that answered "saved (ID n)" is on disk, exactly once
+    - no two entries of a user share an ID, and IDs are never reused
+    - every /removejournal that answered "removed" is gone from disk
+    - at most one check-in per user per day, and exactly one
+      /dailycheckin per user was accepted today
+    - the storage layer's (cached) view matches what's on disk
+
+Calls are submitted either all at once on the bot's event loop ("loop")
+or from a pool of threads into that loop ("threads"), the way gateway
+events arrive. Uses the backend from .env (STORAGE_BACKEND /
+CHECKIN_FORMAT), in a temporary folder. No bot token or network needed:
+
+    python -m Tools.StressStorage [--users 20] [--calls 2000] [--mode loop|threads|both]
+
+Exits with status 1 if any invariant is broken.
+"""
+import os
+import re
+import sys
+import time
+import random
+import shutil
+import asyncio
+import logging
+import argparse
+import tempfile
+from pathlib import Path
+from datetime import date
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+from discord import app_commands
+
+from Modules.Core._MoodRollup import MOODS
+from Tools._Fakes import FakeInteraction, load_bot, command_callback
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+MAP_PATH = Path("Modules/Maps/Coping.json")
+GUILD_ID = 1000
+
+SAVED_ID = re.compile(r"ID \*\*(\d+)\*\*")
+
+
+class Run:
+    """Outcome of one mode's calls, for the invariant checks."""
+
+    def __init__(self, mode: str):
+        self.mode = mode
+        self.saved = {}         # user -> [IDs /journal reported]
+        self.removed = {}       # user -> [IDs /removejournal reported gone]
+        self.checkins = Counter()  # user -> accepted /dailycheckin calls
+        self.writes = 0
+        self.errors = []
+        self.elapsed = 0.0
+        self.problems = []
+
+    def problem(self, text: str):
+        self.problems.append(text)
+
+
+def reply_text(interaction) -> str:
+    kind, kwargs = interaction.response.sent[-1]
+    embed = kwargs.get("embed")
+    return embed.description if embed is not None else (kwargs.get("content") or "")
+
+
+# --------------------------------------------------------
+# Calls
+# --------------------------------------------------------
+def make_calls(bot, run: Run, users: list, calls: int, rng: random.Random) -> list:
+    """A shuffled list of coroutine functions, calls per user, mixing writes and reads."""
+    journal = command_callback(bot, "journal")
+    removejournal = command_callback(bot, "removejournal")
+    myjournallist = command_callback(bot, "myjournallist")
+    dailycheckin = command_callback(bot, "dailycheckin")
+    view_cog = bot.get_cog("JournalViewCog")
+    moods = [app_commands.Choice(name=mood.title(), value=mood) for mood in MOODS]
+
+    def add(user_id, n):
+        async def call():
+            interaction = FakeInteraction(GUILD_ID, user_id)
+            await journal(interaction, f"stress entry {n} from {user_id}")
+            match = SAVED_ID.search(reply_text(interaction))
+            if match is None:
+                run.problem(f"/journal for {user_id} didn't report an ID: {reply_text(interaction)!r}")
+            else:
+                run.saved.setdefault(user_id, []).append(int(match.group(1)))
+            run.writes += 1
+        return call
+
+    def remove(user_id, entry_id):
+        async def call():
+            interaction = FakeInteraction(GUILD_ID, user_id)
+            await removejournal(interaction, str(entry_id))
+            if "has been removed" in reply_text(interaction):
+                run.removed.setdefault(user_id, []).append(entry_id)
+                run.writes += 1
+        return call
+
+    def checkin(user_id):
+        async def call():
+            interaction = FakeInteraction(GUILD_ID, user_id)
+            await dailycheckin(interaction, rng.choice(moods))
+            title = interaction.response.sent[-1][1]["embed"].title
+            if "Already" not in title:
+                run.checkins[user_id] += 1
+                run.writes += 1
+        return call
+
+    def read(user_id):
+        async def call():
+            interaction = FakeInteraction(GUILD_ID, user_id)
+            if rng.random() < 0.5:
+                await myjournallist(interaction)
+            else:
+                await view_cog.journal_id_autocomplete(interaction, str(rng.randint(1, 9)))
+        return call
+
+    planned = []
+    for user_id in users:
+        for n in range(calls):
+            roll = rng.random()
+            if roll < 0.55:
+                planned.append(add(user_id, n))
+            elif roll < 0.75:
+                # IDs that may or may not exist yet: both outcomes are legal
+                planned.append(remove(user_id, rng.randint(1, max(1, n))))
+            elif roll < 0.85:
+                planned.append(checkin(user_id))
+            else:
+                planned.append(read(user_id))
+
+    rng.shuffle(planned)
+    return planned
+
+
+async def guarded(run: Run, call):
+    try:
+        await call()
+    except Exception as e:
+        run.errors.append(repr(e))
+
+
+async def fire_on_loop(run: Run, planned: list):
+    await asyncio.gather(*(guarded(run, call) for call in planned))
+
+
+async def fire_from_threads(run: Run, planned: list, threads: int):
+    loop = asyncio.get_running_loop()
+
+    def submit(chunk):
+        futures = [asyncio.run_coroutine_threadsafe(guarded(run, call), loop) for call in chunk]
+        for future in futures:
+            future.result()
+
+    chunks = [planned[n::threads] for n in range(threads)]
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        await asyncio.gather(*(loop.run_in_executor(pool, submit, chunk) for chunk in chunks))
+
+
+# --------------------------------------------------------
+# Invariants
+# --------------------------------------------------------
+def fresh_backend():
+    """A second backend instance, so the checks read disk rather than the bot's cache."""
+    if os.getenv("STORAGE_BACKEND", "json").lower() == "sqlite":
+        from Modules.Core._SQLiteBackend import SQLiteBackend
+        return SQLiteBackend(os.getenv("SQLITE_PATH", "Data/Mellow.db"), pool_size=1)
+    if os.getenv("CHECKIN_FORMAT", "jsonl").lower() == "binary":
+        from Modules.Core._BinaryCheckIns import BinaryCheckInBackend
+        return BinaryCheckInBackend()
+    from Modules.Core._Storage import JsonBackend
+    return JsonBackend()
+
+
+async def check(run: Run, storage, users: list):
+    backend = fresh_backend()
+    today = date.today().isoformat()
+
+    try:
+        for user_id in users:
+            entries, next_id = backend.read_journal(GUILD_ID, user_id)
+            ids = [entry["id"] for entry in entries]
+            saved = run.saved.get(user_id, [])
+            removed = set(run.removed.get(user_id, []))
+
+            if len(ids) != len(set(ids)):
+                duplicated = sorted(i for i, n in Counter(ids).items() if n > 1)
+                run.problem(f"user {user_id}: duplicate journal IDs on disk {duplicated[:10]}")
+            if len(saved) != len(set(saved)):
+                run.problem(f"user {user_id}: the same ID was reported for two /journal calls")
+
+            lost = set(saved) - removed - set(ids)
+            if lost:
+                run.problem(f"user {user_id}: {len(lost)} saved entries missing on disk, e.g. {sorted(lost)[:10]}")
+
+            still_there = removed & set(ids)
+            if still_there:
+                run.problem(f"user {user_id}: removed entries still on disk {sorted(still_there)[:10]}")
+
+            unexpected = set(ids) - set(saved)
+            if unexpected:
+                run.problem(f"user {user_id}: entries on disk nobody saved {sorted(unexpected)[:10]}")
+
+            if ids and next_id <= max(ids):
+                run.problem(f"user {user_id}: next ID {next_id} would reuse an existing ID")
+
+            cached = await storage.get_journal(GUILD_ID, user_id)
+            if sorted(entry["id"] for entry in cached) != sorted(ids):
+                run.problem(f"user {user_id}: storage's journal view differs from disk")
+
+            history = backend.load_checkins(GUILD_ID, user_id)
+            per_day = Counter(entry["date"] for entry in history)
+            doubled = [day for day, n in per_day.items() if n > 1]
+            if doubled:
+                run.problem(f"user {user_id}: more than one check-in on {doubled[:5]}")
+
+            attempted = run.checkins[user_id]
+            if per_day.get(today, 0) != min(1, attempted) or attempted > 1:
+                run.problem(
+                    f"user {user_id}: {attempted} /dailycheckin accepted today, "
+                    f"{per_day.get(today, 0)} on disk"
+                )
+    finally:
+        backend.close()
+
+
+# --------------------------------------------------------
+async def stress(mode: str, users: int, calls: int, threads: int, seed: int) -> Run:
+    from Modules.Core._Storage import get_storage
+
+    bot = await load_bot()
+    storage = get_storage()
+    rng = random.Random(seed)
+    # Different users per mode, so one mode's data can't hide another's problems
+    user_ids = [10 ** 17 + (0 if mode == "loop" else 10 ** 6) + n for n in range(users)]
+
+    run = Run(mode)
+    planned = make_calls(bot, run, user_ids, calls, rng)
+
+    started = time.perf_counter()
+    if mode == "loop":
+        await fire_on_loop(run, planned)
+    else:
+        await fire_from_threads(run, planned, threads)
+    run.elapsed = time.perf_counter() - started
+
+    # With WRITE_BEHIND_SECONDS set, some writes are still only in memory
+    await storage.flush()
+    await check(run, storage, user_ids)
+
+    for extension in list(bot.extensions):
+        await bot.unload_extension(extension)
+    await storage.aclose()
+
+    # get_storage() builds a new instance for the next mode
+    import Modules.Core._Storage as storage_module
+    storage_module._storage = None
+    return run
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Stress the storage write paths through the cogs.")
+    parser.add_argument("--users", type=int, default=20)
+    parser.add_argument("--calls", type=int, default=2000, help="calls per user")
+    parser.add_argument("--mode", choices=("loop", "threads", "both"), default="both")
+    parser.add_argument("--threads", type=int, default=16)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--keep", action="store_true", help="keep the temporary Data/ folder")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+    os.environ.pop("METRICS_PORT", None)
+
+    workdir = tempfile.mkdtemp(prefix="mellow-stress-")
+    os.chdir(workdir)
+    MAP_PATH.parent.mkdir(parents=True, exist_ok=True)
+    shutil.copy(REPO_ROOT / MAP_PATH, MAP_PATH)
+
+    modes = ("loop", "threads") if args.mode == "both" else (args.mode,)
+    failed = False
+
+    try:
+        for mode in modes:
+            run = asyncio.run(stress(mode, args.users, args.calls, args.threads, args.seed))
+            total = args.users * args.calls
+
+            print(f"[{mode}] {total} calls for {args.users} users in {run.elapsed:.2f} s: "
+                  f"{run.writes} writes ({run.writes / run.elapsed:.0f} writes/s), "
+                  f"{total / run.elapsed:.0f} calls/s")
+
+            for error in Counter(run.errors).most_common(5):
+                print(f"  error x{error[1]}: {error[0]}")
+            for problem in run.problems[:20]:
+                print(f"  FAIL {problem}")
+
+            if run.errors or run.problems:
+                failed = True
+            else:
+                print("  all invariants hold")
+    finally:
+        os.chdir(REPO_ROOT)
+        if args.keep:
+            print(f"Data kept in {workdir}")
+        else:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
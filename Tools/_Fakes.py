@@ -0,0 +1,120 @@
+"""
+Stand-ins for the parts of discord.Interaction the cogs use, plus a bot
+with every cog loaded, so commands can be driven without a token or a
+gateway connection. Shared by the offline benchmark and stress tools.
+"""
+import logging
+from pathlib import Path
+
+import discord
+from discord.ext import commands
+
+from Modules.Core._CogLoader import load_extensions
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+
+class FakeUser:
+    def __init__(self, user_id: int):
+        self.id = user_id
+        self.name = f"user{user_id}"
+        self.display_name = self.name
+
+    def __str__(self):
+        return self.name
+
+
+class FakeGuild:
+    def __init__(self, guild_id: int):
+        self.id = guild_id
+
+
+class FakeResponse:
+    """Records what the command sent instead of calling Discord."""
+
+    def __init__(self):
+        self.sent = []
+        self._done = False
+
+    def is_done(self) -> bool:
+        return self._done
+
+    async def _respond(self, kind: str, kwargs: dict):
+        if self._done:
+            raise discord.InteractionResponded(None)
+        self._done = True
+        self.sent.append((kind, kwargs))
+
+    async def send_message(self, content=None, **kwargs):
+        kwargs["content"] = content
+        await self._respond("send_message", kwargs)
+
+    async def edit_message(self, **kwargs):
+        await self._respond("edit_message", kwargs)
+
+    async def defer(self, **kwargs):
+        await self._respond("defer", kwargs)
+
+    async def send_modal(self, modal):
+        await self._respond("send_modal", {"modal": modal})
+
+
+class FakeFollowup:
+    def __init__(self):
+        self.sent = []
+
+    async def send(self, content=None, **kwargs):
+        kwargs["content"] = content
+        self.sent.append(kwargs)
+
+
+class FakeInteraction:
+    def __init__(self, guild_id, user_id: int):
+        self.guild = None if guild_id == "DM" else FakeGuild(guild_id)
+        self.guild_id = None if self.guild is None else guild_id
+        self.user = FakeUser(user_id)
+        self.response = FakeResponse()
+        self.followup = FakeFollowup()
+        self.type = discord.InteractionType.application_command
+        self.command_failed = False
+        self.extras = {}
+
+    async def edit_original_response(self, **kwargs):
+        self.followup.sent.append(kwargs)
+
+
+def extension_names() -> list:
+    """Module paths of every cog in the repo, independent of the working directory."""
+    modules = REPO_ROOT / "Modules"
+    return sorted(
+        ".".join(file.relative_to(REPO_ROOT).with_suffix("").parts)
+        for file in modules.rglob("*.py")
+        if not file.name.startswith("_")
+    )
+
+
+async def load_bot() -> commands.Bot:
+    """A bot that never connects, with every cog loaded (and failing loudly if one doesn't)."""
+    bot = commands.Bot(command_prefix="!", intents=discord.Intents.default())
+    timings = await load_extensions(bot, extension_names())
+
+    failed = [t for t in timings if t.error is not None]
+    if failed:
+        raise RuntimeError(f"Could not load {failed[0].name}: {failed[0].error}")
+
+    logging.getLogger("Mellow").debug(f"Loaded {len(timings)} cogs for an offline run")
+    return bot
+
+
+def command_callback(bot: commands.Bot, name: str):
+    """Calls /<name>'s implementation directly: await callback(interaction, *args)."""
+    command = bot.tree.get_command(name)
+    if command is None:
+        raise KeyError(f"No app command named {name}")
+
+    cog = command.binding
+
+    async def call(interaction, *args):
+        return await command.callback(cog, interaction, *args)
+
+    return call
@@ -1,12 +1,18 @@
 import os
-import sys
+import time
+import signal
 import asyncio
-from pathlib import Path
+import logging
 from dotenv import load_dotenv
 
 import discord
 from discord.ext import commands
-import logging
+
+from Modules.Core._Storage import get_storage
+from Modules.Core._CommandSync import CommandSync
+from Modules.Core._CogLoader import load_extensions, find_extensions, log_report
+from Modules.Core._Metrics import InstrumentedTree
+from Modules.Core._Logging import start_logging, attach_queue, queue_size
 
 # --------------------------------------------------------
 # Load environment variables
@@ -15,90 +21,189 @@ load_dotenv()
 TOKEN = os.getenv("TOKEN")
 OWNER_ID = int(os.getenv("OWNER_ID", "0"))
 
+# 0 = run everything in this process; N = supervise N sharded worker processes
+SHARD_PROCESSES = int(os.getenv("SHARD_PROCESSES", "0"))
+
 # --------------------------------------------------------
-# Logging Setup
+# Logging Setup (see Modules/Core/_Logging.py)
 # --------------------------------------------------------
-LOG_DIR = Path("Logs")
-LOG_DIR.mkdir(exist_ok=True)
-
-logging.basicConfig(
-    level=logging.INFO,
-    format="[%(asctime)s] [%(levelname)s] %(name)s: %(message)s",
-    handlers=[
-        logging.StreamHandler(sys.stdout),
-        logging.FileHandler(LOG_DIR / "Mellow.log", encoding="utf-8")
-    ]
-)
+LOG_FORMAT = "[%(asctime)s] [%(levelname)s] %(name)s: %(message)s"
+SHARDED_LOG_FORMAT = "[%(asctime)s] [%(levelname)s] [%(processName)s] %(name)s: %(message)s"
+
 log = logging.getLogger("Mellow")
 
+
 # --------------------------------------------------------
 # Discord Bot Setup
 # --------------------------------------------------------
-intents = discord.Intents.default()
-intents.message_content = True
-intents.members = True
-
-bot = commands.Bot(
-    command_prefix="!",
-    intents=intents,
-    owner_id=OWNER_ID
-)
-
-bot.remove_command("help")
+def create_bot(shard_ids: list = None, shard_count: int = None) -> commands.Bot:
+    intents = discord.Intents.default()
+    intents.message_content = True
+    intents.members = True
+
+    if shard_count is None:
+        bot = commands.Bot(
+            command_prefix="!",
+            intents=intents,
+            owner_id=OWNER_ID,
+            tree_cls=InstrumentedTree
+        )
+    else:
+        bot = commands.AutoShardedBot(
+            command_prefix="!",
+            intents=intents,
+            owner_id=OWNER_ID,
+            tree_cls=InstrumentedTree,
+            shard_ids=shard_ids,
+            shard_count=shard_count
+        )
+
+    bot.remove_command("help")
+
+    # Slash commands are global: one worker syncing them is enough
+    sync_commands = shard_ids is None or 0 in shard_ids
+    command_sync = CommandSync(bot.tree)
+
+    # --------------------------------------------------------
+    # Events
+    # --------------------------------------------------------
+    @bot.event
+    async def on_ready():
+        log.info(f"Logged in as {bot.user} (ID: {bot.user.id})")
+
+        # on_ready fires again on every reconnect: check the tree once per run
+        if not sync_commands or command_sync.checked:
+            return
+
+        # ---- Slash Command Sync ----
+        try:
+            synced = await command_sync.sync(bot.application_id)
+            if synced is None:
+                log.info("Slash commands unchanged since the last sync; skipping.")
+            else:
+                log.info(f"Synced {len(synced)} slash commands globally.")
+        except Exception as e:
+            log.error(f"Failed to sync commands: {e}")
+
+    # --------------------------------------------------------
+    # Owner Commands
+    # --------------------------------------------------------
+    @bot.command(name="sync")
+    @commands.is_owner()
+    async def sync(ctx):
+        """Forces a global slash-command sync."""
+        synced = await command_sync.sync(bot.application_id, force=True)
+        await ctx.reply(f"Synced {len(synced)} slash commands globally.", mention_author=False)
+        log.info(f"{ctx.author} forced a sync of {len(synced)} slash commands.")
+
+    # --------------------------------------------------------
+    # Error Handler
+    # --------------------------------------------------------
+    @bot.event
+    async def on_command_error(ctx, error):
+        if isinstance(error, (commands.CommandNotFound, commands.NotOwner)):
+            return
+
+        log.error(f"Error in command '{ctx.command}': {error}")
+        await ctx.reply("Something went wrong, sorry 💛", mention_author=False)
+
+    return bot
 
 # --------------------------------------------------------
 # Auto Load Cogs (ASYNC REQUIRED)
 # --------------------------------------------------------
-COGS_DIR = Path("Modules")
+async def load_cogs(bot: commands.Bot):
+    start = time.perf_counter()
 
-async def load_cogs():
-    for file in COGS_DIR.rglob("*.py"):
-        if file.name.startswith("_"):
-            continue
+    # Open storage off the event loop before any cog constructor asks for it
+    await asyncio.to_thread(get_storage)
 
-        module_path = ".".join(file.with_suffix("").parts)
-
-        try:
-            await bot.load_extension(module_path)
-            log.info(f"Loaded cog: {module_path}")
-        except Exception as e:
-            log.error(f"Failed to load {module_path}: {e}")
+    timings = await load_extensions(bot, find_extensions())
+    log_report(timings, time.perf_counter() - start)
 
 # --------------------------------------------------------
-# Events
+# Startup (ASYNC)
 # --------------------------------------------------------
-@bot.event
-async def on_ready():
-    log.info(f"Logged in as {bot.user} (ID: {bot.user.id})")
+async def run_bot(bot: commands.Bot):
+    await load_cogs(bot)
+
+    if not TOKEN:
+        raise RuntimeError("TOKEN missing from .env")
 
-    # ---- Slash Command Sync ----
     try:
-        synced = await bot.tree.sync()
-        log.info(f"Synced {len(synced)} slash commands globally.")
-    except Exception as e:
-        log.error(f"Failed to sync commands: {e}")
+        await bot.start(TOKEN)
+    finally:
+        if not bot.is_closed():
+            await bot.close()
 
-# --------------------------------------------------------
-# Error Handler
-# --------------------------------------------------------
-@bot.event
-async def on_command_error(ctx, error):
-    if isinstance(error, commands.CommandNotFound):
-        return
+        # Let queued journal / check-in writes land before exiting
+        await get_storage().aclose()
 
-    log.error(f"Error in command '{ctx.command}': {error}")
-    await ctx.reply("Something went wrong, sorry 💛", mention_author=False)
 
-# --------------------------------------------------------
-# Startup (ASYNC)
-# --------------------------------------------------------
-if __name__ == "__main__":
+def serve(make_bot):
+    """Runs the bot from make_bot() until Ctrl+C or SIGTERM, shutting down cleanly either way."""
     async def main():
-        await load_cogs()
+        # docker stop, systemd and the supervisor stop the bot with SIGTERM: shut down like Ctrl+C
+        task = asyncio.current_task()
+        try:
+            asyncio.get_running_loop().add_signal_handler(signal.SIGTERM, task.cancel)
+        except NotImplementedError:
+            pass  # Windows
 
-        if not TOKEN:
-            raise RuntimeError("TOKEN missing from .env")
+        await run_bot(make_bot())
 
-        await bot.start(TOKEN)
+    try:
+        asyncio.run(main())
+    except (KeyboardInterrupt, asyncio.CancelledError):
+        pass
+
+
+def run_worker(worker: int, shard_ids: list, shard_count: int, log_queue):
+    """Entry point of one sharded worker process."""
+    from Modules.Core._Sharding import GuildPartition
+
+    # Everything goes through the supervisor, which owns the log file
+    attach_queue(log_queue)
+
+    # Only this process writes the files of guilds on these shards
+    get_storage(partition=GuildPartition(shard_ids, shard_count, worker))
+    log.info(f"Worker {worker} running shards {shard_ids[0]}-{shard_ids[-1]} of {shard_count}")
+
+    serve(lambda: create_bot(shard_ids, shard_count))
 
-    asyncio.run(main())
+
+def run_sharded(processes: int):
+    """Supervises <processes> workers, each running a range of AutoShardedBot shards."""
+    import multiprocessing
+    from Modules.Core._Sharding import assign_shards, fetch_recommended_shards
+    from Modules.Core._Supervisor import Supervisor
+
+    if not TOKEN:
+        raise RuntimeError("TOKEN missing from .env")
+
+    shard_count = int(os.getenv("SHARD_COUNT", "0")) or fetch_recommended_shards(TOKEN)
+    ranges = assign_shards(shard_count, processes)
+
+    # Workers send their records here; only this process writes console + file
+    log_queue = multiprocessing.get_context("spawn").Queue(maxsize=queue_size())
+    listener = start_logging(SHARDED_LOG_FORMAT, log_queue)
+
+    log.info(f"Running {shard_count} shard(s) across {len(ranges)} worker process(es)")
+    try:
+        Supervisor(
+            run_worker,
+            [(worker, shard_ids, shard_count, log_queue) for worker, shard_ids in enumerate(ranges)]
+        ).run()
+    finally:
+        listener.stop()
+
+
+if __name__ == "__main__":
+    if SHARD_PROCESSES > 0:
+        run_sharded(SHARD_PROCESSES)
+    else:
+        listener = start_logging(LOG_FORMAT)
+        try:
+            serve(create_bot)
+        finally:
+            listener.stop()
@@ -0,0 +1,73 @@
+import json
+import tempfile
+import unittest
+from pathlib import Path
+
+from Modules.Core._JournalIndex import JournalIndex
+from Modules.Core._Storage import Storage, JsonBackend, JOURNAL
+
+
+def entry(entry_id: int, content: str) -> dict:
+    return {"id": entry_id, "timestamp": "2024-01-01 00:00:00", "content": content}
+
+
+class DuplicateIdIndexTest(unittest.TestCase):
+    def setUp(self):
+        self.index = JournalIndex([entry(1, "a"), entry(2, "b"), entry(2, "c"), entry(3, "d")])
+
+    def test_pages_list_every_duplicate(self):
+        contents = [e["content"] for e in self.index.page(0, 10)]
+        self.assertEqual(contents, ["a", "b", "c", "d"])
+
+    def test_remove_drops_all_duplicates(self):
+        removed = self.index.remove(2)
+        self.assertEqual([e["content"] for e in removed], ["b", "c"])
+        self.assertEqual([e["content"] for e in self.index.page(0, 10)], ["a", "d"])
+        self.assertIsNone(self.index.get(2))
+        self.assertEqual(self.index.get(3)["content"], "d")
+        self.assertEqual(self.index.search_prefix(""), [3, 1])
+
+    def test_prefix_search_lists_duplicate_once(self):
+        self.assertEqual(self.index.search_prefix("2"), [2])
+
+
+class DuplicateIdStorageTest(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        root = Path(self.tmp.name)
+        backend = JsonBackend(
+            journal_dir=root / "Journals",
+            checkin_dir=root / "CheckIns",
+            rollup_dir=root / "Rollups",
+            quarantine_dir=root / "Quarantine"
+        )
+        log = backend.journal_file(1, 2)
+        log.parent.mkdir(parents=True)
+        log.write_text("".join(
+            json.dumps(e) + "\n" for e in (entry(1, "a"), entry(2, "b"), entry(2, "c"))
+        ), encoding="utf-8")
+        self.storage = Storage(backend=backend, snapshot_path=root / "LastCheckIns.json")
+
+    async def asyncTearDown(self):
+        await self.storage.aclose()
+        self.tmp.cleanup()
+
+    async def test_page_and_delete(self):
+        entries, total = await self.storage.get_journal_page(1, 2, 0, 10)
+        self.assertEqual([e["content"] for e in entries], ["a", "b", "c"])
+        self.assertEqual(total, 3)
+
+        self.assertTrue(await self.storage.delete_journal(1, 2, 2))
+        entries, total = await self.storage.get_journal_page(1, 2, 0, 10)
+        self.assertEqual([e["content"] for e in entries], ["a"])
+        self.assertEqual(total, 1)
+        self.assertEqual(await self.storage.search_journal_ids(1, 2, "2"), [])
+
+        # The log agrees once it's read back from disk
+        self.storage.cache.invalidate((JOURNAL, "1", "2"))
+        entries, _ = await self.storage.get_journal_page(1, 2, 0, 10)
+        self.assertEqual([e["content"] for e in entries], ["a"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,63 @@
+import unittest
+
+import discord
+from discord import app_commands
+from discord.webhook.async_ import async_context
+
+from Modules.Core._Metrics import InstrumentedTree, get_metrics
+
+
+class _Adapter:
+    """Stands in for the webhook adapter: accepts interaction responses without HTTP."""
+
+    async def create_interaction_response(self, *args, **kwargs):
+        return None
+
+
+def autocomplete_interaction(client: discord.Client, command: str, value: str) -> discord.Interaction:
+    payload = {
+        "id": "1", "application_id": "2", "type": 4, "token": "token", "version": 1,
+        "channel_id": "3", "attachment_size_limit": 8 * 1024 * 1024,
+        "user": {"id": "4", "username": "user", "discriminator": "0", "avatar": None},
+        "data": {
+            "id": "5", "name": command, "type": 1,
+            "options": [{"name": "topic", "type": 3, "value": value, "focused": True}]
+        }
+    }
+    return discord.Interaction(data=payload, state=client._connection)
+
+
+class AutocompleteOutcomeTest(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        async_context.set(_Adapter())
+        self.client = discord.Client(intents=discord.Intents.none())
+        self.tree = InstrumentedTree(self.client)
+
+        async def topics(interaction, current):
+            if current == "raise":
+                raise RuntimeError("autocomplete failed")
+            return [app_commands.Choice(name=current, value=current)]
+
+        @self.tree.command(name="metricstest")
+        @app_commands.autocomplete(topic=topics)
+        async def metricstest(interaction: discord.Interaction, topic: str):
+            pass
+
+    def count(self, status: str) -> float:
+        return get_metrics().counter(
+            "mellow_command_total",
+            (("command", "metricstest"), ("type", "autocomplete"), ("status", status))
+        )
+
+    async def test_ok_and_error_are_counted(self):
+        ok, error = self.count("ok"), self.count("error")
+
+        await self.tree._call(autocomplete_interaction(self.client, "metricstest", "sleep"))
+        self.assertEqual((self.count("ok"), self.count("error")), (ok + 1, error))
+
+        await self.tree._call(autocomplete_interaction(self.client, "metricstest", "raise"))
+        self.assertEqual((self.count("ok"), self.count("error")), (ok + 1, error + 1))
+
+
+if __name__ == "__main__":
+    unittest.main()